@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк индекса похожих документов: полнота (recall@k) против задержки
+для разного числа просматриваемых кластеров (n_probe)
+"""
+
+import sys
+import os
+import time
+import argparse
+import logging
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.index_manager import IndexManager
+from src.core.ann import SimilarityIndex
+
+logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+def exact_neighbours(index: SimilarityIndex, row: int, k: int) -> set:
+    """Точные ближайшие соседи в том же пространстве проекций (перебор)"""
+    scores = index.embeddings @ index.embeddings[row]
+    scores[row] = -np.inf
+    return {index.doc_ids[i] for i in np.argsort(-scores)[:k]}
+
+def benchmark_probe(index: SimilarityIndex, rows: np.ndarray, truth: list, k: int, n_probe: int) -> dict:
+    """Средняя полнота и задержка запроса при заданном n_probe"""
+    recall = 0.0
+    start = time.perf_counter()
+    found = [index.similar(index.doc_ids[row], k, n_probe=n_probe) for row in rows]
+    elapsed = time.perf_counter() - start
+    for result, expected in zip(found, truth):
+        recall += len({doc_id for doc_id, _ in result} & expected) / max(len(expected), 1)
+    return {
+        'n_probe': n_probe,
+        'recall': recall / len(rows),
+        'latency_ms': elapsed / len(rows) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк индекса похожих документов')
+    parser.add_argument('--dir', required=True, help='Путь к директории с документами')
+    parser.add_argument('--k', type=int, default=10, help='Количество соседей')
+    parser.add_argument('--queries', type=int, default=200, help='Количество запросов')
+    parser.add_argument('--dim', type=int, default=64, help='Размерность проекции')
+    args = parser.parse_args()
+    
+    manager = IndexManager()
+    manager.build_from_directory(args.dir)
+    
+    start = time.perf_counter()
+    index = manager.build_similarity_index(dim=args.dim)
+    build_time = time.perf_counter() - start
+    n_lists = len(index.centroids)
+    print(f"Документов: {len(index.doc_ids)}, кластеров: {n_lists}, построение: {build_time:.2f} с")
+    if len(index.doc_ids) < 2:
+        return
+    
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(index.doc_ids), min(args.queries, len(index.doc_ids)), replace=False)
+    
+    start = time.perf_counter()
+    truth = [exact_neighbours(index, row, args.k) for row in rows]
+    exact_ms = (time.perf_counter() - start) / len(rows) * 1000
+    print(f"Точный перебор: {exact_ms:.3f} мс/запрос")
+    print()
+    print(f"{'n_probe':>8}{'recall@' + str(args.k):>12}{'мс/запрос':>12}")
+    
+    n_probe = 1
+    while True:
+        result = benchmark_probe(index, rows, truth, args.k, min(n_probe, n_lists))
+        print(f"{result['n_probe']:>8}{result['recall']:>12.3f}{result['latency_ms']:>12.3f}")
+        if n_probe >= n_lists:
+            break
+        n_probe *= 2
+
+if __name__ == '__main__':
+    main()
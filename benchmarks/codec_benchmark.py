@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк кодеков постингов: байт на постинг и скорость декодирования
+"""
+
+import sys
+import os
+import time
+import argparse
+import tempfile
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.index_manager import IndexManager
+from src.core.index_storage import IndexReader
+from src.core.postings_codecs import available_codecs
+
+logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+def benchmark_codec(manager: IndexManager, codec: str, index_path: str) -> dict:
+    """Сохраняет индекс кодеком и измеряет размер и скорость декодирования"""
+    manager.codec = codec
+    manager.save_index(index_path)
+    
+    with IndexReader(index_path) as reader:
+        postings_size = reader.header['sections']['postings'][1]
+        num_postings = reader.header['num_postings']
+        terms = list(reader.dictionary)
+        
+        start = time.perf_counter()
+        for term in terms:
+            reader.read_postings(term)
+        elapsed = time.perf_counter() - start
+    
+    return {
+        'codec': codec,
+        'bytes_per_posting': postings_size / max(num_postings, 1),
+        'postings_per_sec': num_postings / elapsed if elapsed else 0.0,
+        'postings_bytes': postings_size,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк кодеков постингов')
+    parser.add_argument('--dir', required=True, help='Путь к директории с документами')
+    args = parser.parse_args()
+    
+    manager = IndexManager()
+    manager.build_from_directory(args.dir)
+    print(f"Документов: {manager.index.total_docs}, терминов: {len(manager.index.terms)}")
+    print()
+    print(f"{'кодек':<12}{'байт/постинг':>14}{'постингов/с':>16}{'размер, байт':>16}")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for codec in available_codecs():
+            result = benchmark_codec(manager, codec, os.path.join(temp_dir, f'{codec}.idx'))
+            print(f"{result['codec']:<12}{result['bytes_per_posting']:>14.3f}"
+                  f"{result['postings_per_sec']:>16,.0f}{result['postings_bytes']:>16,}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк передачи выдачи и постингов между процессами: pickle объектов
+против компактных представлений и двоичного формата (pipe и разделяемая память)
+"""
+
+import sys
+import os
+import time
+import pickle
+import argparse
+import logging
+import multiprocessing
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.index_manager import IndexManager
+from src.core.search_manager import SearchManager
+from src.core.wire import (CompactResult, attach_shared, decode_postings, decode_results, encode_postings,
+                           encode_search_results, release_shared, write_shared)
+from src.models.document import Document
+
+logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+def synthetic_documents(count: int, vocabulary: int = 3000, length: int = 200) -> list:
+    rng = np.random.default_rng(0)
+    return [Document(id=f"doc{i}.txt", path=f"doc{i}.txt",
+                     text=' '.join(f"w{w}" for w in rng.zipf(1.3, length) % vocabulary))
+            for i in range(count)]
+
+def measure(encode, decode, payloads: list) -> dict:
+    """Среднее время кодирования и разбора в одном процессе и средний размер"""
+    start = time.perf_counter()
+    encoded = [encode(payload) for payload in payloads]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for data in encoded:
+        decode(data)
+    decode_time = time.perf_counter() - start
+    return {
+        'encode_us': encode_time / len(payloads) * 1e6,
+        'decode_us': decode_time / len(payloads) * 1e6,
+        'bytes': sum(len(data) for data in encoded) / len(payloads),
+    }
+
+def worker(conn) -> None:
+    """Принимает сообщения и отвечает числом разобранных элементов"""
+    while True:
+        kind, message = conn.recv()
+        if kind == 'stop':
+            return
+        if kind == 'pickle':
+            count = len(pickle.loads(message))
+        elif kind == 'wire':
+            count = len(decode_results(message)[1])
+        else:
+            name, size = message
+            with attach_shared(name, size) as view:
+                count = len(decode_results(view)[0])
+        conn.send(count)
+
+def roundtrip(conn, kind: str, payloads: list) -> float:
+    """Среднее время передачи в другой процесс и ответа, мкс"""
+    start = time.perf_counter()
+    for payload in payloads:
+        if kind == 'pickle':
+            conn.send((kind, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)))
+            conn.recv()
+        elif kind == 'wire':
+            conn.send((kind, encode_search_results(payload)))
+            conn.recv()
+        else:
+            data = encode_search_results(payload)
+            segment = write_shared(data)
+            conn.send((kind, (segment.name, len(data))))
+            conn.recv()
+            release_shared(segment)
+    return (time.perf_counter() - start) / len(payloads) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк межпроцессной передачи выдачи и постингов')
+    parser.add_argument('--dir', help='Путь к директории с документами (по умолчанию - синтетический корпус)')
+    parser.add_argument('--docs', type=int, default=5000, help='Документов в синтетическом корпусе')
+    parser.add_argument('--queries', type=int, default=200, help='Количество запросов')
+    parser.add_argument('--limit', type=int, default=100, help='Результатов на запрос')
+    args = parser.parse_args()
+    
+    manager = IndexManager()
+    if args.dir:
+        manager.build_from_directory(args.dir)
+    else:
+        manager.index.add_documents(synthetic_documents(args.docs))
+    index = manager.index
+    print(f"Документов: {index.total_docs}, терминов: {len(index.terms)}")
+    
+    terms = sorted(index.terms, key=lambda t: -len(index.terms[t]))[:args.queries]
+    search = SearchManager(index)
+    results = [search.search(term, args.limit) for term in terms]
+    rows = {doc_id: i for i, doc_id in enumerate(index.documents)}
+    postings = [index.terms[term] for term in terms]
+    postings_arrays = [(np.array([rows[d] for d in p], dtype=np.int32), np.array(list(p.values()), dtype=np.int32))
+                       for p in postings]
+    
+    dumps = lambda payload: pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    cases = [
+        ('выдача: pickle SearchResult', measure(dumps, pickle.loads, results)),
+        ('выдача: pickle CompactResult',
+         measure(lambda r: dumps([CompactResult.from_result(x) for x in r]), pickle.loads, results)),
+        ('выдача: двоичный формат', measure(encode_search_results, decode_results, results)),
+        ('постинги: pickle dict', measure(dumps, pickle.loads, postings)),
+        ('постинги: двоичный формат', measure(lambda p: encode_postings(*p), decode_postings, postings_arrays)),
+    ]
+    print()
+    print(f"{'способ':<32}{'кодирование, мкс':>18}{'разбор, мкс':>14}{'байт':>12}")
+    for name, result in cases:
+        print(f"{name:<32}{result['encode_us']:>18.1f}{result['decode_us']:>14.1f}{result['bytes']:>12,.0f}")
+    
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=worker, args=(child,))
+    process.start()
+    try:
+        print()
+        print(f"{'передача в процесс и ответ':<32}{'мкс/запрос':>18}")
+        for kind, name in (('pickle', 'pickle SearchResult'), ('wire', 'двоичный формат через pipe'),
+                           ('shared', 'двоичный формат в shared memory')):
+            print(f"{name:<32}{roundtrip(parent, kind, results):>18.1f}")
+    finally:
+        parent.send(('stop', None))
+        process.join()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import os
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .vectors import DocumentVectors
+
+class SimilarityIndex:
+    """
+    Приближенный поиск похожих документов (IVF) по плотным проекциям TF-IDF векторов
+    
+    Разреженные векторы проецируются случайной матрицей (лемма Джонсона-Линденштраусса) в
+    пространство размерности dim и нормируются, поэтому скалярное произведение - косинус.
+    Проекции разбиваются k-means на n_lists кластеров; при поиске просматриваются только
+    n_probe ближайших к запросу кластеров вместо всего корпуса.
+    """
+    
+    def __init__(self, doc_ids: List[str], embeddings: np.ndarray, centroids: np.ndarray,
+                 list_offsets: np.ndarray, list_members: np.ndarray, n_probe: int = 8):
+        self.doc_ids = doc_ids
+        self.rows = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self.embeddings = embeddings
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_members = list_members
+        self.n_probe = n_probe
+    
+    @staticmethod
+    def project(vectors: DocumentVectors, dim: int = 64, seed: int = 0,
+                chunk_rows: int = 4096) -> np.ndarray:
+        """
+        Случайная проекция TF-IDF векторов в плотное пространство
+        
+        Args:
+            vectors: Векторы документов
+            dim: Размерность проекции
+            seed: Зерно генератора случайной матрицы
+            chunk_rows: Документов в порции (ограничивает промежуточную память)
+        
+        Returns:
+            np.ndarray: Нормированные проекции (документы x dim, float32)
+        """
+        rng = np.random.default_rng(seed)
+        projection = rng.standard_normal((len(vectors.vocabulary), dim)).astype(np.float32)
+        embeddings = np.zeros((len(vectors), dim), dtype=np.float32)
+        
+        for start in range(0, len(vectors), chunk_rows):
+            end = min(start + chunk_rows, len(vectors))
+            lo, hi = vectors.indptr[start], vectors.indptr[end]
+            if lo == hi:
+                continue
+            weighted = projection[vectors.indices[lo:hi]] * vectors.data[lo:hi, None].astype(np.float32)
+            lengths = np.diff(vectors.indptr[start:end + 1])
+            nonempty = lengths > 0
+            # reduceat суммирует строки каждого документа; пустые документы остаются нулевыми
+            sums = np.add.reduceat(weighted, (vectors.indptr[start:end][nonempty] - lo).astype(np.int64))
+            embeddings[start:end][nonempty] = sums
+        
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        return embeddings
+    
+    @staticmethod
+    def _kmeans(data: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+        """Сферический k-means (центроиды нормированы, близость - скалярное произведение)"""
+        k = min(k, len(data))
+        centroids = data[rng.choice(len(data), k, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, data)
+            counts = np.bincount(assignment, minlength=k)
+            # Пустой кластер получает случайную точку, чтобы не терять списки
+            empty = counts == 0
+            sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = np.divide(sums, norms, out=np.zeros_like(sums), where=norms > 0)
+        return centroids
+    
+    @classmethod
+    def build(cls, vectors: DocumentVectors, dim: int = 64, n_lists: Optional[int] = None,
+              n_probe: int = 8, iterations: int = 10, sample_size: int = 50000,
+              seed: int = 0) -> 'SimilarityIndex':
+        """
+        Офлайн-построение индекса
+        
+        Args:
+            vectors: Векторы документов
+            dim: Размерность проекции
+            n_lists: Количество кластеров (по умолчанию ~sqrt(N))
+            n_probe: Кластеров, просматриваемых при поиске
+            iterations: Итераций k-means
+            sample_size: Размер выборки для обучения k-means
+            seed: Зерно генератора
+        
+        Returns:
+            SimilarityIndex: Построенный индекс
+        """
+        embeddings = cls.project(vectors, dim, seed)
+        n_docs = len(embeddings)
+        if n_docs == 0:
+            return cls([], embeddings, np.zeros((0, dim), dtype=np.float32),
+                       np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), n_probe)
+        
+        n_lists = min(n_lists or max(1, int(np.sqrt(n_docs))), n_docs)
+        rng = np.random.default_rng(seed)
+        sample = embeddings if n_docs <= sample_size else embeddings[rng.choice(n_docs, sample_size, replace=False)]
+        centroids = cls._kmeans(sample, n_lists, iterations, rng)
+        n_lists = len(centroids)
+        
+        assignment = np.argmax(embeddings @ centroids.T, axis=1)
+        list_members = np.argsort(assignment, kind='stable').astype(np.int32)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=list_offsets[1:])
+        
+        logging.getLogger(__name__).info(f"Индекс похожих документов: {n_docs} документов, "
+                                         f"{n_lists} кластеров, размерность {dim}")
+        return cls(list(vectors.doc_ids), embeddings, centroids, list_offsets, list_members, n_probe)
+    
+    def search(self, query: np.ndarray, k: int = 10, n_probe: Optional[int] = None,
+               exclude: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Приближенный поиск ближайших документов
+        
+        Args:
+            query: Нормированный вектор запроса размерности dim
+            k: Количество документов
+            n_probe: Кластеров для просмотра (по умолчанию self.n_probe)
+            exclude: Номер документа, который не попадает в выдачу
+        
+        Returns:
+            List[Tuple[str, float]]: Идентификаторы и косинусная близость по убыванию
+        """
+        if k <= 0 or not len(self.centroids):
+            return []
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        
+        candidates = np.concatenate([self.list_members[self.list_offsets[i]:self.list_offsets[i + 1]]
+                                     for i in probe])
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        if not len(candidates):
+            return []
+        scores = self.embeddings[candidates] @ query
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return [(self.doc_ids[candidates[i]], float(scores[i])) for i in order]
+    
+    def similar(self, doc_id: str, k: int = 10, n_probe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Документы, похожие на данный (без самого документа)"""
+        row = self.rows.get(doc_id)
+        if row is None:
+            return []
+        return self.search(self.embeddings[row], k, n_probe, exclude=row)
+    
+    def save(self, filepath: str) -> None:
+        """Сохранение в .npz (атомарно: временный файл и замена)"""
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, doc_ids=np.array(self.doc_ids, dtype=str), embeddings=self.embeddings,
+                     centroids=self.centroids, list_offsets=self.list_offsets,
+                     list_members=self.list_members, n_probe=np.array(self.n_probe))
+        os.replace(tmp_path, filepath)
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'SimilarityIndex':
+        """Загрузка из .npz"""
+        with np.load(filepath) as data:
+            return cls(data['doc_ids'].tolist(), data['embeddings'], data['centroids'],
+                       data['list_offsets'], data['list_members'], int(data['n_probe']))
+    
+    @staticmethod
+    def path_for(index_path: str) -> str:
+        """Путь к файлу индекса похожих документов рядом с файлом основного индекса"""
+        return index_path + '.ann.npz'
@@ -0,0 +1,204 @@
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+def approx_sizeof(value: Any, _depth: int = 0) -> int:
+    """
+    Приблизительный размер объекта в байтах (с содержимым контейнеров)
+    
+    Args:
+        value: Объект
+    
+    Returns:
+        int: Размер в байтах
+    """
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if value.base is None else value.nbytes)
+    size = sys.getsizeof(value)
+    if _depth > 4 or isinstance(value, (str, bytes, bytearray, int, float)):
+        return size
+    if isinstance(value, dict):
+        return size + sum(approx_sizeof(k, _depth + 1) + approx_sizeof(v, _depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_sizeof(item, _depth + 1) for item in value)
+    if hasattr(value, '__dict__'):
+        return size + approx_sizeof(vars(value), _depth + 1)
+    return size
+
+@dataclass
+class CacheStats:
+    """Статистика одного кэша"""
+    budget: int
+    bytes: int = 0
+    entries: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+class BoundedCache:
+    """Именованный кэш с бюджетом в байтах; вытеснение выполняет CacheManager"""
+    
+    def __init__(self, manager: 'CacheManager', name: str, budget: int):
+        self.manager = manager
+        self.name = name
+        self.stats = CacheStats(budget=budget)
+        # Ключ -> (значение, размер) в порядке давности использования внутри кэша
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+    
+    @property
+    def budget(self) -> int:
+        return self.stats.budget
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Значение по ключу (обновляет позицию в LRU)"""
+        return self.manager._get(self, key, default)
+    
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> None:
+        """
+        Добавление значения
+        
+        Args:
+            key: Ключ
+            value: Значение
+            size: Размер в байтах (по умолчанию - approx_sizeof); значения больше бюджета не кэшируются
+        """
+        self.manager._put(self, key, value, approx_sizeof(value) if size is None else size)
+    
+    def pop(self, key: Hashable) -> None:
+        """Удаление значения"""
+        self.manager._remove(self, key)
+    
+    def clear(self) -> None:
+        """Удаление всех значений кэша"""
+        for key in list(self._entries):
+            self.manager._remove(self, key)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class CacheManager:
+    """
+    Единое место ограничения памяти кэшей движка
+    
+    Каждый кэш получает именованный бюджет в байтах; общий бюджет ограничивает сумму.
+    Все записи всех кэшей стоят в одной LRU-очереди: при превышении бюджета кэша вытесняются
+    его самые давние записи, при превышении общего бюджета - самые давние записи любого кэша.
+    """
+    
+    def __init__(self, total_bytes: int = 256 * 1024 * 1024, budgets: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            total_bytes: Общий бюджет всех кэшей в байтах
+            budgets: Бюджеты отдельных кэшей по имени (по умолчанию - весь общий бюджет)
+        """
+        self.total_bytes = total_bytes
+        self.budgets = dict(budgets or {})
+        self._caches: Dict[str, BoundedCache] = {}
+        # (имя кэша, ключ) в порядке давности использования по всем кэшам
+        self._lru: 'OrderedDict[tuple, None]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def cache(self, name: str, budget: Optional[int] = None) -> BoundedCache:
+        """
+        Кэш с данным именем (создается при первом обращении)
+        
+        Args:
+            name: Имя кэша
+            budget: Бюджет по умолчанию, если он не задан в budgets
+        
+        Returns:
+            BoundedCache: Кэш
+        """
+        with self._lock:
+            cache = self._caches.get(name)
+            if cache is None:
+                budget = self.budgets.get(name, budget if budget is not None else self.total_bytes)
+                cache = self._caches[name] = BoundedCache(self, name, min(budget, self.total_bytes))
+            return cache
+    
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+    
+    def stats(self) -> Dict[str, CacheStats]:
+        """Статистика всех кэшей по имени"""
+        with self._lock:
+            return {name: CacheStats(**vars(cache.stats)) for name, cache in self._caches.items()}
+    
+    def summary(self) -> str:
+        """Текстовая сводка по кэшам"""
+        lines = [f"Кэши: {self._bytes / (1024 * 1024):.1f} из {self.total_bytes / (1024 * 1024):.1f} МБ"]
+        for name, stats in self.stats().items():
+            lines.append(f"  {name}: {stats.bytes / (1024 * 1024):.1f}/{stats.budget / (1024 * 1024):.1f} МБ, "
+                         f"записей {stats.entries}, попаданий {stats.hit_rate:.0%}, вытеснено {stats.evictions}")
+        return '\n'.join(lines)
+    
+    def clear(self) -> None:
+        """Очистка всех кэшей"""
+        with self._lock:
+            for cache in self._caches.values():
+                cache._entries.clear()
+                cache.stats.bytes = cache.stats.entries = 0
+            self._lru.clear()
+            self._bytes = 0
+    
+    def _get(self, cache: BoundedCache, key: Hashable, default: Any) -> Any:
+        with self._lock:
+            if key not in cache._entries:
+                cache.stats.misses += 1
+                return default
+            cache.stats.hits += 1
+            cache._entries.move_to_end(key)
+            self._lru.move_to_end((cache.name, key))
+            return cache._entries[key][0]
+    
+    def _put(self, cache: BoundedCache, key: Hashable, value: Any, size: int) -> None:
+        with self._lock:
+            self._remove_locked(cache, key)
+            if size > cache.budget:
+                return
+            cache._entries[key] = (value, size)
+            cache.stats.bytes += size
+            cache.stats.entries += 1
+            self._lru[(cache.name, key)] = None
+            self._bytes += size
+            self._evict(cache)
+    
+    def _remove(self, cache: BoundedCache, key: Hashable) -> None:
+        with self._lock:
+            self._remove_locked(cache, key)
+    
+    def _remove_locked(self, cache: BoundedCache, key: Hashable) -> bool:
+        entry = cache._entries.pop(key, None)
+        if entry is None:
+            return False
+        del self._lru[(cache.name, key)]
+        size = entry[1]
+        cache.stats.bytes -= size
+        cache.stats.entries -= 1
+        self._bytes -= size
+        return True
+    
+    def _evict(self, cache: BoundedCache) -> None:
+        """Вытеснение самых давних записей до соблюдения бюджетов"""
+        while cache.stats.bytes > cache.budget:
+            self._remove_locked(cache, next(iter(cache._entries)))
+            cache.stats.evictions += 1
+        while self._bytes > self.total_bytes and self._lru:
+            name, key = next(iter(self._lru))
+            victim = self._caches[name]
+            self._remove_locked(victim, key)
+            victim.stats.evictions += 1
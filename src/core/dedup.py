@@ -0,0 +1,141 @@
+import zlib
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..utils.tokenizer import Tokenizer
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+class DuplicateDetector:
+    """
+    Поиск точных и почти-дубликатов документов при индексации (MinHash + LSH)
+    
+    Память ограничена и не растет с размером корпуса, кроме списка идентификаторов:
+    таблицы LSH и таблица хешей содержимого - массивы фиксированного размера с прямой
+    адресацией (коллизия вытесняет старую запись), а сигнатуры хранятся в кольцевом буфере
+    на последние window документов. Поэтому почти-дубликат документа, ушедшего из окна,
+    может быть не найден - это плата за ограниченную память.
+    """
+    
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3,
+                 threshold: float = 0.8, table_bits: int = 20, window: int = 65536, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm должно делиться на bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.window = window
+        self.logger = logging.getLogger(__name__)
+        
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+        
+        self._table_mask = (1 << table_bits) - 1
+        # Порядковый номер документа + 1 (0 - пустая ячейка)
+        self._band_tables = np.zeros((bands, 1 << table_bits), dtype=np.int32)
+        self._content_keys = np.zeros(1 << table_bits, dtype=np.uint64)
+        self._content_docs = np.zeros(1 << table_bits, dtype=np.int32)
+        self._signatures = np.zeros((window, num_perm), dtype=np.uint32)
+        
+        self._ids: List[str] = []
+        self.clusters: Dict[str, List[str]] = {}
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+    
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        tokens = Tokenizer.tokenize(text)
+        if len(tokens) < self.shingle_size:
+            shingles = tokens or ['']
+        else:
+            shingles = [' '.join(tokens[i:i + self.shingle_size])
+                        for i in range(len(tokens) - self.shingle_size + 1)]
+        return np.unique(np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles),
+                                     dtype=np.uint64, count=len(shingles)))
+    
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash-сигнатура текста по шинглам из shingle_size слов
+        
+        Args:
+            text: Текст документа
+        
+        Returns:
+            np.ndarray: Сигнатура длины num_perm (uint32)
+        """
+        hashes = self._shingle_hashes(text)
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        # Обрабатываем шинглы порциями, чтобы матрица num_perm x порция оставалась небольшой
+        for start in range(0, len(hashes), 4096):
+            chunk = hashes[start:start + 4096]
+            values = (self._a[:, None] * chunk[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+            np.minimum(signature, values.min(axis=1), out=signature)
+        return (signature & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    
+    def _band_slots(self, signature: np.ndarray) -> np.ndarray:
+        bands = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        keys = np.zeros(self.bands, dtype=np.uint64)
+        for row in range(self.rows):
+            keys = keys * _BAND_MULTIPLIER + bands[:, row]
+        return (keys & np.uint64(self._table_mask)).astype(np.int64)
+    
+    def _signature_of(self, ordinal: int) -> Optional[np.ndarray]:
+        if len(self._ids) - ordinal > self.window:
+            return None
+        return self._signatures[ordinal % self.window]
+    
+    def check(self, doc_id: str, text: str) -> Optional[str]:
+        """
+        Проверка документа и его регистрация
+        
+        Args:
+            doc_id: Идентификатор документа
+            text: Текст документа
+        
+        Returns:
+            Optional[str]: Идентификатор ранее встреченного документа-оригинала или None
+        """
+        ordinal = len(self._ids)
+        self._ids.append(doc_id)
+        
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+        content_key = np.uint64(int.from_bytes(digest, 'little') | 1)
+        content_slot = int(content_key) & self._table_mask
+        if self._content_keys[content_slot] == content_key:
+            self.exact_duplicates += 1
+            return self._register(doc_id, int(self._content_docs[content_slot]))
+        self._content_keys[content_slot] = content_key
+        self._content_docs[content_slot] = ordinal
+        
+        signature = self.signature(text)
+        self._signatures[ordinal % self.window] = signature
+        slots = self._band_slots(signature)
+        
+        candidates = self._band_tables[np.arange(self.bands), slots]
+        for candidate in np.unique(candidates[candidates > 0]) - 1:
+            candidate_signature = self._signature_of(int(candidate))
+            if candidate_signature is None:
+                continue
+            if np.mean(candidate_signature == signature) >= self.threshold:
+                self.near_duplicates += 1
+                return self._register(doc_id, int(candidate))
+        
+        self._band_tables[np.arange(self.bands), slots] = ordinal + 1
+        return None
+    
+    def _register(self, doc_id: str, canonical_ordinal: int) -> str:
+        canonical = self._ids[canonical_ordinal]
+        self.clusters.setdefault(canonical, []).append(doc_id)
+        self.logger.debug(f"Дубликат: {doc_id} -> {canonical}")
+        return canonical
+    
+    def memory_bytes(self) -> int:
+        """Размер фиксированных структур детектора в байтах"""
+        return (self._band_tables.nbytes + self._content_keys.nbytes
+                + self._content_docs.nbytes + self._signatures.nbytes)
@@ -0,0 +1,142 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Границы корзин размера для фасета size (байты)
+SIZE_BUCKETS = ((10 * 1024, '<10KB'), (100 * 1024, '10-100KB'), (1024 * 1024, '100KB-1MB'),
+                (10 * 1024 * 1024, '1-10MB'), (None, '>10MB'))
+
+@dataclass
+class DocFilter:
+    """Фильтр документов по метаданным (пустые поля не ограничивают выборку)"""
+    path_prefix: Optional[str] = None
+    extensions: Optional[Tuple[str, ...]] = None
+    min_size: Optional[int] = None
+    max_size: Optional[int] = None
+    modified_after: Optional[float] = None
+    modified_before: Optional[float] = None
+    
+    def is_empty(self) -> bool:
+        return all(value is None for value in (self.path_prefix, self.extensions, self.min_size,
+                                               self.max_size, self.modified_after, self.modified_before))
+
+class _Categorical:
+    """Столбец строк в виде кодов и словаря значений"""
+    
+    def __init__(self, values: Iterable[str]):
+        codes: Dict[str, int] = {}
+        self.codes = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int32)
+        self.values: List[str] = list(codes)
+    
+    def mask(self, predicate) -> np.ndarray:
+        """Битовая маска документов, значение которых удовлетворяет условию"""
+        matches = np.fromiter((bool(predicate(value)) for value in self.values), dtype=bool,
+                              count=len(self.values))
+        return matches[self.codes] if len(self.codes) else np.zeros(0, dtype=bool)
+    
+    def counts(self, rows: np.ndarray) -> Dict[str, int]:
+        counts = np.bincount(self.codes[rows], minlength=len(self.values))
+        order = np.argsort(-counts, kind='stable')
+        return {self.values[i]: int(counts[i]) for i in order if counts[i]}
+
+class DocValues:
+    """
+    Столбцы метаданных документов (doc values): каталог, расширение, размер, время изменения
+    
+    Строки столбцов идут в порядке документов снимка индекса (как в DocumentVectors), поэтому
+    фильтр превращается в битовую маску, которую можно наложить на оценки до ранжирования.
+    """
+    
+    def __init__(self, doc_ids: List[str], directories: Iterable[str], extensions: Iterable[str],
+                 sizes: np.ndarray, mtimes: np.ndarray, version: Optional[int] = None):
+        self.doc_ids = doc_ids
+        self.rows = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self.directories = _Categorical(directories)
+        self.extensions = _Categorical(extensions)
+        self.sizes = sizes
+        self.mtimes = mtimes
+        self.version = version
+    
+    @classmethod
+    def build(cls, index) -> 'DocValues':
+        """
+        Построение столбцов по индексу (финализация)
+        
+        Args:
+            index: Индекс или его снимок
+        
+        Returns:
+            DocValues: Столбцы метаданных
+        """
+        documents = list(index.documents.values())
+        paths = [doc.path or doc.id for doc in documents]
+        return cls([doc.id for doc in documents],
+                   (os.path.dirname(path) for path in paths),
+                   (os.path.splitext(path)[1].lower() for path in paths),
+                   np.fromiter((doc.size for doc in documents), dtype=np.int64, count=len(documents)),
+                   np.fromiter((doc.mtime for doc in documents), dtype=np.float64, count=len(documents)),
+                   getattr(index, 'version', None))
+    
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+    
+    def mask(self, doc_filter: DocFilter) -> np.ndarray:
+        """
+        Битовая маска документов, прошедших фильтр
+        
+        Args:
+            doc_filter: Фильтр
+        
+        Returns:
+            np.ndarray: Маска (bool) в порядке doc_ids
+        """
+        mask = np.ones(len(self.doc_ids), dtype=bool)
+        if doc_filter.path_prefix:
+            prefix = doc_filter.path_prefix.replace(os.sep, '/').strip('/')
+            # Условие проверяется один раз на каталог, а не на документ
+            mask &= self.directories.mask(lambda directory: directory == prefix
+                                          or directory.startswith(prefix + '/'))
+        if doc_filter.extensions:
+            extensions = {('.' + ext.lstrip('.')).lower() for ext in doc_filter.extensions}
+            mask &= self.extensions.mask(lambda extension: extension in extensions)
+        if doc_filter.min_size is not None:
+            mask &= self.sizes >= doc_filter.min_size
+        if doc_filter.max_size is not None:
+            mask &= self.sizes <= doc_filter.max_size
+        if doc_filter.modified_after is not None:
+            mask &= self.mtimes >= doc_filter.modified_after
+        if doc_filter.modified_before is not None:
+            mask &= self.mtimes < doc_filter.modified_before
+        return mask
+    
+    def allowed_ids(self, mask: np.ndarray) -> set:
+        """Идентификаторы документов, отмеченных в маске"""
+        return {self.doc_ids[i] for i in np.flatnonzero(mask)}
+    
+    def facets(self, rows: np.ndarray) -> Dict[str, Dict[str, int]]:
+        """
+        Фасеты по набору документов
+        
+        Args:
+            rows: Номера документов (например, все совпавшие с запросом)
+        
+        Returns:
+            Dict[str, Dict[str, int]]: Поле -> значение -> количество (по убыванию количества)
+        """
+        size_edges = np.array([edge for edge, _ in SIZE_BUCKETS[:-1]], dtype=np.int64)
+        size_counts = np.bincount(np.searchsorted(size_edges, self.sizes[rows], side='right'),
+                                  minlength=len(SIZE_BUCKETS))
+        months: Dict[str, int] = {}
+        for mtime in self.mtimes[rows]:
+            if mtime:
+                month = time.strftime('%Y-%m', time.localtime(mtime))
+                months[month] = months.get(month, 0) + 1
+        return {
+            'directory': self.directories.counts(rows),
+            'extension': self.extensions.counts(rows),
+            'size': {label: int(count) for (_, label), count in zip(SIZE_BUCKETS, size_counts) if count},
+            'modified': dict(sorted(months.items(), reverse=True)),
+        }
@@ -0,0 +1,175 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from ..models.document import SearchResult
+from .cache_manager import CacheManager
+from .index_manager import IndexManager
+from .index_storage import IndexReader
+from .search_manager import SearchManager
+from .term_stats import estimate_memory
+
+@dataclass
+class FederatedResult(SearchResult):
+    """Результат федеративного поиска: score нормирован по индексу, raw_score - исходная оценка"""
+    index: str = ''
+    raw_score: float = 0.0
+
+def merge_results(per_index: Iterable[Tuple[str, List[SearchResult]]], limit: int) -> List[FederatedResult]:
+    """
+    Слияние выдач нескольких индексов в один список
+    
+    Оценки разных индексов несравнимы (idf зависит от коллекции), поэтому каждая выдача
+    делится на свою лучшую оценку (лучший документ каждого индекса получает 1.0).
+    При равных оценках порядок - по имени индекса и идентификатору документа.
+    
+    Args:
+        per_index: Пары (имя индекса, выдача в порядке убывания оценки)
+        limit: Максимальное количество результатов
+    
+    Returns:
+        List[FederatedResult]: Общая выдача
+    """
+    merged = []
+    for name, results in per_index:
+        top = max((result.score for result in results), default=0.0)
+        for result in results:
+            score = result.score / top if top > 0 else 0.0
+            merged.append(FederatedResult(result.document, score, result.snippet, name, result.score))
+    merged.sort(key=lambda result: (-result.score, result.index, result.document.id))
+    return merged[:limit]
+
+class IndexRegistry:
+    """
+    Реестр именованных индексов (коллекций) для поиска по нескольким из них одним запросом
+    
+    Индекс загружается при первом запросе к нему. Загруженные индексы хранятся в собственном
+    CacheManager с бюджетом памяти (размер оценивается по заголовку файла, см. term_stats.estimate_memory),
+    поэтому при превышении бюджета из памяти вытесняются индексы, к которым дольше всего не обращались.
+    Запрос, уже выполняющийся по вытесненному индексу, дорабатывает со своей ссылкой на него.
+    Индекс больше всего бюджета в кэш не помещается: он держится отдельно (с предупреждением)
+    до загрузки другого индекса, чтобы запросы к нему подряд не загружали его заново.
+    """
+    
+    def __init__(self, memory_budget: int = 1024 * 1024 * 1024, max_workers: Optional[int] = None):
+        """
+        Args:
+            memory_budget: Бюджет памяти загруженных индексов, байт
+            max_workers: Потоков для параллельного поиска (по умолчанию - по числу индексов в запросе)
+        """
+        self.max_workers = max_workers
+        self._paths: Dict[str, str] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._cache = CacheManager(memory_budget).cache('indexes')
+        # Последний загруженный индекс больше бюджета: (имя, поиск)
+        self._oversized: Optional[Tuple[str, SearchManager]] = None
+        self.logger = logging.getLogger(__name__)
+    
+    def register(self, name: str, filepath: str) -> None:
+        """Регистрация файла индекса под именем (загружается при первом запросе)"""
+        self._paths[name] = filepath
+        self._load_locks.setdefault(name, threading.Lock())
+        self._cache.pop(name)
+        if self._oversized is not None and self._oversized[0] == name:
+            self._oversized = None
+    
+    def discover(self, directory: str, suffix: str = '.idx') -> List[str]:
+        """
+        Регистрация всех файлов индексов каталога; имя индекса - имя файла без расширения
+        
+        Returns:
+            List[str]: Зарегистрированные имена
+        """
+        names = []
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(suffix):
+                names.append(filename[:-len(suffix)])
+                self.register(names[-1], os.path.join(directory, filename))
+        return names
+    
+    @property
+    def names(self) -> List[str]:
+        return list(self._paths)
+    
+    @property
+    def loaded(self) -> List[str]:
+        """Имена индексов, находящихся в памяти"""
+        oversized = self._oversized
+        return [name for name in self._paths
+                if name in self._cache or (oversized is not None and oversized[0] == name)]
+    
+    def get(self, name: str) -> SearchManager:
+        """
+        Поиск по индексу с данным именем (загрузка, если его нет в памяти)
+        
+        Args:
+            name: Имя индекса
+        
+        Returns:
+            SearchManager: Поиск по индексу
+        """
+        if name not in self._paths:
+            raise ValueError(f"Неизвестный индекс: {name}")
+        search = self._resident(name)
+        if search is not None:
+            return search
+        with self._load_locks[name]:
+            search = self._resident(name)
+            if search is None:
+                search = self._load(name)
+        return search
+    
+    def _resident(self, name: str) -> Optional[SearchManager]:
+        oversized = self._oversized
+        if oversized is not None and oversized[0] == name:
+            return oversized[1]
+        return self._cache.get(name)
+    
+    def _load(self, name: str) -> SearchManager:
+        filepath = self._paths[name]
+        with IndexReader(filepath) as reader:
+            size = sum(estimate_memory(reader.header).values())
+        manager = IndexManager()
+        manager.load_index(filepath)
+        # Без кэша результатов: у каждого индекса свой SearchManager
+        search = SearchManager(manager.index, vectors=manager.vectors, similarity=manager.similarity,
+                               doc_values=manager.doc_values, impacts=manager.impacts)
+        if size > self._cache.budget:
+            self.logger.warning(f"Индекс {name} ({size / (1024 * 1024):.1f} МБ) больше бюджета памяти реестра: "
+                                f"он хранится вне бюджета до загрузки другого индекса")
+            self._oversized = (name, search)
+        else:
+            # Память нужна новому индексу: индекс вне бюджета больше не держим
+            self._oversized = None
+            self._cache.put(name, search, size)
+        self.logger.info(f"Индекс {name} загружен: {filepath} (оценка памяти {size / (1024 * 1024):.1f} МБ, "
+                         f"в памяти: {', '.join(self.loaded) or '-'})")
+        return search
+    
+    def search(self, query: str, names: Optional[Sequence[str]] = None, limit: int = 10) -> List[FederatedResult]:
+        """
+        Поиск по нескольким индексам параллельно с нормировкой и слиянием оценок
+        
+        Args:
+            query: Поисковый запрос
+            names: Имена индексов (по умолчанию - все зарегистрированные)
+            limit: Максимальное количество результатов
+        
+        Returns:
+            List[FederatedResult]: Общая выдача
+        """
+        names = list(names) if names else self.names
+        for name in names:
+            if name not in self._paths:
+                raise ValueError(f"Неизвестный индекс: {name}")
+        if not names:
+            return []
+        
+        def search_one(name: str) -> Tuple[str, List[SearchResult]]:
+            return name, self.get(name).search(query, limit)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(names)) as executor:
+            per_index = list(executor.map(search_one, names))
+        return merge_results(per_index, limit)
@@ -0,0 +1,77 @@
+from typing import Dict, List, Tuple
+
+from ..models.document import Document
+from ..utils.tokenizer import Tokenizer
+
+# Короткие поля документа с отдельными постингами; тело документа индексируется в index.terms
+FIELDS = ('path', 'title')
+
+# Веса полей по умолчанию: совпадение в имени файла - самый сильный сигнал
+DEFAULT_BOOSTS = {'body': 1.0, 'title': 2.0, 'path': 4.0}
+
+# Заголовок - первая непустая строка, не длиннее стольких символов
+TITLE_MAX_CHARS = 200
+
+def field_tokens(doc: Document) -> Dict[str, List[str]]:
+    """
+    Токены коротких полей документа
+    
+    Args:
+        doc: Документ
+    
+    Returns:
+        Dict[str, List[str]]: path - части пути (каталоги, имя, расширение; слова через
+            подчеркивание - и целиком, и по частям), title - слова первой непустой строки
+    """
+    path = []
+    for token in Tokenizer.tokenize(doc.path or doc.id):
+        path.append(token)
+        if '_' in token:
+            path.extend(part for part in token.split('_') if part)
+    title = next((line for line in doc.text.splitlines() if line.strip()), '')[:TITLE_MAX_CHARS]
+    return {'path': path, 'title': Tokenizer.tokenize(title)}
+
+def index_fields(field_terms: Dict[str, Dict[str, Tuple[int, ...]]],
+                 field_lengths: Dict[str, Tuple[int, ...]], doc: Document, postings_for=None) -> None:
+    """
+    Добавление полей документа в постинги полей
+    
+    Постинги полей термина хранят частоты всех коротких полей одним кортежем (в порядке FIELDS),
+    поэтому ранжирование проходит по ним один раз на термин.
+    
+    Args:
+        field_terms: Термин -> doc_id -> частоты по полям
+        field_lengths: doc_id -> длины полей
+        doc: Документ
+        postings_for: Функция термин -> изменяемые постинги (по умолчанию - field_terms.setdefault)
+    """
+    tokens = field_tokens(doc)
+    field_lengths[doc.id] = tuple(len(tokens[field]) for field in FIELDS)
+    freqs: Dict[str, List[int]] = {}
+    for i, field in enumerate(FIELDS):
+        for token in tokens[field]:
+            freqs.setdefault(token, [0] * len(FIELDS))[i] += 1
+    for term, counts in freqs.items():
+        postings = postings_for(term) if postings_for else field_terms.setdefault(term, {})
+        postings[doc.id] = tuple(counts)
+
+def parse_boosts(specs: List[str]) -> Dict[str, float]:
+    """
+    Разбор весов полей вида ПОЛЕ=ВЕС (остальные поля - по умолчанию)
+    
+    Args:
+        specs: Строки ПОЛЕ=ВЕС
+    
+    Returns:
+        Dict[str, float]: Веса body, title и path
+    """
+    boosts = dict(DEFAULT_BOOSTS)
+    for spec in specs:
+        field, _, weight = spec.partition('=')
+        if field not in boosts:
+            raise ValueError(f"Неизвестное поле: {field} (доступны: {', '.join(boosts)})")
+        try:
+            boosts[field] = float(weight)
+        except ValueError:
+            raise ValueError(f"Неверный вес поля: {spec} (ожидается ПОЛЕ=ЧИСЛО)")
+    return boosts
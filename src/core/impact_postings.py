@@ -0,0 +1,146 @@
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .vectors import DocumentVectors
+
+class ImpactOrderedPostings:
+    """
+    Постинги, упорядоченные по вкладу документа в оценку термина (impact)
+    
+    Оценка документа - сумма вес_термина * impact(термин, документ): для TF-IDF impact = tf / длина
+    документа, для косинуса - вес TF-IDF, деленный на норму документа. Списки каждого термина
+    хранятся дважды: по убыванию impact (последовательное чтение с ранней остановкой) и
+    по номерам документов (произвольный доступ к impact документа двоичным поиском).
+    Булевы запросы по-прежнему используют постинги индекса в порядке документов.
+    """
+    
+    def __init__(self, doc_ids: List[str], vocabulary: Dict[str, int], indptr: np.ndarray,
+                 rows: np.ndarray, impacts: np.ndarray, kind: str, version: Optional[int] = None):
+        """
+        Args:
+            doc_ids: Идентификаторы документов по номерам
+            vocabulary: Термин -> номер списка
+            indptr: Границы списков терминов
+            rows: Номера документов (внутри списка по возрастанию)
+            impacts: Вклады, выровненные с rows
+            kind: Функция оценки, для которой посчитаны вклады (tfidf или cosine)
+            version: Версия индекса
+        """
+        self.doc_ids = doc_ids
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.rows = rows
+        self.impacts = impacts
+        self.kind = kind
+        self.version = version
+        
+        # Сортировка по (термин, -impact) сразу для всех списков
+        terms = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        order = np.lexsort((-impacts, terms))
+        self.impact_rows = rows[order]
+        self.impact_values = impacts[order]
+    
+    @classmethod
+    def from_index(cls, index) -> 'ImpactOrderedPostings':
+        """
+        Вклады для TF-IDF ранжирования (tf / длина документа)
+        
+        Args:
+            index: Индекс или его снимок
+        
+        Returns:
+            ImpactOrderedPostings: Постинги по вкладу
+        """
+        doc_ids = list(index.documents)
+        rows = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        col_rows: List[int] = []
+        col_impacts: List[float] = []
+        for term in sorted(index.terms):
+            postings = sorted((rows[doc_id], tf / index.documents[doc_id].term_count)
+                              for doc_id, tf in index.terms[term].items() if doc_id in rows)
+            if not postings:
+                continue
+            vocabulary[term] = len(vocabulary)
+            col_rows.extend(row for row, _ in postings)
+            col_impacts.extend(impact for _, impact in postings)
+            indptr.append(len(col_rows))
+        return cls(doc_ids, vocabulary, np.array(indptr, dtype=np.int64), np.array(col_rows, dtype=np.int32),
+                   np.array(col_impacts, dtype=np.float64), 'tfidf', getattr(index, 'version', None))
+    
+    @classmethod
+    def from_vectors(cls, vectors: DocumentVectors) -> 'ImpactOrderedPostings':
+        """
+        Вклады для косинусного ранжирования (вес TF-IDF / норма документа) по столбцам векторов
+        
+        Args:
+            vectors: Векторы документов
+        
+        Returns:
+            ImpactOrderedPostings: Постинги по вкладу
+        """
+        impacts = vectors.col_data / vectors.norms[vectors.col_indices]
+        return cls(vectors.doc_ids, vectors.vocabulary, vectors.col_indptr, vectors.col_indices,
+                   impacts, 'cosine', vectors.version)
+    
+    def _scores(self, terms: Sequence[Tuple[int, float]], candidates: np.ndarray) -> np.ndarray:
+        """Полные оценки кандидатов (произвольный доступ к спискам в порядке документов)"""
+        scores = np.zeros(len(candidates), dtype=np.float64)
+        for col, weight in terms:
+            start, end = self.indptr[col], self.indptr[col + 1]
+            postings = self.rows[start:end]
+            pos = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+            hit = postings[pos] == candidates
+            scores[hit] += weight * self.impacts[start + pos[hit]]
+        return scores
+    
+    def top_k(self, weights: Sequence[Tuple[str, float]], k: int,
+              mask: Optional[np.ndarray] = None) -> Tuple[Dict[int, float], int]:
+        """
+        Кандидаты top-k по пороговому алгоритму (Threshold Algorithm)
+        
+        Списки терминов читаются по убыванию вклада порциями растущего размера; новые документы
+        оцениваются полностью. Порог - сумма весов на вклады следующих непрочитанных позиций:
+        больше него непрочитанный документ набрать не может, поэтому чтение останавливается,
+        как только k-я оценка не ниже порога. Веса должны быть положительными.
+        
+        Args:
+            weights: Термины и их веса в оценке
+            k: Количество документов
+            mask: Документы, прошедшие фильтр (в порядке doc_ids)
+        
+        Returns:
+            Tuple[Dict[int, float], int]: Оценки прочитанных документов (среди них - весь top-k)
+                и количество прочитанных постингов
+        """
+        terms = [(self.vocabulary[term], weight) for term, weight in weights if term in self.vocabulary]
+        scores: Dict[int, float] = {}
+        if k <= 0 or not terms:
+            return scores, 0
+        
+        lengths = [int(self.indptr[col + 1] - self.indptr[col]) for col, _ in terms]
+        depth, step, scanned = 0, max(k, 16), 0
+        while depth < max(lengths):
+            threshold = 0.0
+            batch = []
+            for (col, weight), length in zip(terms, lengths):
+                start = self.indptr[col]
+                lo, hi = min(depth, length), min(depth + step, length)
+                batch.append(self.impact_rows[start + lo:start + hi])
+                if hi < length:
+                    threshold += weight * self.impact_values[start + hi]
+            
+            candidates = np.unique(np.concatenate(batch))
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+            scanned += sum(len(rows) for rows in batch) + len(candidates) * (len(terms) - 1)
+            scores.update(zip(candidates.tolist(), self._scores(terms, candidates).tolist()))
+            
+            depth += step
+            step *= 2
+            if len(scores) >= k and heapq.nlargest(k, scores.values())[-1] >= threshold:
+                break
+        return scores, scanned
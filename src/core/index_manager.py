@@ -1,18 +1,176 @@
+import os
+import sys
+import time
+import shutil
 import logging
-from typing import Dict, List
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
 from ..models.document import Document
-from ..utils.file_utils import FileUtils
+from ..utils.file_utils import FileUtils, IngestionStats
+from .ann import SimilarityIndex
+from .cache_manager import CacheManager
+from .dedup import DuplicateDetector
+from .doc_values import DocValues
+from .fields import field_tokens, index_fields
+from .impact_postings import ImpactOrderedPostings
+from .index_storage import IndexReader, IndexWriter, new_build_id, read_manifest, segment_name, write_manifest
+from .postings_cache import DiskIndex
+from .postings_codecs import available_codecs, get_codec
+from .pruning import PruningConfig
+from .spelling import SpellingSuggester
+from .vectors import DocumentVectors
+
+# Читатель, пришедший во время записи, берет последний снимок, если тот моложе стольких
+# длительностей копирования словарей: копирование занимает не больше ~1/10 времени записи
+SNAPSHOT_LAG_COPIES = 10
+
+class IndexSnapshot:
+    """
+    Неизменяемый снимок инвертированного индекса на момент времени.
+    Предоставляет тот же интерфейс для чтения, что и InvertedIndex (terms, documents, total_docs,
+    field_terms, field_lengths, build_id, version)
+    """
+    
+    def __init__(self, terms: Dict[str, Dict[str, int]], documents: Dict[str, Document],
+                 total_docs: int, version: int, field_terms: Dict[str, Dict[str, tuple]] = None,
+                 field_lengths: Dict[str, tuple] = None, build_id: Optional[str] = None):
+        self.terms = MappingProxyType(terms)
+        self.documents = MappingProxyType(documents)
+        self.total_docs = total_docs
+        self.version = version
+        self.build_id = build_id
+        self.field_terms = MappingProxyType(field_terms if field_terms is not None else {})
+        self.field_lengths = MappingProxyType(field_lengths if field_lengths is not None else {})
+    
+    def snapshot(self) -> 'IndexSnapshot':
+        return self
 
 class InvertedIndex:
-    """Инвертированный индекс для быстрого поиска"""
+    """
+    Инвертированный индекс для быстрого поиска
+    
+    Запись выполняется одним потоком-писателем, чтение - любым числом потоков через snapshot().
+    Снимок разделяет словари с индексом; первая запись после снимка копирует словари верхнего
+    уровня, а списки постингов копируются при первом изменении термина (copy-on-write).
+    Поэтому опубликованный снимок никогда не меняется и ранжирование по нему не требует блокировок.
+    Чтобы при поиске во время потоковой записи словари не копировались после каждого документа,
+    читатель, пришедший во время записи, не ждет ее и получает последний опубликованный снимок,
+    пока тот моложе SNAPSHOT_LAG_COPIES длительностей копирования; вне записи снимок всегда свежий.
     
-    def __init__(self):
+    Кроме тела документа (terms) индексируются короткие поля - путь и заголовок (см. fields):
+    field_terms хранит для термина частоты всех полей документа одним кортежем, field_lengths -
+    длины полей для нормировки. Если задан spelling, словарь исправлений пополняется вместе с индексом.
+    
+    Содержимое индекса однозначно задает пара (build_id, version): build_id новый у каждого
+    построенного индекса, а загруженный из файла индекс сохраняет build_id и версию файла
+    до первого изменения (кэши и курсоры страниц различают по ней разные индексы).
+    Если задан pruning, стоп-слова и отсеченные частые термины в постинги тела не попадают.
+    """
+    
+    def __init__(self, spelling: Optional[SpellingSuggester] = None, pruning: Optional[PruningConfig] = None):
         self.terms: Dict[str, Dict[str, int]] = {}
         self.documents: Dict[str, Document] = {}
+        self.field_terms: Dict[str, Dict[str, tuple]] = {}
+        self.field_lengths: Dict[str, tuple] = {}
+        self.spelling = spelling
+        self.pruning = pruning
         self.total_docs = 0
+        self.version = 0
+        self.build_id = new_build_id()
+        self._from_file = False
+        self._write_lock = threading.Lock()
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._published: Optional[IndexSnapshot] = None
+        self._published_at = 0.0
+        self._copy_time = 0.0
+        self._shared = False
+        self._owned_terms: Set[str] = set()
+        self._owned_field_terms: Set[str] = set()
+    
+    def snapshot(self) -> IndexSnapshot:
+        """Согласованный снимок индекса для чтения без блокировок"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        if not self._write_lock.acquire(blocking=False):
+            # Идет запись: не ждем ее, если последний снимок достаточно свежий
+            published = self._published
+            lag = time.perf_counter() - self._published_at
+            if published is not None and lag < self._copy_time * SNAPSHOT_LAG_COPIES:
+                return published
+            self._write_lock.acquire()
+        try:
+            if self._snapshot is None:
+                self._shared = True
+                self._snapshot = IndexSnapshot(self.terms, self.documents, self.total_docs, self.version,
+                                               self.field_terms, self.field_lengths, self.build_id)
+                self._published = self._snapshot
+                self._published_at = time.perf_counter()
+            return self._snapshot
+        finally:
+            self._write_lock.release()
+    
+    def _begin_write(self) -> None:
+        """Отделение от опубликованного снимка перед изменением (под блокировкой записи)"""
+        self._snapshot = None
+        if self._shared:
+            started = time.perf_counter()
+            self.terms = dict(self.terms)
+            self.documents = dict(self.documents)
+            self.field_terms = dict(self.field_terms)
+            self.field_lengths = dict(self.field_lengths)
+            self._owned_terms = set()
+            self._owned_field_terms = set()
+            self._shared = False
+            self._copy_time = time.perf_counter() - started
+        if self._from_file:
+            # Изменения расходятся с файлом: та же версия другого экземпляра значила бы другое содержимое
+            self.build_id = new_build_id()
+            self._from_file = False
+        self.version += 1
+    
+    def _own_postings(self, term: str) -> Dict[str, int]:
+        """Постинги термина, которые можно менять на месте"""
+        postings = self.terms.get(term)
+        if postings is None:
+            postings = {}
+        elif term in self._owned_terms:
+            return postings
+        else:
+            postings = dict(postings)
+        self.terms[term] = postings
+        self._owned_terms.add(term)
+        return postings
+    
+    def _own_field_postings(self, term: str) -> Dict[str, tuple]:
+        """Постинги полей термина, которые можно менять на месте"""
+        postings = self.field_terms.get(term)
+        if postings is None:
+            postings = {}
+        elif term in self._owned_field_terms:
+            return postings
+        else:
+            postings = dict(postings)
+        self.field_terms[term] = postings
+        self._owned_field_terms.add(term)
+        return postings
     
     def add_document(self, doc: Document) -> None:
         """Добавление документа в индекс"""
+        with self._write_lock:
+            self._begin_write()
+            self._add_document(doc)
+    
+    def add_documents(self, docs: Iterable[Document]) -> None:
+        """Пакетное добавление документов (одно отделение от снимка на пакет)"""
+        with self._write_lock:
+            self._begin_write()
+            for doc in docs:
+                self._add_document(doc)
+    
+    def _add_document(self, doc: Document) -> None:
         logger = logging.getLogger(__name__)
         
         self.documents[doc.id] = doc
@@ -26,42 +184,476 @@ class InvertedIndex:
         
         for term in terms:
             term_freq[term] = term_freq.get(term, 0) + 1
+        if self.pruning is not None:
+            excluded = self.pruning.excluded
+            term_freq = {term: freq for term, freq in term_freq.items() if term not in excluded}
         
         logger.debug(f"Найдено уникальных терминов: {len(term_freq)}")
         
         for term, freq in term_freq.items():
+            self._own_postings(term)[doc.id] = freq
+            if self.spelling is not None:
+                self.spelling.add_term(term)
+        
+        index_fields(self.field_terms, self.field_lengths, doc, self._own_field_postings)
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        Удаление документа из индекса
+        
+        Args:
+            doc_id: Идентификатор документа
+        
+        Returns:
+            bool: True, если документ был в индексе
+        """
+        with self._write_lock:
+            if doc_id not in self.documents:
+                return False
+            self._begin_write()
+            self._remove_document(doc_id)
+            return True
+    
+    def update_documents(self, remove: Iterable[str] = (), add: Iterable[Document] = ()) -> int:
+        """
+        Пакетное изменение: удаление и добавление документов одной записью
+        (одно отделение от снимка и одна новая версия на пакет)
+        
+        Args:
+            remove: Идентификаторы удаляемых документов (отсутствующие пропускаются)
+            add: Добавляемые документы (обновление - удаление старой версии и добавление новой)
+        
+        Returns:
+            int: Количество удаленных документов
+        """
+        with self._write_lock:
+            self._begin_write()
+            removed = 0
+            for doc_id in remove:
+                if doc_id in self.documents:
+                    self._remove_document(doc_id)
+                    removed += 1
+            for doc in add:
+                self._add_document(doc)
+            return removed
+    
+    def prune_terms(self, terms: Iterable[str]) -> int:
+        """
+        Удаление терминов из постингов тела (поля не меняются: они короткие и нужны для ранжирования)
+        
+        Args:
+            terms: Термины
+        
+        Returns:
+            int: Количество удаленных постингов
+        """
+        with self._write_lock:
+            self._begin_write()
+            removed = 0
+            for term in terms:
+                postings = self.terms.pop(term, None)
+                if postings is None:
+                    continue
+                self._owned_terms.discard(term)
+                removed += len(postings)
+                if self.spelling is not None:
+                    self.spelling.remove_term(term, len(postings))
+            return removed
+    
+    def _remove_document(self, doc_id: str) -> None:
+        doc = self.documents.pop(doc_id)
+        self.total_docs -= 1
+        
+        for term in set(doc.text.lower().split()):
             if term not in self.terms:
-                self.terms[term] = {}
-            self.terms[term][doc.id] = freq
+                continue
+            if self.spelling is not None:
+                self.spelling.remove_term(term)
+            postings = self._own_postings(term)
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.terms[term]
+                self._owned_terms.discard(term)
+        
+        self.field_lengths.pop(doc_id, None)
+        for term in {token for tokens in field_tokens(doc).values() for token in tokens}:
+            if term not in self.field_terms:
+                continue
+            postings = self._own_field_postings(term)
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.field_terms[term]
+                self._owned_field_terms.discard(term)
 
 class IndexManager:
     """Управление инвертированным индексом"""
     
-    def __init__(self):
-        self.index = InvertedIndex()
+    DEDUP_MODES = ('off', 'skip', 'cluster')
+    
+    def __init__(self, codec: str = 'varint', dedup: str = 'off', cache_manager: CacheManager = None,
+                 impact_ordered: bool = False, spelling: bool = False, pruning: Optional[PruningConfig] = None):
+        """
+        Args:
+            codec: Кодек постингов (varint, bitpack, eliasfano) или 'auto' -
+                выбор самого компактного по выборке постингов при построении
+            dedup: Обработка дубликатов при построении: off - индексировать все,
+                skip - пропускать точные и почти-дубликаты, cluster - индексировать,
+                но группировать дубликаты вокруг оригинала (см. duplicates)
+            cache_manager: Менеджер кэшей (кэш postings для индекса, оставленного на диске)
+            impact_ordered: При финализации строить постинги по вкладу для ранней
+                остановки коротких запросов (ImpactOrderedPostings)
+            spelling: Вести словарь исправлений опечаток (SpellingSuggester): пополняется
+                вместе с индексом и сохраняется рядом с файлом индекса
+            pruning: Отсечение стоп-слов и частых терминов при индексации (записывается
+                в метаданные файла индекса и применяется к запросам)
+        """
+        if codec != 'auto':
+            get_codec(codec)
+        if dedup not in self.DEDUP_MODES:
+            raise ValueError(f"Неизвестный режим дедупликации: {dedup}")
+        self.spelling = SpellingSuggester() if spelling else None
+        self.pruning = pruning
+        self.index = InvertedIndex(self.spelling, pruning)
+        self.codec = codec
+        self.dedup = dedup
+        self.cache_manager = cache_manager or CacheManager()
+        self.duplicate_detector: Optional[DuplicateDetector] = None
+        self.ingestion_stats: Optional[IngestionStats] = None
+        self.vectors: Optional[DocumentVectors] = None
+        self.doc_values: Optional[DocValues] = None
+        self.similarity: Optional[SimilarityIndex] = None
+        self.impact_ordered = impact_ordered
+        self.impacts: Optional[ImpactOrderedPostings] = None
         self.logger = logging.getLogger(__name__)
     
-    def build_from_directory(self, directory_path: str) -> None:
-        """Построение индекса из директории с текстовыми файлами"""
+    def build_from_directory(self, directory_path: str, workers: int = 1,
+                             checkpoint_path: Optional[str] = None, checkpoint_every: int = 1000,
+                             resume: bool = False) -> None:
+        """
+        Построение индекса из директории с текстовыми файлами
+        
+        Args:
+            directory_path: Путь к директории
+            workers: Количество потоков чтения файлов
+            checkpoint_path: Каталог контрольной точки: после каждой порции файлов в него
+                дописывается сегмент с ее документами и курсор обхода (None - без контрольных точек)
+            checkpoint_every: Файлов между контрольными точками
+            resume: Продолжить построение с контрольной точки, если она есть
+                (иначе прежняя контрольная точка удаляется)
+        """
         self.logger.info(f"Начало индексации директории: {directory_path}")
         
-        documents = FileUtils.read_documents_from_directory(directory_path)
-        self.logger.info(f"Загружено документов для индексации: {len(documents)}")
+        self.ingestion_stats = IngestionStats()
+        cursor = None
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            if resume:
+                cursor = self._resume_checkpoint(checkpoint_path, directory_path)
+            else:
+                self.remove_checkpoint(checkpoint_path)
+        
+        batch_files = checkpoint_every if checkpoint_path else sys.maxsize
+        batches = FileUtils.iter_document_batches(directory_path, batch_files=batch_files, workers=workers,
+                                                  stats=self.ingestion_stats, start_after=cursor)
+        for cursor, documents in batches:
+            if self.dedup != 'off':
+                documents = self._filter_duplicates(documents)
+            self.index.add_documents(documents)
+            if checkpoint_path:
+                self.save_checkpoint(checkpoint_path, directory_path, documents, cursor)
         
-        if not documents:
+        if not self.index.total_docs:
             self.logger.warning("Не найдено документов для индексации!")
             return
-        
-        for doc in documents:
-            self.index.add_document(doc)
             
+        self.prune_high_df()
         self.logger.info(f"Индексация завершена. Документов в индексе: {self.index.total_docs}")
         self.logger.info(f"Уникальных терминов в индексе: {len(self.index.terms)}")
+        
+        if self.codec == 'auto':
+            self.codec = self.choose_codec()
+            self.logger.info(f"Выбран кодек постингов: {self.codec}")
+        
+        self.finalize()
+    
+    def save_checkpoint(self, checkpoint_path: str, directory_path: str, documents: List[Document],
+                        cursor: Optional[str]) -> None:
+        """
+        Контрольная точка построения в формате сегментированного индекса: документы порции
+        дописываются в каталог новым сегментом, курсор обхода и статистика чтения - в манифест,
+        который заменяется атомарно. Объем записи пропорционален порции, а не всему индексу;
+        сегменты сливаются один раз - при продолжении построения
+        
+        Args:
+            checkpoint_path: Каталог контрольной точки
+            directory_path: Индексируемая директория
+            documents: Документы порции, уже добавленные в индекс
+            cursor: Путь (от корня) последнего обработанного файла
+        """
+        os.makedirs(checkpoint_path, exist_ok=True)
+        manifest = read_manifest(checkpoint_path) or {'segments': [], 'next_segment': 1}
+        batch = self._batch_index(documents)
+        if batch.total_docs:
+            name = segment_name(manifest['next_segment'])
+            codec = 'varint' if self.codec == 'auto' else self.codec
+            IndexWriter(get_codec(codec)).write(batch, os.path.join(checkpoint_path, name))
+            manifest['segments'].append(name)
+            manifest['next_segment'] += 1
+        
+        stats = self.ingestion_stats or IngestionStats()
+        manifest['checkpoint'] = {
+            'directory': os.path.abspath(directory_path),
+            'cursor': cursor,
+            'stats': {'files': stats.files, 'bytes': stats.bytes, 'skipped': stats.skipped,
+                      'errors': stats.errors, 'elapsed': stats.elapsed},
+        }
+        write_manifest(checkpoint_path, manifest)
+        self.logger.info(f"Контрольная точка: {checkpoint_path} (документов: {self.index.total_docs}, "
+                         f"сегментов: {len(manifest['segments'])}, последний файл: {cursor})")
+    
+    def _batch_index(self, documents: List[Document]) -> InvertedIndex:
+        """Часть индекса с документами порции (постинги берутся из построенного индекса)"""
+        batch = InvertedIndex(pruning=self.index.pruning)
+        for doc in documents:
+            if doc.id not in self.index.documents:
+                continue
+            batch.documents[doc.id] = doc
+            for term in set(doc.text.lower().split()):
+                postings = self.index.terms.get(term)
+                if postings is not None and doc.id in postings:
+                    batch.terms.setdefault(term, {})[doc.id] = postings[doc.id]
+        batch.total_docs = len(batch.documents)
+        return batch
+    
+    def _resume_checkpoint(self, checkpoint_path: str, directory_path: str) -> Optional[str]:
+        """Восстановление частичного индекса с контрольной точки; возвращает курсор обхода"""
+        manifest = read_manifest(checkpoint_path) if os.path.isdir(checkpoint_path) else None
+        checkpoint = manifest.get('checkpoint') if manifest else None
+        if checkpoint is None:
+            raise ValueError(f"Каталог не является контрольной точкой: {checkpoint_path}")
+        if checkpoint['directory'] != os.path.abspath(directory_path):
+            raise ValueError(f"Контрольная точка относится к другой директории: {checkpoint['directory']}")
+        # Сегменты порций сливаются в индекс в памяти (один раз за построение)
+        index = None
+        for name in manifest['segments']:
+            with IndexReader(os.path.join(checkpoint_path, name)) as reader:
+                index = self._read_index(reader, index)
+        if index is not None:
+            self.index = index
+            self.pruning = index.pruning
+        self._attach_spelling()
+        
+        for name, value in checkpoint['stats'].items():
+            setattr(self.ingestion_stats, name, value)
+        if self.dedup != 'off':
+            # Сигнатуры уже проиндексированных документов, чтобы дубликаты искались по всему корпусу
+            self.duplicate_detector = DuplicateDetector()
+            for doc in self.index.documents.values():
+                self.duplicate_detector.check(doc.id, doc.text)
+        self.logger.info(f"Продолжение с контрольной точки {checkpoint_path}: документов {self.index.total_docs}, "
+                         f"сегментов: {len(manifest['segments'])}, последний файл: {checkpoint['cursor']}")
+        return checkpoint['cursor']
+    
+    @staticmethod
+    def remove_checkpoint(checkpoint_path: str) -> None:
+        """Удаление контрольной точки построения"""
+        if os.path.isdir(checkpoint_path):
+            shutil.rmtree(checkpoint_path)
+        elif os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+    
+    def prune_high_df(self) -> List[str]:
+        """
+        Отсечение терминов, встречающихся в большей доле документов, чем pruning.max_df_ratio:
+        постинги удаляются, а термины запоминаются в конфигурации и дальше не индексируются
+        
+        Returns:
+            List[str]: Отсеченные термины
+        """
+        if self.pruning is None:
+            return []
+        terms = self.pruning.high_df_terms(self.index)
+        if terms:
+            removed = self.index.prune_terms(terms)
+            self.pruning.add_pruned(terms)
+            self.logger.info(f"Отсечено частых терминов: {len(terms)}, постингов: {removed}")
+        return terms
+    
+    def finalize(self) -> DocumentVectors:
+        """
+        Финализация индекса: TF-IDF векторы документов (CSR) и их нормы для косинусного ранжирования,
+        столбцы метаданных для фильтров, постинги по вкладу (если включены).
+        После изменения индекса их нужно построить заново
+        
+        Returns:
+            DocumentVectors: Векторы документов
+        """
+        snapshot = self.index.snapshot()
+        self.vectors = DocumentVectors.build(snapshot)
+        self.doc_values = DocValues.build(snapshot)
+        self.similarity = None
+        self.impacts = ImpactOrderedPostings.from_vectors(self.vectors) if self.impact_ordered else None
+        self.logger.info(f"Векторы документов построены: {len(self.vectors)} документов, "
+                         f"{len(self.vectors.vocabulary)} терминов")
+        return self.vectors
+    
+    def _filter_duplicates(self, documents: List[Document]) -> List[Document]:
+        """Поиск дубликатов; в режиме skip дубликаты не попадают в индекс"""
+        if self.duplicate_detector is None:
+            self.duplicate_detector = DuplicateDetector()
+        detector = self.duplicate_detector
+        
+        unique = []
+        for doc in documents:
+            original = detector.check(doc.id, doc.text)
+            if original is None or self.dedup == 'cluster':
+                unique.append(doc)
+        
+        self.logger.info(f"Дубликатов найдено: точных {detector.exact_duplicates}, "
+                         f"почти-дубликатов {detector.near_duplicates}")
+        return unique
+    
+    @property
+    def duplicates(self) -> Dict[str, List[str]]:
+        """Группы дубликатов: оригинал -> список дубликатов"""
+        return self.duplicate_detector.clusters if self.duplicate_detector else {}
+    
+    def build_similarity_index(self, dim: int = 64, n_lists: Optional[int] = None,
+                               n_probe: int = 8) -> SimilarityIndex:
+        """
+        Офлайн-построение индекса похожих документов (сохраняется рядом с файлом индекса)
+        
+        Args:
+            dim: Размерность случайной проекции
+            n_lists: Количество кластеров IVF (по умолчанию ~sqrt(N))
+            n_probe: Кластеров, просматриваемых при поиске
+            
+        Returns:
+            SimilarityIndex: Построенный индекс
+        """
+        vectors = self.vectors or self.finalize()
+        self.similarity = SimilarityIndex.build(vectors, dim=dim, n_lists=n_lists, n_probe=n_probe)
+        return self.similarity
+    
+    def choose_codec(self, sample_terms: int = 1000) -> str:
+        """
+        Выбор самого компактного кодека по выборке самых длинных списков постингов
+        
+        Args:
+            sample_terms: Количество терминов в выборке
+            
+        Returns:
+            str: Имя кодека
+        """
+        terms = sorted(self.index.terms, key=lambda t: len(self.index.terms[t]), reverse=True)[:sample_terms]
+        ordinals = {doc_id: i for i, doc_id in enumerate(self.index.documents)}
+        sizes = {}
+        
+        samples = []
+        for term in terms:
+            postings = sorted((ordinals[doc_id], tf) for doc_id, tf in self.index.terms[term].items())
+            samples.append((np.array([p[0] for p in postings], dtype=np.uint64),
+                            np.array([p[1] for p in postings], dtype=np.uint64)))
+        
+        for name in available_codecs():
+            writer = IndexWriter(get_codec(name))
+            sizes[name] = sum(len(writer.encode_postings(doc_ords, freqs)) for doc_ords, freqs in samples)
+            
+        return min(sizes, key=sizes.get)
+    
+    @staticmethod
+    def _read_index(reader: IndexReader, into: Optional['InvertedIndex'] = None) -> 'InvertedIndex':
+        """
+        Чтение всего файла индекса в память
+        
+        Args:
+            reader: Открытый файл индекса
+            into: Индекс, в который дописываются документы файла (сегменты с разными документами)
+        """
+        index = into
+        if index is None:
+            index = InvertedIndex(pruning=PruningConfig.from_header(reader.header))
+            index.build_id, index.version, index._from_file = reader.build_id, reader.version, True
+        doc_ids = []
+        for doc in reader.iter_documents():
+            index.documents[doc.id] = doc
+            doc_ids.append(doc.id)
+            # Постинги полей не хранятся в файле: поля короткие и восстанавливаются по документам
+            index_fields(index.field_terms, index.field_lengths, doc)
+        index.total_docs += reader.total_docs
+        
+        for term in reader.dictionary:
+            doc_ords, freqs = reader.read_postings(term)
+            index.terms.setdefault(term, {}).update(
+                (doc_ids[i], int(f)) for i, f in zip(doc_ords.tolist(), freqs.tolist()))
+        return index
+    
+    def _attach_spelling(self, filepath: Optional[str] = None) -> None:
+        """
+        Словарь исправлений для текущего индекса: загрузка сохраненного рядом с файлом индекса,
+        если он соответствует словарю индекса, иначе построение заново
+        """
+        if self.spelling is None:
+            return
+        spelling_path = SpellingSuggester.path_for(filepath) if filepath else None
+        spelling = None
+        if spelling_path and os.path.exists(spelling_path):
+            spelling = SpellingSuggester.load(spelling_path)
+            if set(spelling.counts) != {term for term in self.index.terms if term.isalpha()}:
+                self.logger.warning(f"Словарь исправлений не соответствует индексу: {spelling_path}")
+                spelling = None
+        self.spelling = spelling or SpellingSuggester.build(self.index)
+        if isinstance(self.index, InvertedIndex):
+            self.index.spelling = self.spelling
     
     def save_index(self, filepath: str) -> None:
         """Сохранение индекса в файл"""
-        # ... существующий код ...
+        codec = 'varint' if self.codec == 'auto' else self.codec
+        IndexWriter(get_codec(codec)).write(self.index, filepath)
+        if self.similarity is not None:
+            self.similarity.save(SimilarityIndex.path_for(filepath))
+        if self.spelling is not None:
+            self.spelling.save(SpellingSuggester.path_for(filepath))
+        self.logger.info(f"Индекс сохранен: {filepath} (кодек: {codec})")
     
-    def load_index(self, filepath: str) -> None:
-        """Загрузка индекса из файла"""
-        # ... существующий код ...
+    def load_index(self, filepath: str, lazy: bool = False, pinned_terms: Iterable[str] = ()) -> None:
+        """
+        Загрузка индекса из файла
+        
+        Args:
+            filepath: Путь к файлу индекса
+            lazy: Оставить постинги на диске и декодировать их поблочно по запросу
+                через кэш postings (векторы для косинусного ранжирования не строятся)
+            pinned_terms: Термины, блоки которых закрепляются в кэше и декодируются сразу
+                (например, самые частые в журнале запросов)
+        """
+        if lazy:
+            index = DiskIndex(IndexReader(filepath), self.cache_manager.cache('postings', 64 * 1024 * 1024))
+            self.pruning = index.pruning
+            preloaded = index.postings_cache.preload(pinned_terms)
+            if isinstance(self.index, DiskIndex):
+                self.index.close()
+            self.index = index
+            self.vectors = self.similarity = self.impacts = None
+            self.doc_values = DocValues.build(index)
+            self._attach_spelling(filepath)
+            self.logger.info(f"Индекс открыт с диска: {filepath} (кодек: {index.reader.codec.name}, "
+                             f"документов: {index.total_docs}, предзагружено блоков: {preloaded})")
+            return
+        
+        with IndexReader(filepath) as reader:
+            index = self._read_index(reader)
+            codec = reader.codec.name
+                
+        self.index = index
+        self.pruning = index.pruning
+        self.finalize()
+        self._attach_spelling(filepath)
+        
+        similarity_path = SimilarityIndex.path_for(filepath)
+        if os.path.exists(similarity_path):
+            similarity = SimilarityIndex.load(similarity_path)
+            if similarity.doc_ids == self.vectors.doc_ids:
+                self.similarity = similarity
+            else:
+                self.logger.warning(f"Индекс похожих документов не соответствует индексу: {similarity_path}")
+        self.logger.info(f"Индекс загружен: {filepath} (кодек: {codec}, документов: {index.total_docs})")
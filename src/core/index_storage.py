@@ -0,0 +1,304 @@
+import os
+import json
+import mmap
+import uuid
+import struct
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.document import Document
+from .postings_codecs import PostingsCodec, get_codec
+
+# Формат файла индекса:
+#   MAGIC | uint32 длина заголовка | заголовок (JSON) | документы | словарь | постинги
+# Документы и словарь - JSON по строке на запись, чтобы их можно было читать потоково.
+# Постинги термина: таблица блоков (uint32: смещение, байт doc-ID, последний doc-ID)
+# и сами блоки: разности порядковых номеров документов + частоты, каждая часть своим кодеком.
+MAGIC = b'SEIDX\x00\x00\x01'
+FORMAT_VERSION = 1
+DEFAULT_BLOCK_SIZE = 128
+
+_header_len = struct.Struct('<I')
+
+def new_build_id() -> str:
+    """Идентификатор построения индекса: вместе с версией однозначно задает его содержимое"""
+    return uuid.uuid4().hex
+
+# Набор сегментов (сегментированный индекс, контрольные точки построения): файлы индекса
+# seg_NNNNNN.idx в одном каталоге и манифест со списком сегментов и номером следующего
+MANIFEST_NAME = 'segments.json'
+
+def segment_name(number: int) -> str:
+    """Имя файла сегмента по номеру"""
+    return f'seg_{number:06d}.idx'
+
+def read_manifest(directory: str) -> Optional[Dict]:
+    """Манифест сегментов каталога (None, если его нет)"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_manifest(directory: str, manifest: Dict) -> None:
+    """Атомарная запись манифеста (временный файл + переименование)"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+class IndexWriter:
+    """Запись инвертированного индекса в сжатый файл"""
+    
+    def __init__(self, codec: PostingsCodec, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.codec = codec
+        self.block_size = block_size
+    
+    def encode_postings(self, doc_ords: np.ndarray, freqs: np.ndarray) -> bytes:
+        """
+        Кодирует постинги одного термина блоками
+        
+        Args:
+            doc_ords: Отсортированные порядковые номера документов
+            freqs: Частоты термина в этих документах
+        
+        Returns:
+            bytes: Таблица блоков и закодированные блоки
+        """
+        doc_ords = np.asarray(doc_ords, dtype=np.uint64)
+        freqs = np.asarray(freqs, dtype=np.uint64)
+        n_blocks = (len(doc_ords) + self.block_size - 1) // self.block_size
+        table = np.zeros((n_blocks, 3), dtype='<u4')
+        blocks: List[bytes] = []
+        offset = 0
+        base = np.uint64(0)
+        
+        for i in range(n_blocks):
+            start = i * self.block_size
+            block_docs = doc_ords[start:start + self.block_size]
+            gaps = np.diff(block_docs, prepend=base)
+            doc_bytes = self.codec.encode(gaps)
+            freq_bytes = self.codec.encode(freqs[start:start + self.block_size])
+            
+            table[i] = (offset, len(doc_bytes), block_docs[-1])
+            blocks.append(doc_bytes)
+            blocks.append(freq_bytes)
+            offset += len(doc_bytes) + len(freq_bytes)
+            base = block_docs[-1]
+        
+        return table.tobytes() + b''.join(blocks)
+    
+    @staticmethod
+    def _document_record(doc: Document) -> Dict:
+        record = {'id': doc.id, 'text': doc.text}
+        if doc.path:
+            record.update(path=doc.path, size=doc.size, mtime=doc.mtime)
+        return record
+    
+    def write(self, index, filepath: str, metadata: Dict = None) -> None:
+        """
+        Сохраняет индекс в файл
+        
+        Args:
+            index: Инвертированный индекс
+            filepath: Путь к файлу
+            metadata: Дополнительные поля заголовка
+        """
+        doc_ids = list(index.documents)
+        ordinals = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        
+        documents = ''.join(
+            json.dumps(self._document_record(index.documents[doc_id]), ensure_ascii=False) + '\n'
+            for doc_id in doc_ids
+        ).encode('utf-8')
+        
+        dictionary_lines: List[str] = []
+        postings_parts: List[bytes] = []
+        postings_size = 0
+        total_postings = 0
+        
+        for term in sorted(index.terms):
+            postings = index.terms[term]
+            doc_ords = np.fromiter((ordinals[doc_id] for doc_id in postings), dtype=np.uint64, count=len(postings))
+            freqs = np.fromiter(postings.values(), dtype=np.uint64, count=len(postings))
+            order = np.argsort(doc_ords, kind='stable')
+            
+            encoded = self.encode_postings(doc_ords[order], freqs[order])
+            dictionary_lines.append(json.dumps([term, postings_size, len(encoded), len(postings)], ensure_ascii=False))
+            postings_parts.append(encoded)
+            postings_size += len(encoded)
+            total_postings += len(postings)
+        
+        dictionary = ('\n'.join(dictionary_lines) + '\n' if dictionary_lines else '').encode('utf-8')
+        
+        header = {
+            'format_version': FORMAT_VERSION,
+            'codec': self.codec.name,
+            'block_size': self.block_size,
+            'total_docs': index.total_docs,
+            'build_id': getattr(index, 'build_id', None) or new_build_id(),
+            'version': getattr(index, 'version', 0),
+            'num_docs': len(doc_ids),
+            'num_terms': len(dictionary_lines),
+            'num_postings': total_postings,
+            'sections': {
+                'documents': [0, len(documents)],
+                'dictionary': [len(documents), len(dictionary)],
+                'postings': [len(documents) + len(dictionary), postings_size],
+            },
+        }
+        # Отсечение терминов при индексации - в метаданных, чтобы запросы разбирались так же
+        pruning = getattr(index, 'pruning', None)
+        if pruning is not None:
+            metadata = dict(metadata or {}, pruning=pruning.to_dict())
+        if metadata:
+            header['metadata'] = metadata
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        
+        # Запись во временный файл и атомарная замена: прерванная запись не портит прежний индекс
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(_header_len.pack(len(header_bytes)))
+            f.write(header_bytes)
+            f.write(documents)
+            f.write(dictionary)
+            for part in postings_parts:
+                f.write(part)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+
+class IndexReader:
+    """Чтение индекса из файла через mmap с поблочным декодированием постингов"""
+    
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить в память
+            self._file.close()
+            raise ValueError(f"Файл индекса пуст: {filepath}")
+        
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Файл не является индексом: {filepath}")
+        
+        (header_size,) = _header_len.unpack_from(self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + _header_len.size
+        header_bytes = self._mmap[header_start:header_start + header_size]
+        self.header = json.loads(header_bytes.decode('utf-8'))
+        self._data_start = header_start + header_size
+        
+        self.codec = get_codec(self.header['codec'])
+        self.block_size = self.header['block_size']
+        self.total_docs = self.header['total_docs']
+        # Файлы без идентификатора построения различаются по контрольной сумме заголовка
+        self.build_id = self.header.get('build_id') or hashlib.sha1(header_bytes).hexdigest()
+        self.version = self.header.get('version', 0)
+        self._dictionary: Dict[str, Tuple[int, int, int]] = None
+        self._doc_ids: List[str] = None
+    
+    def _section(self, name: str) -> Tuple[int, int]:
+        offset, size = self.header['sections'][name]
+        return self._data_start + offset, size
+    
+    def _iter_lines(self, name: str) -> Iterator[bytes]:
+        start, size = self._section(name)
+        end = start + size
+        pos = start
+        while pos < end:
+            newline = self._mmap.find(b'\n', pos, end)
+            if newline == -1:
+                newline = end
+            yield self._mmap[pos:newline]
+            pos = newline + 1
+    
+    def iter_documents(self) -> Iterator[Document]:
+        """Потоковое чтение документов в порядке их номеров"""
+        for line in self._iter_lines('documents'):
+            record = json.loads(line)
+            yield Document(id=record['id'], text=record['text'], path=record.get('path', ''),
+                           size=record.get('size', 0), mtime=record.get('mtime', 0.0))
+    
+    def iter_dictionary(self) -> Iterator[Tuple[str, int, int, int]]:
+        """Потоковое чтение словаря: (термин, смещение, размер, df)"""
+        for line in self._iter_lines('dictionary'):
+            term, offset, size, df = json.loads(line)
+            yield term, offset, size, df
+    
+    @property
+    def dictionary(self) -> Dict[str, Tuple[int, int, int]]:
+        """Словарь терминов (загружается при первом обращении)"""
+        if self._dictionary is None:
+            self._dictionary = {term: (offset, size, df) for term, offset, size, df in self.iter_dictionary()}
+        return self._dictionary
+    
+    @property
+    def doc_ids(self) -> List[str]:
+        """Идентификаторы документов по порядковым номерам"""
+        if self._doc_ids is None:
+            self._doc_ids = [doc.id for doc in self.iter_documents()]
+        return self._doc_ids
+    
+    def num_blocks(self, term: str) -> int:
+        """Количество блоков постингов термина"""
+        df = self.dictionary[term][2]
+        return (df + self.block_size - 1) // self.block_size
+    
+    def _block_table(self, term: str) -> Tuple[int, int, np.ndarray]:
+        offset, size, df = self.dictionary[term]
+        start = self._section('postings')[0] + offset
+        n_blocks = (df + self.block_size - 1) // self.block_size
+        # Срез mmap копирует байты, поэтому массив не удерживает отображение открытым
+        table = np.frombuffer(self._mmap[start:start + n_blocks * 12], dtype='<u4').reshape(n_blocks, 3)
+        return start + table.nbytes, start + size, table
+    
+    def read_block(self, term: str, block: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Декодирует один блок постингов термина
+        
+        Args:
+            term: Термин
+            block: Номер блока
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Порядковые номера документов и частоты
+        """
+        blocks_start, end, table = self._block_table(term)
+        df = self.dictionary[term][2]
+        count = min(self.block_size, df - block * self.block_size)
+        
+        offset, doc_size, _ = (int(x) for x in table[block])
+        block_end = blocks_start + int(table[block + 1][0]) if block + 1 < len(table) else end
+        doc_start = blocks_start + offset
+        
+        gaps = self.codec.decode(self._mmap[doc_start:doc_start + doc_size], count)
+        freqs = self.codec.decode(self._mmap[doc_start + doc_size:block_end], count)
+        base = np.uint64(table[block - 1][2]) if block > 0 else np.uint64(0)
+        return np.cumsum(gaps, dtype=np.uint64) + base, freqs
+    
+    def read_postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Декодирует все постинги термина"""
+        blocks = [self.read_block(term, i) for i in range(self.num_blocks(term))]
+        if not blocks:
+            return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64)
+        return np.concatenate([b[0] for b in blocks]), np.concatenate([b[1] for b in blocks])
+    
+    def close(self) -> None:
+        """Закрытие файла"""
+        self._mmap.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
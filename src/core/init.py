@@ -1,5 +1,6 @@
-from .index_manager import IndexManager, InvertedIndex
+from .index_manager import IndexManager, InvertedIndex, IndexSnapshot
 from .search_manager import SearchManager
 from .ranker import TFIDFRanker
+from .segments import SegmentedIndex, TieredMergePolicy
 
-__all__ = ['IndexManager', 'InvertedIndex', 'SearchManager', 'TFIDFRanker']
\ No newline at end of file
+__all__ = ['IndexManager', 'InvertedIndex', 'IndexSnapshot', 'SearchManager', 'TFIDFRanker', 'SegmentedIndex', 'TieredMergePolicy']
\ No newline at end of file
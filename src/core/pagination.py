@@ -0,0 +1,101 @@
+import json
+import base64
+import heapq
+import hashlib
+from dataclasses import astuple, dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from ..models.document import SearchResult
+
+# Граница страницы: оценка и идентификатор последнего выданного документа
+Boundary = Tuple[float, str]
+
+def result_order(item: Tuple[str, float]) -> Tuple[float, str]:
+    """Порядок выдачи: по убыванию оценки, при равных оценках - по идентификатору документа"""
+    return -item[1], item[0]
+
+def after_boundary(doc_id: str, score: float, after: Boundary) -> bool:
+    """Документ идет в выдаче после границы"""
+    return (-score, doc_id) > (-after[0], after[1])
+
+def query_fingerprint(query: str, filters=None, boosts=None) -> str:
+    """Хеш запроса, фильтра и весов полей: курсор действителен только для той же выдачи"""
+    data = json.dumps([query, list(astuple(filters)) if filters is not None else None,
+                       sorted(boosts.items()) if boosts else None], ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+
+def index_identity(index) -> Optional[str]:
+    """
+    Идентичность содержимого индекса: построение (build_id) и версия. Одна версия без
+    построения не годится - после загрузки любого файла она снова начинается с нуля
+    """
+    version = getattr(index, 'version', None)
+    if version is None:
+        return None
+    return f"{getattr(index, 'build_id', None) or ''}:{version}"
+
+def select_page(items: Iterable[Tuple[str, float]], limit: int, after: Optional[Boundary] = None,
+                offset: int = 0) -> List[Tuple[str, float]]:
+    """
+    Документы страницы выдачи
+    
+    С границей отбираются limit лучших документов после нее (куча размера limit, а не
+    offset + limit); без границы - документы с номерами offset..offset + limit.
+    
+    Args:
+        items: Идентификаторы документов и оценки
+        limit: Размер страницы
+        after: Граница предыдущей страницы (из курсора)
+        offset: Сколько документов пропустить (без границы)
+    
+    Returns:
+        List[Tuple[str, float]]: Документы страницы в порядке выдачи
+    """
+    if after is not None:
+        items = (item for item in items if after_boundary(item[0], item[1], after))
+        return heapq.nsmallest(limit, items, key=result_order)
+    return heapq.nsmallest(offset + limit, items, key=result_order)[offset:]
+
+@dataclass
+class PageCursor:
+    """
+    Курсор следующей страницы: граница (оценка, документ), номер первого результата,
+    хеш запроса с фильтром и весами полей (query_fingerprint) и идентичность индекса (index_identity)
+    """
+    score: float
+    doc_id: str
+    offset: int
+    query_hash: Optional[str] = None
+    index_id: Optional[str] = None
+    
+    @property
+    def boundary(self) -> Boundary:
+        return self.score, self.doc_id
+    
+    def encode(self) -> str:
+        """Непрозрачная строка для передачи клиенту (оценка сохраняется без потери точности)"""
+        data = json.dumps([self.score, self.doc_id, self.offset, self.query_hash, self.index_id], ensure_ascii=False)
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @classmethod
+    def decode(cls, token: str) -> 'PageCursor':
+        """Разбор курсора; ValueError для поврежденной строки"""
+        try:
+            data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            score, doc_id, offset, query_hash, index_id = json.loads(data.decode('utf-8'))
+            return cls(float(score), str(doc_id), int(offset), query_hash, index_id)
+        except (ValueError, TypeError, UnicodeDecodeError):
+            raise ValueError(f"Неверный курсор страницы: {token}")
+
+@dataclass
+class Page:
+    """Страница выдачи"""
+    results: List[SearchResult]
+    # Курсор следующей страницы (None - страница последняя)
+    next_cursor: Optional[str]
+    # Номер первого результата страницы в полной выдаче
+    offset: int
+    # Выполненный запрос (отличается от исходного, если он был исправлен)
+    query: str
+    # Индекс изменился после выдачи курсора: страница продолжает выдачу от той же границы
+    stale: bool = False
@@ -0,0 +1,170 @@
+import sys
+import itertools
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..models.document import Document
+from .cache_manager import BoundedCache
+from .fields import index_fields
+from .index_storage import IndexReader
+from .pruning import PruningConfig
+
+# Декодированный блок: идентификаторы документов и частоты
+Block = Tuple[List[str], List[int]]
+
+# Кэш postings общий для всех открытых индексов, поэтому ключ включает номер индекса
+_cache_ids = itertools.count()
+
+class PostingsBlockCache:
+    """
+    Кэш декодированных блоков постингов (ключ - термин и номер блока)
+    
+    Обычные блоки лежат в кэше с бюджетом (CacheManager) и вытесняются по LRU; блоки
+    закрепленных терминов (например, самых частых в журнале запросов) хранятся отдельно
+    и не вытесняются.
+    """
+    
+    def __init__(self, reader: IndexReader, cache: Optional[BoundedCache] = None,
+                 doc_ids: Optional[List[str]] = None):
+        """
+        Args:
+            reader: Файл индекса
+            cache: Кэш с бюджетом (None - незакрепленные блоки не кэшируются)
+            doc_ids: Идентификаторы документов по номерам, если уже прочитаны
+        """
+        self.reader = reader
+        self.cache = cache
+        self.decoded_blocks = 0
+        self._cache_id = next(_cache_ids)
+        self._doc_ids = doc_ids if doc_ids is not None else reader.doc_ids
+        self._pinned_terms: Set[str] = set()
+        self._pinned: Dict[Tuple[int, str, int], Block] = {}
+        self._lock = threading.Lock()
+    
+    def _decode(self, term: str, block: int) -> Block:
+        doc_ords, freqs = self.reader.read_block(term, block)
+        doc_ids = self._doc_ids
+        self.decoded_blocks += 1
+        return [doc_ids[i] for i in doc_ords.tolist()], freqs.tolist()
+    
+    def block(self, term: str, block: int) -> Block:
+        """Декодированный блок (из кэша или с диска)"""
+        key = (self._cache_id, term, block)
+        entry = self._pinned.get(key)
+        if entry is None and self.cache is not None:
+            entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+        
+        entry = self._decode(term, block)
+        if term in self._pinned_terms:
+            with self._lock:
+                self._pinned[key] = entry
+        elif self.cache is not None:
+            # Строки идентификаторов разделяются со списком документов, считаем только ссылки и частоты
+            doc_ids, freqs = entry
+            self.cache.put(key, entry, sys.getsizeof(doc_ids) + sys.getsizeof(freqs) + 32 * len(freqs))
+        return entry
+    
+    def postings(self, term: str) -> Dict[str, int]:
+        """Постинги термина: doc_id -> tf"""
+        postings: Dict[str, int] = {}
+        for i in range(self.reader.num_blocks(term)):
+            doc_ids, freqs = self.block(term, i)
+            postings.update(zip(doc_ids, freqs))
+        return postings
+    
+    def pin(self, terms: Iterable[str]) -> None:
+        """Закрепление терминов: их блоки больше не вытесняются"""
+        with self._lock:
+            for term in terms:
+                if term not in self.reader.dictionary or term in self._pinned_terms:
+                    continue
+                self._pinned_terms.add(term)
+                if self.cache is not None:
+                    for i in range(self.reader.num_blocks(term)):
+                        key = (self._cache_id, term, i)
+                        entry = self.cache.get(key)
+                        if entry is not None:
+                            self._pinned[key] = entry
+                            self.cache.pop(key)
+    
+    def preload(self, terms: Iterable[str]) -> int:
+        """
+        Закрепление и предварительное декодирование терминов (при старте)
+        
+        Args:
+            terms: Термины
+        
+        Returns:
+            int: Количество декодированных блоков
+        """
+        terms = [term for term in terms if term in self.reader.dictionary]
+        self.pin(terms)
+        decoded = self.decoded_blocks
+        for term in terms:
+            for i in range(self.reader.num_blocks(term)):
+                self.block(term, i)
+        return self.decoded_blocks - decoded
+    
+    @property
+    def pinned_terms(self) -> Set[str]:
+        return set(self._pinned_terms)
+
+class _DiskTerms(Mapping):
+    """Словарь термин -> {doc_id: tf} поверх файла индекса"""
+    
+    def __init__(self, reader: IndexReader, postings_cache: PostingsBlockCache):
+        self._reader = reader
+        self._postings_cache = postings_cache
+    
+    def __getitem__(self, term: str) -> Dict[str, int]:
+        if term not in self._reader.dictionary:
+            raise KeyError(term)
+        return self._postings_cache.postings(term)
+    
+    def __contains__(self, term) -> bool:
+        return term in self._reader.dictionary
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._reader.dictionary)
+    
+    def __len__(self) -> int:
+        return len(self._reader.dictionary)
+
+class DiskIndex:
+    """
+    Индекс, оставленный на диске: словарь и документы в памяти, постинги декодируются
+    поблочно по запросу через PostingsBlockCache. Только для чтения; интерфейс как у IndexSnapshot
+    """
+    
+    def __init__(self, reader: IndexReader, cache: Optional[BoundedCache] = None):
+        """
+        Args:
+            reader: Файл индекса
+            cache: Кэш декодированных блоков с бюджетом
+        """
+        self.reader = reader
+        self.documents: Dict[str, Document] = {doc.id: doc for doc in reader.iter_documents()}
+        self.postings_cache = PostingsBlockCache(reader, cache, list(self.documents))
+        self.terms = _DiskTerms(reader, self.postings_cache)
+        # Постинги коротких полей малы и строятся в памяти по документам
+        self.field_terms: Dict[str, Dict[str, tuple]] = {}
+        self.field_lengths: Dict[str, tuple] = {}
+        for doc in self.documents.values():
+            index_fields(self.field_terms, self.field_lengths, doc)
+        self.total_docs = reader.total_docs
+        self.build_id = reader.build_id
+        self.version = reader.version
+        self.pruning = PruningConfig.from_header(reader.header)
+    
+    def doc_freq(self, term: str) -> int:
+        """Документная частота из словаря, без декодирования постингов"""
+        return self.reader.dictionary[term][2]
+    
+    def snapshot(self) -> 'DiskIndex':
+        return self
+    
+    def close(self) -> None:
+        self.reader.close()
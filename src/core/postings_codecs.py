@@ -0,0 +1,207 @@
+import math
+import struct
+from typing import Dict, List, Type
+
+import numpy as np
+
+class PostingsCodec:
+    """Базовый кодек для блоков постингов (разности doc-ID и частоты терминов)"""
+    
+    name = ''
+    
+    def encode(self, values: np.ndarray) -> bytes:
+        """
+        Кодирует блок неотрицательных целых чисел
+        
+        Args:
+            values: Массив значений блока
+        
+        Returns:
+            bytes: Закодированный блок
+        """
+        raise NotImplementedError
+    
+    def decode(self, data: bytes, count: int) -> np.ndarray:
+        """
+        Декодирует блок целиком
+        
+        Args:
+            data: Закодированный блок
+            count: Количество значений в блоке
+        
+        Returns:
+            np.ndarray: Массив значений (uint64)
+        """
+        raise NotImplementedError
+
+def _pack_bits(values: np.ndarray, width: int) -> bytes:
+    """Упаковка значений по width бит на значение"""
+    if width == 0 or len(values) == 0:
+        return b''
+    shifts = np.arange(width, dtype=np.uint64)
+    bits = ((values[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    return np.packbits(bits.ravel(), bitorder='little').tobytes()
+
+def _unpack_bits(data, count: int, width: int) -> np.ndarray:
+    """Распаковка значений, упакованных _pack_bits"""
+    if width == 0 or count == 0:
+        return np.zeros(count, dtype=np.uint64)
+    raw = np.frombuffer(data, dtype=np.uint8)
+    bits = np.unpackbits(raw, count=count * width, bitorder='little')
+    bits = bits.reshape(count, width).astype(np.uint64)
+    return (bits << np.arange(width, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+
+def _packed_size(count: int, width: int) -> int:
+    return (count * width + 7) // 8
+
+class VarintCodec(PostingsCodec):
+    """Кодирование переменной длины (7 бит данных на байт)"""
+    
+    name = 'varint'
+    
+    def encode(self, values: np.ndarray) -> bytes:
+        values = np.asarray(values, dtype=np.uint64)
+        if len(values) == 0:
+            return b''
+        # Количество байт на значение: 1 + число порогов 2^7, 2^14, ... которые оно превышает
+        sizes = np.ones(len(values), dtype=np.int64)
+        for shift in range(7, 64, 7):
+            sizes += values >= np.uint64(1 << shift)
+        
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        total = int(sizes.sum())
+        owner = np.repeat(np.arange(len(values)), sizes)
+        position = np.arange(total) - starts[owner]
+        
+        out = (values[owner] >> (7 * position).astype(np.uint64)) & np.uint64(0x7F)
+        out = out.astype(np.uint8)
+        # Старший бит - признак продолжения
+        out[position < sizes[owner] - 1] |= 0x80
+        return out.tobytes()
+    
+    def decode(self, data: bytes, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=np.uint64)
+        raw = np.frombuffer(data, dtype=np.uint8)
+        ends = np.flatnonzero((raw & 0x80) == 0)[:count]
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        raw = raw[:ends[-1] + 1]
+        owner = np.repeat(np.arange(count), ends - starts + 1)
+        position = np.arange(len(raw)) - starts[owner]
+        parts = (raw & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+        return np.add.reduceat(parts, starts)
+
+class BitPackingCodec(PostingsCodec):
+    """
+    PForDelta: битовая упаковка с шириной по 90-му перцентилю блока,
+    значения шире - исключения (позиция + старшие биты в varint)
+    """
+    
+    name = 'bitpack'
+    
+    _header = struct.Struct('<BH')
+    
+    def __init__(self, percentile: float = 90.0):
+        self.percentile = percentile
+        self._varint = VarintCodec()
+    
+    def encode(self, values: np.ndarray) -> bytes:
+        values = np.asarray(values, dtype=np.uint64)
+        if len(values) == 0:
+            return self._header.pack(0, 0)
+        threshold = int(np.percentile(values, self.percentile, method='lower'))
+        width = threshold.bit_length()
+        mask = np.uint64((1 << width) - 1)
+        
+        exceptions = np.flatnonzero(values > mask).astype(np.uint16)
+        high = values[exceptions] >> np.uint64(width)
+        return b''.join((
+            self._header.pack(width, len(exceptions)),
+            _pack_bits(values & mask, width),
+            exceptions.astype('<u2').tobytes(),
+            self._varint.encode(high),
+        ))
+    
+    def decode(self, data: bytes, count: int) -> np.ndarray:
+        width, n_exceptions = self._header.unpack_from(data, 0)
+        offset = self._header.size
+        packed = _packed_size(count, width)
+        values = _unpack_bits(data[offset:offset + packed], count, width)
+        offset += packed
+        
+        if n_exceptions:
+            positions = np.frombuffer(data, dtype='<u2', count=n_exceptions, offset=offset)
+            offset += 2 * n_exceptions
+            high = self._varint.decode(data[offset:], n_exceptions)
+            values[positions] |= high << np.uint64(width)
+        return values
+
+class EliasFanoCodec(PostingsCodec):
+    """
+    Элиас-Фано над префиксными суммами блока: младшие биты упакованы,
+    старшие - в унарном битовом векторе
+    """
+    
+    name = 'eliasfano'
+    
+    _header = struct.Struct('<BI')
+    
+    def encode(self, values: np.ndarray) -> bytes:
+        values = np.asarray(values, dtype=np.uint64)
+        count = len(values)
+        if count == 0:
+            return self._header.pack(0, 0)
+        sequence = np.cumsum(values, dtype=np.uint64)
+        universe = int(sequence[-1])
+        low_width = int(math.floor(math.log2(universe / count))) if universe > count else 0
+        
+        high = sequence >> np.uint64(low_width)
+        upper_bits = count + int(high[-1]) + 1
+        upper = np.zeros(upper_bits, dtype=np.uint8)
+        upper[high.astype(np.int64) + np.arange(count)] = 1
+        
+        low = sequence & np.uint64((1 << low_width) - 1)
+        return b''.join((
+            self._header.pack(low_width, upper_bits),
+            np.packbits(upper, bitorder='little').tobytes(),
+            _pack_bits(low, low_width),
+        ))
+    
+    def decode(self, data: bytes, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=np.uint64)
+        low_width, upper_bits = self._header.unpack_from(data, 0)
+        offset = self._header.size
+        upper_size = (upper_bits + 7) // 8
+        upper = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=upper_size, offset=offset),
+                              count=upper_bits, bitorder='little')
+        offset += upper_size
+        
+        high = (np.flatnonzero(upper)[:count] - np.arange(count)).astype(np.uint64)
+        low = _unpack_bits(data[offset:offset + _packed_size(count, low_width)], count, low_width)
+        sequence = (high << np.uint64(low_width)) | low
+        return np.diff(sequence, prepend=np.uint64(0))
+
+CODECS: Dict[str, Type[PostingsCodec]] = {
+    VarintCodec.name: VarintCodec,
+    BitPackingCodec.name: BitPackingCodec,
+    EliasFanoCodec.name: EliasFanoCodec,
+}
+
+def get_codec(name: str) -> PostingsCodec:
+    """
+    Возвращает экземпляр кодека по имени
+    
+    Args:
+        name: Имя кодека (varint, bitpack, eliasfano)
+    
+    Returns:
+        PostingsCodec: Кодек
+    """
+    if name not in CODECS:
+        raise ValueError(f"Неизвестный кодек постингов: {name}. Доступны: {', '.join(CODECS)}")
+    return CODECS[name]()
+
+def available_codecs() -> List[str]:
+    """Список имен зарегистрированных кодеков"""
+    return list(CODECS)
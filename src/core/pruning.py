@@ -0,0 +1,115 @@
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+# Запасные списки стоп-слов на случай, если корпус NLTK stopwords не скачан
+FALLBACK_STOPWORDS: Dict[str, FrozenSet[str]] = {
+    'russian': frozenset('''
+        и в во не что он на я с со как а то все она так его но да ты к у же вы за бы по только ее
+        мне было вот от меня еще нет о из ему теперь когда даже ну вдруг ли если уже или ни быть был
+        него до вас нибудь опять уж вам ведь там потом себя ничего ей может они тут где есть надо ней
+        для мы тебя их чем была сам чтоб без будто чего раз тоже себе под будет ж тогда кто этот того
+        потому этого какой совсем ним здесь этом один почти мой тем чтобы нее сейчас были куда зачем
+        всех никогда можно при наконец два об другой хоть после над больше тот через эти нас про всего
+        них какая много разве три эту моя впрочем хорошо свою этой перед иногда лучше чуть том нельзя
+        такой им более всегда конечно всю между это
+    '''.split()),
+    'english': frozenset('''
+        i me my myself we our ours ourselves you your yours yourself yourselves he him his himself she
+        her hers herself it its itself they them their theirs themselves what which who whom this that
+        these those am is are was were be been being have has had having do does did doing a an the and
+        but if or because as until while of at by for with about against between into through during
+        before after above below to from up down in out on off over under again further then once here
+        there when where why how all any both each few more most other some such no nor not only own
+        same so than too very s t can will just don should now
+    '''.split()),
+}
+
+logger = logging.getLogger(__name__)
+
+def load_stopwords(language: str) -> FrozenSet[str]:
+    """
+    Стоп-слова языка из NLTK (corpora/stopwords) или из запасного списка, если корпус не скачан
+    
+    Args:
+        language: Язык в обозначении NLTK (russian, english, ...)
+    
+    Returns:
+        FrozenSet[str]: Стоп-слова
+    """
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words(language))
+    except (ImportError, LookupError, OSError):
+        if language not in FALLBACK_STOPWORDS:
+            raise ValueError(f"Неизвестный язык стоп-слов: {language}")
+        logger.warning(f"Корпус NLTK stopwords недоступен, используется встроенный список: {language}")
+        return FALLBACK_STOPWORDS[language]
+
+class PruningConfig:
+    """
+    Отсечение терминов при индексации: стоп-слова и термины со слишком большой долей документов
+    
+    Стоп-слова не попадают в постинги вообще, частые термины удаляются после построения
+    (prune_high_df) и дальше не индексируются. Конфигурация вместе с итоговыми списками
+    сохраняется в метаданных файла индекса, поэтому запросы к нему разбираются так же,
+    даже если списки NLTK при поиске другие или недоступны.
+    """
+    
+    def __init__(self, languages: Iterable[str] = ('russian', 'english'), extra_stopwords: Iterable[str] = (),
+                 max_df_ratio: Optional[float] = None, min_docs: int = 100,
+                 stopwords: Optional[Iterable[str]] = None, pruned: Iterable[str] = ()):
+        """
+        Args:
+            languages: Языки списков стоп-слов
+            extra_stopwords: Дополнительные стоп-слова
+            max_df_ratio: Доля документов, выше которой термин отсекается (None - не отсекать)
+            min_docs: Минимальный размер корпуса для отсечения по доле документов
+                (на маленьком корпусе доля шумная)
+            stopwords: Готовый список стоп-слов (из метаданных индекса) вместо загрузки по языкам
+            pruned: Уже отсеченные частые термины (из метаданных индекса)
+        """
+        if max_df_ratio is not None and not 0 < max_df_ratio <= 1:
+            raise ValueError(f"Доля документов должна быть в (0, 1]: {max_df_ratio}")
+        self.languages = tuple(languages)
+        self.extra_stopwords = tuple(term.lower() for term in extra_stopwords)
+        self.max_df_ratio = max_df_ratio
+        self.min_docs = min_docs
+        if stopwords is None:
+            stopwords = set(self.extra_stopwords)
+            for language in self.languages:
+                stopwords |= load_stopwords(language)
+        self.stopwords = frozenset(stopwords)
+        self.pruned = frozenset(pruned)
+        self.excluded = self.stopwords | self.pruned
+    
+    def high_df_terms(self, index) -> List[str]:
+        """Термины индекса, встречающиеся в большей доле документов, чем max_df_ratio"""
+        if self.max_df_ratio is None or index.total_docs < self.min_docs:
+            return []
+        limit = self.max_df_ratio * index.total_docs
+        return [term for term, postings in index.terms.items() if len(postings) > limit]
+    
+    def add_pruned(self, terms: Iterable[str]) -> None:
+        """Запоминание отсеченных терминов (дальше они не индексируются и удаляются из запросов)"""
+        self.pruned = self.pruned | frozenset(terms)
+        self.excluded = self.stopwords | self.pruned
+    
+    def to_dict(self) -> dict:
+        return {
+            'languages': list(self.languages),
+            'extra_stopwords': list(self.extra_stopwords),
+            'max_df_ratio': self.max_df_ratio,
+            'min_docs': self.min_docs,
+            'stopwords': sorted(self.stopwords),
+            'pruned': sorted(self.pruned),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PruningConfig':
+        return cls(**data)
+    
+    @classmethod
+    def from_header(cls, header: dict) -> Optional['PruningConfig']:
+        """Конфигурация из заголовка файла индекса (None - индекс построен без отсечения)"""
+        data = header.get('metadata', {}).get('pruning')
+        return cls.from_dict(data) if data is not None else None
@@ -0,0 +1,163 @@
+import json
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+@dataclass
+class QueryLogRecord:
+    """Запись журнала запросов"""
+    query: str
+    terms: List[str]
+    limit: int
+    latency_ms: float
+    results: int
+    cache_hit: bool
+    ts: float = 0.0
+
+class QueryLogger:
+    """
+    Структурированный журнал запросов в формате JSON Lines (одна запись на строку,
+    короткие ключи): t - время, q - запрос, terms - нормализованные термины, k - лимит,
+    ms - задержка, n - число результатов, hit - ответ из кэша
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8', buffering=1)
+    
+    def record(self, query: str, terms: Sequence[str], limit: int, latency: float,
+               results: int, cache_hit: bool) -> None:
+        """
+        Запись запроса в журнал
+        
+        Args:
+            query: Текст запроса
+            terms: Нормализованные термины
+            limit: Лимит результатов
+            latency: Задержка, с
+            results: Количество результатов
+            cache_hit: Ответ получен из кэша
+        """
+        line = json.dumps({'t': round(time.time(), 3), 'q': query, 'terms': list(terms), 'k': limit,
+                           'ms': round(latency * 1000, 3), 'n': results, 'hit': cache_hit},
+                          ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+    
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+def read_query_log(path: str) -> Iterator[QueryLogRecord]:
+    """
+    Потоковое чтение журнала запросов (битые строки пропускаются)
+    
+    Args:
+        path: Путь к журналу
+    
+    Returns:
+        Iterator[QueryLogRecord]: Записи в порядке записи
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                yield QueryLogRecord(query=record['q'], terms=record.get('terms', []), limit=record.get('k', 10),
+                                     latency_ms=record.get('ms', 0.0), results=record.get('n', 0),
+                                     cache_hit=record.get('hit', False), ts=record.get('t', 0.0))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+def top_terms(records: Iterable[QueryLogRecord], n: int) -> List[str]:
+    """Самые частые термины журнала (кандидаты на закрепление в кэше постингов)"""
+    counts = Counter(term for record in records for term in record.terms)
+    return [term for term, _ in counts.most_common(n)]
+
+@dataclass
+class ReplayReport:
+    """Итоги воспроизведения журнала"""
+    queries: int
+    elapsed: float
+    latencies_ms: List[float]
+    results: List[List[str]] = field(default_factory=list)
+    
+    @property
+    def throughput(self) -> float:
+        return self.queries / self.elapsed if self.elapsed else 0.0
+    
+    def percentile(self, p: float) -> float:
+        """Перцентиль задержки, мс (ближайший ранг)"""
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+    
+    def summary(self) -> str:
+        return (f"запросов: {self.queries}, {self.throughput:.1f} запр/с, задержка p50 {self.percentile(50):.3f} мс, "
+                f"p95 {self.percentile(95):.3f} мс, p99 {self.percentile(99):.3f} мс")
+
+def replay(records: Sequence[QueryLogRecord], search: Callable[[str, int], List[str]],
+           rate: Optional[float] = None, concurrency: int = 1) -> ReplayReport:
+    """
+    Воспроизведение журнала запросов
+    
+    Args:
+        records: Записи журнала
+        search: Функция поиска (запрос, лимит) -> идентификаторы найденных документов
+        rate: Темп подачи запросов, запр/с (None - без пауз, насколько позволяет concurrency);
+            задержка считается от запланированного момента отправки, включая ожидание в очереди
+        concurrency: Количество параллельных потоков
+    
+    Returns:
+        ReplayReport: Пропускная способность, задержки и результаты в порядке журнала
+    """
+    latencies = [0.0] * len(records)
+    results: List[List[str]] = [[] for _ in records]
+    
+    def run(i: int, scheduled: Optional[float]) -> None:
+        # Задержка при заданном темпе считается от запланированного момента отправки, иначе
+        # ожидание свободного потока за медленными запросами не попало бы в замер (coordinated omission)
+        started = scheduled if scheduled is not None else time.perf_counter()
+        results[i] = search(records[i].query, records[i].limit)
+        latencies[i] = (time.perf_counter() - started) * 1000
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = []
+        for i in range(len(records)):
+            scheduled = None
+            if rate:
+                # Открытая модель нагрузки: запросы подаются по расписанию, не дожидаясь ответов
+                scheduled = started + i / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(executor.submit(run, i, scheduled))
+        for future in futures:
+            future.result()
+    return ReplayReport(len(records), time.perf_counter() - started, latencies, results)
+
+def compare_results(results: Sequence[List[str]], baseline: Sequence[List[str]]) -> dict:
+    """
+    Сравнение результатов с эталонным движком
+    
+    Args:
+        results: Идентификаторы документов по запросам
+        baseline: Эталонные идентификаторы по тем же запросам
+    
+    Returns:
+        dict: identical - доля запросов с одинаковой выдачей (с учетом порядка),
+            overlap - средняя доля общих документов (пересечение / объединение)
+    """
+    identical = 0
+    overlap = 0.0
+    for got, expected in zip(results, baseline):
+        identical += got == expected
+        union = set(got) | set(expected)
+        overlap += len(set(got) & set(expected)) / len(union) if union else 1.0
+    total = max(len(results), 1)
+    return {'identical': identical / total, 'overlap': overlap / total}
@@ -0,0 +1,132 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+STRATEGY_EXHAUSTIVE = 'exhaustive'
+STRATEGY_PRUNED = 'pruned'
+STRATEGY_BOOLEAN_FIRST = 'boolean-first'
+STRATEGY_IMPACT_ORDERED = 'impact-ordered'
+STRATEGY_FIELDS = 'fields'
+
+@dataclass
+class PlannedTerm:
+    """Термин запроса со статистикой из индекса"""
+    term: str
+    df: int
+    idf: float
+
+@dataclass
+class QueryPlan:
+    """План выполнения запроса"""
+    terms: List[PlannedTerm]
+    deferred: List[PlannedTerm] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    strategy: str = STRATEGY_EXHAUSTIVE
+    timings: Dict[str, float] = field(default_factory=dict)
+    postings_scanned: int = 0
+    
+    def explain(self) -> str:
+        """Текстовое описание плана и времени этапов"""
+        lines = [f"Стратегия: {self.strategy}"]
+        for planned in self.terms:
+            lines.append(f"  {planned.term}: df={planned.df}, idf={planned.idf:.3f}")
+        if self.deferred:
+            lines.append("Отложены (высокий df): " + ', '.join(f"{t.term} (df={t.df})" for t in self.deferred))
+        if self.missing:
+            lines.append("Нет в индексе: " + ', '.join(self.missing))
+        lines.append(f"Просмотрено постингов: {self.postings_scanned}")
+        for stage, seconds in self.timings.items():
+            lines.append(f"  {stage}: {seconds * 1000:.3f} мс")
+        return '\n'.join(lines)
+
+class QueryPlanner:
+    """
+    Планировщик запросов: по документной частоте откладывает слишком частые термины,
+    упорядочивает остальные от редких к частым и выбирает стратегию выполнения
+    """
+    
+    def __init__(self, max_df_ratio: float = 0.5, pruning_min_postings: int = 1000,
+                 boolean_min_terms: int = 3, impact_max_terms: int = 2):
+        """
+        Args:
+            max_df_ratio: Термины, встречающиеся в большей доле документов, откладываются
+            pruning_min_postings: С какого суммарного числа постингов выгодно отсечение
+            boolean_min_terms: С какого числа терминов сначала пересекаются постинги
+            impact_max_terms: До какого числа терминов запрос читает постинги по убыванию
+                вклада с ранней остановкой (если такие постинги построены)
+        """
+        self.max_df_ratio = max_df_ratio
+        self.pruning_min_postings = pruning_min_postings
+        self.boolean_min_terms = boolean_min_terms
+        self.impact_max_terms = impact_max_terms
+    
+    def plan(self, query_terms: List[str], index, impact_ordered: bool = False,
+             fields: bool = False) -> QueryPlan:
+        """
+        Построение плана запроса
+        
+        Args:
+            query_terms: Термины запроса
+            index: Индекс (или его снимок)
+            impact_ordered: Доступны постинги, упорядоченные по вкладу (ImpactOrderedPostings)
+            fields: Ранжирование по полям: термин ищется и в пути/заголовке (index.field_terms),
+                df считается по всем полям
+        
+        Returns:
+            QueryPlan: План выполнения
+        """
+        planned: List[PlannedTerm] = []
+        deferred: List[PlannedTerm] = []
+        missing: List[str] = []
+        seen = set()
+        total_docs = max(index.total_docs, 1)
+        field_terms = getattr(index, 'field_terms', None) if fields else None
+        
+        for term in query_terms:
+            if term in seen:
+                continue
+            seen.add(term)
+            field_postings = field_terms.get(term) if field_terms is not None else None
+            if term not in index.terms and not field_postings:
+                missing.append(term)
+                continue
+            df = self._doc_freq(term, index, field_postings)
+            item = PlannedTerm(term, df, math.log(index.total_docs / (df + 1)) if index.total_docs else 0.0)
+            # Термин с неположительным idf не может поднять документ в выдаче
+            if df / total_docs > self.max_df_ratio or item.idf <= 0:
+                deferred.append(item)
+            else:
+                planned.append(item)
+        
+        if not planned and deferred:
+            # Все термины частые - выполняем их, иначе запрос ничего не вернет
+            planned, deferred = deferred, []
+        planned.sort(key=lambda t: t.df)
+        
+        return QueryPlan(terms=planned, deferred=deferred, missing=missing,
+                         strategy=STRATEGY_FIELDS if fields else self._choose_strategy(planned, impact_ordered))
+    
+    @staticmethod
+    def _doc_freq(term: str, index, field_postings: Optional[Dict[str, tuple]] = None) -> int:
+        """Документная частота по телу и (если заданы постинги полей) по коротким полям"""
+        if term not in index.terms:
+            return len(field_postings or ())
+        # Индекс на диске знает df из словаря и не декодирует постинги ради планирования
+        df = index.doc_freq(term) if hasattr(index, 'doc_freq') else len(index.terms[term])
+        if field_postings:
+            body = index.terms[term]
+            df += sum(1 for doc_id in field_postings if doc_id not in body)
+        return df
+    
+    def _choose_strategy(self, planned: List[PlannedTerm], impact_ordered: bool = False) -> str:
+        total_postings = sum(t.df for t in planned)
+        if total_postings < self.pruning_min_postings:
+            return STRATEGY_EXHAUSTIVE
+        # Короткие запросы - ранняя остановка по постингам в порядке вклада
+        if impact_ordered and 0 < len(planned) <= self.impact_max_terms:
+            return STRATEGY_IMPACT_ORDERED
+        if len(planned) <= 1:
+            return STRATEGY_EXHAUSTIVE
+        if len(planned) >= self.boolean_min_terms:
+            return STRATEGY_BOOLEAN_FIRST
+        return STRATEGY_PRUNED
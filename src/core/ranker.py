@@ -1,6 +1,14 @@
 import math
-from typing import List, Dict
+import time
+import heapq
+from typing import Container, List, Dict, Optional
 from ..models.document import Document, SearchResult
+from .fields import FIELDS
+from .impact_postings import ImpactOrderedPostings
+from .pagination import Boundary, select_page
+from .query_planner import (QueryPlan, STRATEGY_BOOLEAN_FIRST, STRATEGY_FIELDS, STRATEGY_IMPACT_ORDERED,
+                            STRATEGY_PRUNED)
+from .vectors import DocumentVectors
 
 class TFIDFRanker:
     """Ранжирование документов по TF-IDF"""
@@ -33,9 +41,261 @@ class TFIDFRanker:
             ) for doc_id, score in sorted_docs
         ]
     
+    def rank_planned(self, plan: QueryPlan, index, limit: int = 10,
+                     allowed: Optional[Container[str]] = None,
+                     impacts: Optional[ImpactOrderedPostings] = None, mask=None,
+                     boosts: Optional[Dict[str, float]] = None, after: Optional[Boundary] = None,
+                     offset: int = 0) -> List[SearchResult]:
+        """
+        Ранжирование по плану запроса с замером времени этапов в plan.timings
+        
+        Args:
+            plan: План от QueryPlanner
+            index: Индекс (или его снимок)
+            limit: Максимальное количество результатов
+            allowed: Документы, прошедшие фильтр (None - все); остальные не оцениваются
+            impacts: Постинги по вкладу tf / длина (для стратегии impact-ordered)
+            mask: Тот же фильтр битовой маской в порядке impacts.doc_ids
+            boosts: Веса полей body, title, path (для стратегии fields)
+            after: Граница предыдущей страницы (оценка, документ): выдаются limit документов после нее
+            offset: Номер первого результата страницы; без границы первые offset документов пропускаются
+            
+        Returns:
+            List[SearchResult]: Отсортированные результаты (при равных оценках - по идентификатору)
+        """
+        # Отсечение гарантирует полноту первых depth документов - всех страниц до текущей включительно
+        depth = offset + limit
+        started = time.perf_counter()
+        if plan.strategy == STRATEGY_FIELDS:
+            scores = self._score_fields(plan, index, boosts or {}, allowed)
+        elif plan.strategy == STRATEGY_IMPACT_ORDERED and impacts is not None:
+            scores = self._score_impact_ordered(plan, depth, impacts, mask, index, allowed)
+        elif plan.strategy == STRATEGY_BOOLEAN_FIRST:
+            scores = self._score_boolean_first(plan, index, depth, allowed)
+        elif plan.strategy == STRATEGY_PRUNED:
+            scores = self._score_pruned(plan, index, depth, allowed)
+        else:
+            scores = self._score_exhaustive(plan, index, allowed)
+        plan.timings['score'] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        top = select_page(scores.items(), limit, after, offset)
+        plan.timings['sort'] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        query_terms = [t.term for t in plan.terms]
+        results = [
+            SearchResult(
+                document=index.documents[doc_id],
+                score=score,
+                snippet=self._generate_snippet(index.documents[doc_id].text, query_terms)
+            ) for doc_id, score in top
+        ]
+        plan.timings['snippets'] = time.perf_counter() - started
+        return results
+    
+    def _add_term(self, scores: Dict[str, float], term: str, idf: float, index,
+                  allowed: Optional[Container[str]] = None) -> int:
+        """Добавление вклада термина ко всем его документам"""
+        postings = index.terms[term]
+        for doc_id, tf in postings.items():
+            if allowed is not None and doc_id not in allowed:
+                continue
+            scores[doc_id] = scores.get(doc_id, 0) + tf / index.documents[doc_id].term_count * idf
+        return len(postings)
+    
+    def _score_exhaustive(self, plan: QueryPlan, index,
+                          allowed: Optional[Container[str]] = None) -> Dict[str, float]:
+        scores: Dict[str, float] = {}
+        for planned in plan.terms:
+            plan.postings_scanned += self._add_term(scores, planned.term, planned.idf, index, allowed)
+        return scores
+    
+    def _score_fields(self, plan: QueryPlan, index, boosts: Dict[str, float],
+                      allowed: Optional[Container[str]] = None) -> Dict[str, float]:
+        """
+        Оценка по полям: idf * сумма по полям (вес поля * tf в поле / длина поля)
+        
+        Постинги полей хранят частоты пути и заголовка документа одним кортежем, поэтому каждый
+        документ оценивается один раз на термин по всем совпавшим полям сразу
+        """
+        body_boost = boosts.get('body', 1.0)
+        field_boosts = [boosts.get(field, 0.0) for field in FIELDS]
+        field_terms = getattr(index, 'field_terms', {})
+        field_lengths = getattr(index, 'field_lengths', {})
+        
+        def field_score(doc_id: str, field_tfs) -> float:
+            return sum(boost * tf / length for boost, tf, length
+                       in zip(field_boosts, field_tfs, field_lengths[doc_id]) if tf)
+        
+        scores: Dict[str, float] = {}
+        for planned in plan.terms:
+            body = index.terms[planned.term] if planned.term in index.terms else {}
+            fields = field_terms.get(planned.term, {})
+            idf = planned.idf
+            for doc_id, tf in body.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                score = body_boost * tf / index.documents[doc_id].term_count
+                field_tfs = fields.get(doc_id)
+                if field_tfs:
+                    score += field_score(doc_id, field_tfs)
+                scores[doc_id] = scores.get(doc_id, 0) + score * idf
+            # Документы, где термин есть только в пути или заголовке
+            for doc_id, field_tfs in fields.items():
+                if doc_id in body or (allowed is not None and doc_id not in allowed):
+                    continue
+                scores[doc_id] = scores.get(doc_id, 0) + field_score(doc_id, field_tfs) * idf
+            plan.postings_scanned += len(body) + len(fields)
+        return scores
+    
+    def _score_impact_ordered(self, plan: QueryPlan, limit: int, impacts: ImpactOrderedPostings,
+                              mask, index, allowed: Optional[Container[str]] = None) -> Dict[str, float]:
+        """
+        Пороговый алгоритм по постингам в порядке вклада: чтение останавливается,
+        как только top-k гарантирован (см. ImpactOrderedPostings.top_k)
+        """
+        if any(planned.idf <= 0 for planned in plan.terms):
+            return self._score_exhaustive(plan, index, allowed)
+        rows, scanned = impacts.top_k([(planned.term, planned.idf) for planned in plan.terms], limit, mask)
+        plan.postings_scanned += scanned
+        return {impacts.doc_ids[row]: score for row, score in rows.items()}
+    
+    def _score_pruned(self, plan: QueryPlan, index, limit: int,
+                      allowed: Optional[Container[str]] = None) -> Dict[str, float]:
+        """
+        Редкие термины первыми; когда k-я оценка превышает максимально возможный вклад
+        оставшихся терминов (tf/len <= 1, значит вклад <= idf), новые документы уже не могут
+        попасть в top-k и оставшиеся термины лишь досчитывают найденных кандидатов
+        """
+        if any(planned.idf <= 0 for planned in plan.terms):
+            return self._score_exhaustive(plan, index, allowed)
+        
+        scores: Dict[str, float] = {}
+        for i, planned in enumerate(plan.terms):
+            remaining_bound = sum(t.idf for t in plan.terms[i:])
+            if len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] > remaining_bound:
+                postings = index.terms[planned.term]
+                for doc_id in scores:
+                    tf = postings.get(doc_id)
+                    if tf:
+                        scores[doc_id] += tf / index.documents[doc_id].term_count * planned.idf
+                plan.postings_scanned += len(scores)
+            else:
+                plan.postings_scanned += self._add_term(scores, planned.term, planned.idf, index, allowed)
+        return scores
+    
+    def _score_boolean_first(self, plan: QueryPlan, index, limit: int,
+                             allowed: Optional[Container[str]] = None) -> Dict[str, float]:
+        """
+        Пересечение постингов (от самого редкого термина) задает начальный порог top-k,
+        затем точный проход MaxScore: термины с наименьшим максимальным вкладом (tf/len <= 1,
+        значит вклад <= idf), сумма которых меньше порога, не порождают кандидатов и лишь
+        досчитывают документы из постингов остальных терминов. Выдача совпадает с полным
+        перебором при любом limit; если документов со всеми терминами меньше limit,
+        порога нет - обычное ранжирование с отсечением
+        """
+        if any(planned.idf <= 0 for planned in plan.terms):
+            return self._score_exhaustive(plan, index, allowed)
+        postings = [index.terms[planned.term] for planned in plan.terms]
+        candidates = list(postings[0])
+        if allowed is not None:
+            candidates = [doc_id for doc_id in candidates if doc_id in allowed]
+        for term_postings in postings[1:]:
+            candidates = [doc_id for doc_id in candidates if doc_id in term_postings]
+            if len(candidates) < limit:
+                return self._score_pruned(plan, index, limit, allowed)
+        plan.postings_scanned += len(postings[0]) + len(candidates) * (len(postings) - 1)
+        
+        def score(doc_id: str) -> float:
+            term_count = index.documents[doc_id].term_count
+            return sum(p[doc_id] / term_count * planned.idf
+                       for p, planned in zip(postings, plan.terms) if doc_id in p)
+        
+        threshold = heapq.nlargest(limit, map(score, candidates))[-1]
+        # Необязательные термины: документ только с ними не наберет порога
+        order = sorted(range(len(plan.terms)), key=lambda i: plan.terms[i].idf)
+        bound = 0.0
+        essential = 0
+        while essential < len(order) and bound + plan.terms[order[essential]].idf < threshold:
+            bound += plan.terms[order[essential]].idf
+            essential += 1
+        
+        scores: Dict[str, float] = {}
+        for i in order[essential:]:
+            for doc_id in postings[i]:
+                if doc_id in scores or (allowed is not None and doc_id not in allowed):
+                    continue
+                scores[doc_id] = score(doc_id)
+            plan.postings_scanned += len(postings[i])
+        plan.postings_scanned += len(scores) * essential
+        return scores
+    
     def _generate_snippet(self, text: str, query_terms: List[str]) -> str:
         """Генерация сниппета с подсветкой запросных терминов"""
         words = text.split()
         if len(words) > 10:  # Берем первые 10 слов
             return ' '.join(words[:10]) + '...'
-        return text
\ No newline at end of file
+        return text
+
+class CosineRanker(TFIDFRanker):
+    """Ранжирование по косинусной близости запроса и предвычисленных TF-IDF векторов документов"""
+    
+    def rank_planned(self, plan: QueryPlan, index, limit: int = 10,
+                     vectors: DocumentVectors = None, mask=None,
+                     impacts: Optional[ImpactOrderedPostings] = None, after: Optional[Boundary] = None,
+                     offset: int = 0) -> List[SearchResult]:
+        """
+        Ранжирование по плану запроса: разреженное скалярное произведение,
+        нормированное предвычисленными нормами документов
+        
+        Args:
+            plan: План от QueryPlanner (используются термины плана, отложенные не учитываются)
+            index: Индекс (или его снимок), по которому построены векторы
+            limit: Максимальное количество результатов
+            vectors: Векторы документов
+            mask: Битовая маска документов, прошедших фильтр (в порядке vectors.doc_ids)
+            impacts: Постинги по вкладу вес / норма документа (для стратегии impact-ordered)
+            after: Граница предыдущей страницы (оценка, документ)
+            offset: Номер первого результата страницы
+            
+        Returns:
+            List[SearchResult]: Отсортированные результаты (при равных оценках - по идентификатору)
+        """
+        query_terms = [t.term for t in plan.terms]
+        
+        if plan.strategy == STRATEGY_IMPACT_ORDERED and impacts is not None:
+            started = time.perf_counter()
+            weights = [(term, float(vectors.idf[vectors.vocabulary[term]]))
+                       for term in query_terms if term in vectors.vocabulary]
+            rows, scanned = impacts.top_k(weights, offset + limit, mask)
+            plan.postings_scanned += scanned
+            plan.timings['score'] = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            query_norm = math.sqrt(sum(weight * weight for _, weight in weights)) or 1.0
+            top = select_page(((vectors.doc_ids[row], score / query_norm) for row, score in rows.items() if score > 0),
+                              limit, after, offset)
+            plan.timings['sort'] = time.perf_counter() - started
+        else:
+            started = time.perf_counter()
+            scores = vectors.query_scores(query_terms)
+            if mask is not None:
+                scores[~mask] = 0.0
+            plan.postings_scanned += sum(t.df for t in plan.terms)
+            plan.timings['score'] = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            top = vectors.top_k(scores, limit, after=after) if after else vectors.top_k(scores, offset + limit)[offset:]
+            plan.timings['sort'] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        results = [
+            SearchResult(
+                document=index.documents[doc_id],
+                score=score,
+                snippet=self._generate_snippet(index.documents[doc_id].text, query_terms)
+            ) for doc_id, score in top
+        ]
+        plan.timings['snippets'] = time.perf_counter() - started
+        return results
@@ -1,40 +1,359 @@
-from typing import List
+import sys
+import time
+from dataclasses import astuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from ..models.document import SearchResult
 from ..utils.tokenizer import Tokenizer
-from .ranker import TFIDFRanker
+from .ann import SimilarityIndex
+from .cache_manager import CacheManager
+from .doc_values import DocFilter, DocValues
+from .impact_postings import ImpactOrderedPostings
+from .pagination import Boundary, Page, PageCursor, index_identity, query_fingerprint
+from .query_log import QueryLogger
+from .query_planner import QueryPlan, QueryPlanner
+from .ranker import CosineRanker, TFIDFRanker
+from .spelling import SpellingSuggester
+from .vectors import DocumentVectors
 
 class SearchManager:
     """Управление поисковыми запросами"""
     
-    def __init__(self, index):
+    def __init__(self, index, planner: QueryPlanner = None, vectors: DocumentVectors = None,
+                 similarity: SimilarityIndex = None, doc_values: DocValues = None,
+                 cache_manager: CacheManager = None, query_log: QueryLogger = None,
+                 impacts: ImpactOrderedPostings = None, field_boosts: Dict[str, float] = None,
+                 spelling: SpellingSuggester = None, auto_correct: bool = False):
+        """
+        Args:
+            index: Индекс
+            planner: Планировщик запросов
+            vectors: Векторы документов (IndexManager.finalize()); пока они соответствуют
+                версии индекса, запросы ранжируются по косинусной близости
+            similarity: Приближенный индекс похожих документов для similar()
+            doc_values: Столбцы метаданных для фильтров и фасетов (строятся при необходимости)
+            cache_manager: Менеджер кэшей; если задан, результаты запросов кэшируются
+                в кэше query_results с его бюджетом
+            query_log: Журнал запросов (термины, лимит, задержка, число результатов, попадание в кэш)
+            impacts: Постинги по вкладу для ранней остановки коротких запросов; используются,
+                пока соответствуют версии индекса и функции оценки (cosine - при векторах, иначе tfidf)
+            field_boosts: Веса полей body, title, path по умолчанию для всех запросов
+                (None - ранжирование только по телу документа)
+            spelling: Словарь исправлений опечаток для suggest()
+            auto_correct: Повторять запрос без результатов с исправленными терминами
+        """
         self.index = index
         self.ranker = TFIDFRanker()
+        self.cosine_ranker = CosineRanker()
         self.tokenizer = Tokenizer()
+        self.planner = planner or QueryPlanner()
+        self.vectors = vectors
+        self.similarity = similarity
+        self.doc_values = doc_values
+        self.result_cache = cache_manager.cache('query_results', 16 * 1024 * 1024) if cache_manager else None
+        self.query_log = query_log
+        self.impacts = impacts
+        self.field_boosts = field_boosts
+        self.spelling = spelling
+        self.auto_correct = auto_correct
     
-    def search(self, query: str, limit: int = 10) -> List[SearchResult]:
+    def search(self, query: str, limit: int = 10, filters: DocFilter = None,
+               boosts: Dict[str, float] = None) -> List[SearchResult]:
         """
         Выполняет поиск по запросу
         
         Args:
             query: Поисковый запрос
             limit: Максимальное количество результатов
+            filters: Фильтр по метаданным (каталог, расширение, размер, время изменения)
+            boosts: Веса полей body, title, path для этого запроса (по умолчанию - field_boosts)
             
         Returns:
             List[SearchResult]: Отсортированные результаты поиска
         """
+        return self._search(query, limit, filters, boosts)[0]
+    
+    def search_page(self, query: str, limit: int = 10, cursor: Optional[str] = None, offset: int = 0,
+                    filters: DocFilter = None, boosts: Dict[str, float] = None) -> Page:
+        """
+        Страница выдачи по курсору или смещению
+        
+        Курсор хранит границу предыдущей страницы (оценку и идентификатор последнего документа),
+        поэтому глубокая страница отбирает только limit документов после границы, а не
+        offset + limit с последующим отбрасыванием. Порядок детерминирован: при равных оценках
+        документы упорядочены по идентификатору. Если индекс изменился (или загружен другой)
+        после выдачи курсора, выдача продолжается от той же границы по новому индексу (page.stale).
+        
+        Args:
+            query: Поисковый запрос (для следующих страниц - page.query)
+            limit: Размер страницы
+            cursor: Курсор из предыдущей страницы (next_cursor); ValueError, если он поврежден
+                или выдан для другого запроса, фильтра или весов полей
+            offset: Номер первого результата, если курсора нет
+            filters: Фильтр по метаданным
+            boosts: Веса полей (по умолчанию - field_boosts)
+            
+        Returns:
+            Page: Результаты, курсор следующей страницы и выполненный запрос
+        """
+        after = None
+        stale = False
+        if cursor is not None:
+            page_cursor = PageCursor.decode(cursor)
+            if page_cursor.query_hash != query_fingerprint(query, filters, boosts or self.field_boosts):
+                raise ValueError("Курсор страницы выдан для другого запроса, фильтра или весов полей")
+            after, offset = page_cursor.boundary, page_cursor.offset
+            stale = page_cursor.index_id != index_identity(self._current_index())
+        
+        results, query, index_id = self._search(query, limit, filters, boosts, after, offset)
+        next_cursor = None
+        if results and len(results) == limit:
+            last = results[-1]
+            next_cursor = PageCursor(last.score, last.document.id, offset + len(results),
+                                     query_fingerprint(query, filters, boosts or self.field_boosts),
+                                     index_id).encode()
+        return Page(results, next_cursor, offset, query, stale)
+    
+    def _query_terms(self, query: str) -> List[str]:
+        """
+        Термины запроса без стоп-слов; если индекс построен с отсечением терминов,
+        удаляются и его стоп-слова и отсеченные частые термины (как при индексации)
+        """
+        pruning = getattr(self.index, 'pruning', None)
+        stopwords = Tokenizer.STOPWORDS | pruning.excluded if pruning is not None else None
+        return self.tokenizer.remove_stopwords(self.tokenizer.tokenize(query), stopwords)
+    
+    def _current_index(self):
+        return self.index.snapshot() if hasattr(self.index, 'snapshot') else self.index
+    
+    def _search(self, query: str, limit: int, filters: DocFilter, boosts: Dict[str, float] = None,
+                after: Optional[Boundary] = None, offset: int = 0) -> Tuple[List[SearchResult], str, Optional[str]]:
+        """
+        Поиск с кэшем, исправлением опечаток и журналом; возвращает выполненный запрос
+        и идентичность индекса (index_identity)
+        """
+        started = time.perf_counter()
+        executed = query
+        results, cache_hit, index_id = self._search_cached(query, limit, filters, boosts, after, offset)
+        # Исправление - только для первой страницы: следующие продолжают выполненный запрос
+        if not results and self.auto_correct and after is None and not offset:
+            corrected = self.suggest(query)
+            if corrected is not None:
+                executed = corrected
+                results, cache_hit, index_id = self._search_cached(corrected, limit, filters, boosts)
+        if self.query_log is not None:
+            terms = self._query_terms(query)
+            self.query_log.record(query, terms, limit, time.perf_counter() - started, len(results), cache_hit)
+        return results, executed, index_id
+    
+    def _search_cached(self, query: str, limit: int, filters: DocFilter, boosts: Dict[str, float] = None,
+                       after: Optional[Boundary] = None,
+                       offset: int = 0) -> Tuple[List[SearchResult], bool, Optional[str]]:
+        index = self._current_index()
+        index_id = index_identity(index)
+        if self.result_cache is None:
+            results, _, _ = self._execute(query, limit, filters, index=index, boosts=boosts,
+                                          after=after, offset=offset)
+            return results, False, index_id
+        
+        # Построение и версия индекса в ключе: после изменения индекса или загрузки другого
+        # старые записи просто перестают совпадать
+        boosts = boosts or self.field_boosts
+        key = (getattr(index, 'build_id', None), getattr(index, 'version', None), query, limit,
+               astuple(filters) if filters else None, tuple(sorted(boosts.items())) if boosts else None, after, offset)
+        results = self.result_cache.get(key)
+        if results is not None:
+            return list(results), True, index_id
+        
+        results, _, _ = self._execute(query, limit, filters, index=index, boosts=boosts, after=after, offset=offset)
+        # Документы принадлежат индексу, поэтому учитываются только результаты и фрагменты
+        size = sys.getsizeof(results) + sum(sys.getsizeof(r) + sys.getsizeof(r.snippet) for r in results)
+        self.result_cache.put(key, results, size)
+        return list(results), False, index_id
+    
+    def suggest(self, query: str) -> Optional[str]:
+        """
+        Исправленный запрос ("возможно, вы имели в виду"): термины, которых нет в индексе,
+        заменяются ближайшими по словарю исправлений
+        
+        Args:
+            query: Поисковый запрос
+            
+        Returns:
+            Optional[str]: Исправленный запрос или None, если исправлять нечего
+        """
+        if self.spelling is None:
+            return None
+        query_tokens = self._query_terms(query)
+        index = self._current_index()
+        field_terms = getattr(index, 'field_terms', {})
+        known = [term for term in query_tokens if term in index.terms or term in field_terms]
+        corrected = self.spelling.correct(query_tokens, known)
+        return ' '.join(corrected) if corrected != query_tokens else None
+    
+    def search_with_facets(self, query: str, limit: int = 10, filters: DocFilter = None,
+                           boosts: Dict[str, float] = None) -> Tuple[List[SearchResult], Dict[str, Dict[str, int]]]:
+        """
+        Поиск с фасетами по всем совпавшим документам (а не только по первым limit)
+        
+        Args:
+            query: Поисковый запрос
+            limit: Максимальное количество результатов
+            filters: Фильтр по метаданным
+            boosts: Веса полей (по умолчанию - field_boosts)
+            
+        Returns:
+            Tuple: Результаты и фасеты (поле -> значение -> количество документов)
+        """
+        results, _, facets = self._execute(query, limit, filters, with_facets=True, boosts=boosts)
+        return results, facets or {}
+    
+    def explain(self, query: str, limit: int = 10, filters: DocFilter = None,
+                boosts: Dict[str, float] = None) -> Optional[QueryPlan]:
+        """
+        Выполняет запрос и возвращает его план с временем этапов
+        
+        Args:
+            query: Поисковый запрос
+            limit: Максимальное количество результатов
+            filters: Фильтр по метаданным
+            boosts: Веса полей (по умолчанию - field_boosts)
+            
+        Returns:
+            Optional[QueryPlan]: План (None для пустого запроса); текст - plan.explain()
+        """
+        _, plan, _ = self._execute(query, limit, filters, boosts=boosts)
+        return plan
+    
+    def _execute(self, query: str, limit: int, filters: DocFilter = None, with_facets: bool = False,
+                 index=None, boosts: Dict[str, float] = None, after: Optional[Boundary] = None, offset: int = 0):
         if not query.strip():
-            return []
+            return [], None, None
             
         # Токенизация запроса
-        query_tokens = self.tokenizer.tokenize(query)
-        query_tokens = self.tokenizer.remove_stopwords(query_tokens)
+        started = time.perf_counter()
+        query_tokens = self._query_terms(query)
+        tokenize_time = time.perf_counter() - started
         
         if not query_tokens:
+            return [], None, None
+            
+        # Ранжирование документов по согласованному снимку индекса, если индекс его поддерживает
+        if index is None:
+            index = self._current_index()
+        
+        # Ранжирование по полям - TF-IDF по телу, пути и заголовку (векторы строятся только по телу)
+        boosts = boosts or self.field_boosts
+        fields = bool(boosts) and hasattr(index, 'field_terms')
+        vectors = None if fields else self._current_vectors(index)
+        impacts = None if fields else self._current_impacts(index, 'cosine' if vectors is not None else 'tfidf')
+        
+        # Планирование: df терминов, порядок от редких к частым, выбор стратегии
+        started = time.perf_counter()
+        plan = self.planner.plan(query_tokens, index, impact_ordered=impacts is not None, fields=fields)
+        plan.timings['tokenize'] = tokenize_time
+        plan.timings['plan'] = time.perf_counter() - started
+        
+        # Фильтр превращается в битовую маску до ранжирования
+        doc_values = mask = None
+        if with_facets or (filters is not None and not filters.is_empty()):
+            doc_values = self._current_doc_values(index)
+        if filters is not None and not filters.is_empty():
+            started = time.perf_counter()
+            mask = doc_values.mask(filters)
+            plan.timings['filter'] = time.perf_counter() - started
+        
+        if vectors is not None:
+            results = self.cosine_ranker.rank_planned(plan, index, limit, vectors, mask, impacts, after, offset)
+        else:
+            allowed = doc_values.allowed_ids(mask) if mask is not None else None
+            results = self.ranker.rank_planned(plan, index, limit, allowed, impacts, mask, boosts, after, offset)
+        
+        facets = None
+        if with_facets:
+            started = time.perf_counter()
+            matched = np.zeros(len(doc_values), dtype=bool)
+            for planned in plan.terms:
+                doc_ids = list(index.terms[planned.term]) if planned.term in index.terms else []
+                if fields:
+                    doc_ids += index.field_terms.get(planned.term, {})
+                matched[[doc_values.rows[doc_id] for doc_id in doc_ids]] = True
+            if mask is not None:
+                matched &= mask
+            facets = doc_values.facets(np.flatnonzero(matched))
+            plan.timings['facets'] = time.perf_counter() - started
+        return results, plan, facets
+    
+    def _current_doc_values(self, index) -> DocValues:
+        """Столбцы метаданных той же версии, что и снимок (перестраиваются после изменений)"""
+        doc_values = self.doc_values
+        if doc_values is None or doc_values.version != getattr(index, 'version', None):
+            doc_values = self.doc_values = DocValues.build(index)
+        return doc_values
+    
+    def _current_vectors(self, index) -> Optional[DocumentVectors]:
+        """Векторы, построенные по той же версии индекса, что и снимок"""
+        vectors = self.vectors
+        if vectors is None or vectors.version != getattr(index, 'version', None):
+            return None
+        return vectors
+    
+    def _current_impacts(self, index, kind: str) -> Optional[ImpactOrderedPostings]:
+        """Постинги по вкладу той же версии индекса и для той же функции оценки"""
+        impacts = self.impacts
+        if impacts is None or impacts.kind != kind or impacts.version != getattr(index, 'version', None):
+            return None
+        return impacts
+    
+    def more_like_this(self, doc_id: str, limit: int = 10) -> List[SearchResult]:
+        """
+        Документы, похожие на данный (косинусная близость TF-IDF векторов)
+        
+        Args:
+            doc_id: Идентификатор документа
+            limit: Максимальное количество результатов
+            
+        Returns:
+            List[SearchResult]: Похожие документы без самого документа
+        """
+        index = self.index.snapshot() if hasattr(self.index, 'snapshot') else self.index
+        vectors = self._current_vectors(index)
+        if vectors is None:
+            # Векторы устарели или не построены - строим по текущему снимку и запоминаем
+            vectors = self.vectors = DocumentVectors.build(index)
+        if doc_id not in vectors.rows:
             return []
+        
+        top = vectors.top_k(vectors.similar_scores(doc_id), limit, exclude=vectors.rows[doc_id])
+        return self._similar_results(index, top)
+    
+    def similar(self, doc_id: str, k: int = 10) -> List[SearchResult]:
+        """
+        Похожие документы по приближенному индексу (IVF над плотными проекциями);
+        без индекса - точный перебор more_like_this
+        
+        Args:
+            doc_id: Идентификатор документа
+            k: Количество результатов
             
-        # Ранжирование документов
-        results = self.ranker.rank(query_tokens, self.index, limit)
-        return results
+        Returns:
+            List[SearchResult]: Похожие документы без самого документа
+        """
+        index = self.index.snapshot() if hasattr(self.index, 'snapshot') else self.index
+        if self.similarity is None or doc_id not in self.similarity.rows:
+            return self.more_like_this(doc_id, k)
+        top = [(similar_id, score) for similar_id, score in self.similarity.similar(doc_id, k)
+               if similar_id in index.documents]
+        return self._similar_results(index, top)
+    
+    def _similar_results(self, index, top) -> List[SearchResult]:
+        return [
+            SearchResult(
+                document=index.documents[similar_id],
+                score=score,
+                snippet=self.ranker._generate_snippet(index.documents[similar_id].text, [])
+            ) for similar_id, score in top
+        ]
     
     def batch_search(self, queries: List[str]) -> List[List[SearchResult]]:
         """
@@ -0,0 +1,500 @@
+import os
+import math
+import logging
+import weakref
+import threading
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple
+from ..models.document import Document
+from .index_manager import InvertedIndex
+from .index_storage import IndexReader, IndexWriter, new_build_id, read_manifest, segment_name, write_manifest
+from .postings_codecs import get_codec
+
+# Пауза фонового слияния после ошибки удваивается до этого предела, с
+MERGE_MAX_BACKOFF = 60.0
+
+logger = logging.getLogger(__name__)
+
+class MemorySegment:
+    """Изменяемый сегмент в памяти, куда попадают новые документы"""
+    
+    def __init__(self, index: InvertedIndex = None, deleted: Set[str] = None):
+        self.index = index or InvertedIndex()
+        self.deleted: Set[str] = deleted if deleted is not None else set()
+    
+    @property
+    def documents(self) -> Mapping[str, Document]:
+        return self.index.documents
+    
+    @property
+    def doc_count(self) -> int:
+        return len(self.index.documents)
+    
+    def postings(self, term: str) -> Optional[Dict[str, int]]:
+        return self.index.terms.get(term)
+    
+    def has_term(self, term: str) -> bool:
+        return term in self.index.terms
+    
+    def term_names(self) -> Iterator[str]:
+        return iter(self.index.terms)
+    
+    def frozen(self) -> 'MemorySegment':
+        """Неизменяемый вид сегмента для снимка (copy-on-write снимок индекса)"""
+        return MemorySegment(self.index.snapshot(), set(self.deleted))
+
+class DiskSegment:
+    """
+    Неизменяемый сегмент, записанный на диск
+    
+    Сегмент считает ссылки: одну держит список сегментов индекса, по одной - каждый снимок,
+    в который он входит. Когда ссылок не остается, читатель закрывается, а сегмент,
+    выведенный из индекса слиянием (retire), удаляется с диска.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.reader = IndexReader(path)
+        self.documents: Dict[str, Document] = {doc.id: doc for doc in self.reader.iter_documents()}
+        self._doc_ids = list(self.documents)
+        self.deleted: Set[str] = set(self.reader.header.get('metadata', {}).get('deleted', []))
+        self._refs = 1
+        self._obsolete = False
+        self._ref_lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        with self._ref_lock:
+            self._refs += 1
+    
+    def release(self) -> None:
+        """Снятие ссылки; последняя закрывает читатель (и удаляет файл выведенного сегмента)"""
+        with self._ref_lock:
+            self._refs -= 1
+            if self._refs > 0:
+                return
+        self.reader.close()
+        if self._obsolete:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Не удалось удалить файл сегмента {self.path}: {e}")
+    
+    def retire(self, obsolete: bool = False) -> None:
+        """
+        Вывод сегмента из списка индекса (снимает ссылку индекса)
+        
+        Args:
+            obsolete: Сегмент заменен слиянием - удалить файл, когда его отпустят все снимки
+        """
+        self._obsolete = obsolete
+        self.release()
+    
+    @property
+    def doc_count(self) -> int:
+        return len(self.documents)
+    
+    def postings(self, term: str) -> Optional[Dict[str, int]]:
+        if term not in self.reader.dictionary:
+            return None
+        doc_ords, freqs = self.reader.read_postings(term)
+        return {self._doc_ids[i]: f for i, f in zip(doc_ords.tolist(), freqs.tolist())}
+    
+    def has_term(self, term: str) -> bool:
+        return term in self.reader.dictionary
+    
+    def term_names(self) -> Iterator[str]:
+        return iter(self.reader.dictionary)
+
+def _release_segments(segments: Tuple) -> None:
+    for seg in segments:
+        if isinstance(seg, DiskSegment):
+            seg.release()
+
+class _SegmentLease:
+    """
+    Ссылки снимка на его дисковые сегменты. Снимаются, когда снимок и его словари terms и
+    documents больше никем не используются (словари держат аренду, а не сам снимок, чтобы
+    не было цикла ссылок и освобождение не ждало сборщика циклов)
+    """
+    
+    def __init__(self, segments: Tuple):
+        self.segments = segments
+        for seg in segments:
+            if isinstance(seg, DiskSegment):
+                seg.acquire()
+        weakref.finalize(self, _release_segments, segments)
+    
+    def is_visible(self, doc_id: str, position: int) -> bool:
+        """Документ сегмента position не перекрыт более новыми сегментами"""
+        return not any(doc_id in seg.documents or doc_id in seg.deleted
+                       for seg in self.segments[position + 1:])
+    
+    def merge_postings(self, term: str) -> Optional[Dict[str, int]]:
+        merged: Optional[Dict[str, int]] = None
+        for position, seg in enumerate(self.segments):
+            postings = seg.postings(term)
+            if postings is None:
+                continue
+            if merged is None:
+                merged = {}
+            newer = self.segments[position + 1:]
+            for doc_id, tf in postings.items():
+                if not any(doc_id in s.documents or doc_id in s.deleted for s in newer):
+                    merged[doc_id] = tf
+        return merged
+
+class _SnapshotTerms(Mapping):
+    """Объединенный по сегментам словарь термин -> {doc_id: tf}"""
+    
+    def __init__(self, snapshot: _SegmentLease):
+        self._snapshot = snapshot
+        self._cache: Dict[str, Dict[str, int]] = {}
+    
+    def __getitem__(self, term: str) -> Dict[str, int]:
+        if term not in self._cache:
+            merged = self._snapshot.merge_postings(term)
+            if merged is None:
+                raise KeyError(term)
+            self._cache[term] = merged
+        return self._cache[term]
+    
+    def __contains__(self, term) -> bool:
+        return term in self._cache or any(seg.has_term(term) for seg in self._snapshot.segments)
+    
+    def __iter__(self) -> Iterator[str]:
+        seen: Set[str] = set()
+        for seg in self._snapshot.segments:
+            for term in seg.term_names():
+                if term not in seen:
+                    seen.add(term)
+                    yield term
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+class _SnapshotDocuments(Mapping):
+    """Видимые в снимке документы: побеждает самый новый сегмент"""
+    
+    def __init__(self, snapshot: _SegmentLease, total_docs: int):
+        self._snapshot = snapshot
+        self._total_docs = total_docs
+    
+    def __getitem__(self, doc_id: str) -> Document:
+        for seg in reversed(self._snapshot.segments):
+            if doc_id in seg.documents:
+                return seg.documents[doc_id]
+            if doc_id in seg.deleted:
+                break
+        raise KeyError(doc_id)
+    
+    def __iter__(self) -> Iterator[str]:
+        for position, seg in enumerate(self._snapshot.segments):
+            for doc_id in seg.documents:
+                if self._snapshot.is_visible(doc_id, position):
+                    yield doc_id
+    
+    def __len__(self) -> int:
+        return self._total_docs
+
+class SegmentSnapshot:
+    """
+    Снимок списка сегментов на момент времени.
+    Предоставляет тот же интерфейс, что и InvertedIndex (terms, documents, total_docs).
+    Пока снимок (или его terms/documents) используется, его дисковые сегменты не закрываются.
+    """
+    
+    def __init__(self, segments: Tuple, total_docs: int, version: int, build_id: Optional[str] = None):
+        self.segments = segments
+        self.total_docs = total_docs
+        self.version = version
+        self.build_id = build_id
+        self._lease = _SegmentLease(segments)
+        self.terms = _SnapshotTerms(self._lease)
+        self.documents = _SnapshotDocuments(self._lease, total_docs)
+    
+    def is_visible(self, doc_id: str, position: int) -> bool:
+        """Документ сегмента position не перекрыт более новыми сегментами"""
+        return self._lease.is_visible(doc_id, position)
+    
+    def merge_postings(self, term: str) -> Optional[Dict[str, int]]:
+        return self._lease.merge_postings(term)
+
+class TieredMergePolicy:
+    """
+    Ярусная политика слияния: сегменты близкого размера (один ярус)
+    сливаются, когда подряд их набирается segments_per_tier
+    """
+    
+    def __init__(self, segments_per_tier: int = 4, max_merge_at_once: int = 8, floor_docs: int = 1000):
+        self.segments_per_tier = segments_per_tier
+        self.max_merge_at_once = max_merge_at_once
+        self.floor_docs = floor_docs
+    
+    def tier(self, doc_count: int) -> int:
+        """Номер яруса по размеру сегмента"""
+        ratio = max(doc_count, self.floor_docs) / self.floor_docs
+        return int(math.log(ratio, self.segments_per_tier)) if ratio > 1 else 0
+    
+    def find_merge(self, sizes: List[int]) -> Optional[Tuple[int, int]]:
+        """
+        Поиск непрерывного диапазона сегментов одного яруса для слияния
+        
+        Args:
+            sizes: Размеры сегментов (в документах) от старых к новым
+        
+        Returns:
+            Optional[Tuple[int, int]]: Диапазон [start, end) или None
+        """
+        best = None
+        start = 0
+        while start < len(sizes):
+            tier = self.tier(sizes[start])
+            end = start
+            while end < len(sizes) and self.tier(sizes[end]) == tier:
+                end += 1
+            if end - start >= self.segments_per_tier and (best is None or tier < best[0]):
+                best = (tier, start, min(end, start + self.max_merge_at_once))
+            start = end
+        return best[1:] if best else None
+
+class SegmentedIndex:
+    """
+    Сегментированный индекс (LSM): новые документы попадают в сегмент в памяти,
+    который сбрасывается в неизменяемые сегменты на диске; сегменты сливаются в фоне.
+    Поиск идет по снимку списка сегментов (snapshot) и не блокируется записью.
+    
+    Несброшенные документы сегмента в памяти теряются при аварийном завершении -
+    вызывайте flush() или close().
+    """
+    
+    def __init__(self, directory: str, flush_threshold: int = 1000, codec: str = 'varint',
+                 merge_policy: TieredMergePolicy = None, background_merge: bool = True):
+        self.directory = directory
+        self.flush_threshold = flush_threshold
+        self.codec = get_codec(codec)
+        self.merge_policy = merge_policy or TieredMergePolicy(floor_docs=flush_threshold)
+        self.logger = logging.getLogger(__name__)
+        
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._merge_condition = threading.Condition(self._lock)
+        self._segments: List[DiskSegment] = []
+        self._memory = MemorySegment()
+        self._frozen_memory: Optional[MemorySegment] = None
+        self._snapshot: Optional[SegmentSnapshot] = None
+        self._next_segment = 1
+        self._version = 0
+        self._build_id = new_build_id()
+        self._closed = False
+        self._live_docs = 0
+        
+        self._load_manifest()
+        self._live_docs = self._count_live_docs()
+        self._invalidate()
+        
+        self._merge_thread = None
+        if background_merge:
+            self._merge_thread = threading.Thread(target=self._merge_loop, name='segment-merge', daemon=True)
+            self._merge_thread.start()
+    
+    # --- манифест -------------------------------------------------------
+    
+    def _load_manifest(self) -> None:
+        manifest = read_manifest(self.directory)
+        if manifest is None:
+            return
+        self._segments = [DiskSegment(os.path.join(self.directory, name)) for name in manifest['segments']]
+        self._next_segment = manifest['next_segment']
+        self.logger.info(f"Открыт сегментированный индекс: {self.directory}, сегментов: {len(self._segments)}")
+    
+    def _write_manifest(self) -> None:
+        write_manifest(self.directory, {'segments': [seg.name for seg in self._segments],
+                                        'next_segment': self._next_segment})
+    
+    def _count_live_docs(self) -> int:
+        return sum(1 for _ in self.snapshot().documents)
+    
+    # --- запись ---------------------------------------------------------
+    
+    def _locate(self, doc_id: str) -> bool:
+        """Виден ли документ сейчас (поиск от нового сегмента к старому)"""
+        for seg in [*self._segments, self._memory][::-1]:
+            if doc_id in seg.documents:
+                return True
+            if doc_id in seg.deleted:
+                return False
+        return False
+    
+    def add_document(self, doc: Document) -> None:
+        """Добавление или обновление документа"""
+        with self._lock:
+            existed = self._locate(doc.id)
+            self._memory.index.remove_document(doc.id)
+            self._memory.deleted.discard(doc.id)
+            self._memory.index.add_document(doc)
+            if not existed:
+                self._live_docs += 1
+            self._invalidate()
+        
+        if self._memory.doc_count >= self.flush_threshold:
+            self.flush()
+    
+    def delete_document(self, doc_id: str) -> bool:
+        """Удаление документа (tombstone в сегменте в памяти)"""
+        with self._lock:
+            if not self._locate(doc_id):
+                return False
+            self._memory.index.remove_document(doc_id)
+            self._memory.deleted.add(doc_id)
+            self._live_docs -= 1
+            self._invalidate()
+            return True
+    
+    def _invalidate(self) -> None:
+        self._version += 1
+        self._frozen_memory = None
+        self._snapshot = None
+    
+    def flush(self) -> None:
+        """Сброс сегмента в памяти в новый сегмент на диске"""
+        with self._lock:
+            memory = self._memory
+            if memory.doc_count == 0 and not memory.deleted:
+                return
+            name = segment_name(self._next_segment)
+            self._next_segment += 1
+        
+        # Сегмент в памяти меняет только пишущий поток, поэтому запись идет без блокировки
+        path = os.path.join(self.directory, name)
+        IndexWriter(self.codec).write(memory.index, path, metadata={'deleted': sorted(memory.deleted)})
+        segment = DiskSegment(path)
+        
+        with self._lock:
+            self._segments.append(segment)
+            self._memory = MemorySegment()
+            self._write_manifest()
+            self._invalidate()
+            self._merge_condition.notify()
+        self.logger.info(f"Сегмент сброшен на диск: {name}, документов: {segment.doc_count}")
+    
+    # --- чтение ---------------------------------------------------------
+    
+    def snapshot(self) -> SegmentSnapshot:
+        """Согласованный снимок списка сегментов на текущий момент"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                if self._frozen_memory is None:
+                    self._frozen_memory = self._memory.frozen()
+                segments = (*self._segments, self._frozen_memory)
+                self._snapshot = SegmentSnapshot(segments, self._live_docs, self._version, self._build_id)
+            return self._snapshot
+    
+    @property
+    def total_docs(self) -> int:
+        return self._live_docs
+    
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+    
+    # --- слияние --------------------------------------------------------
+    
+    def maybe_merge(self) -> bool:
+        """
+        Одно слияние по политике, если оно требуется
+        
+        Returns:
+            bool: True, если слияние выполнено
+        """
+        with self._lock:
+            run = self.merge_policy.find_merge([seg.doc_count for seg in self._segments])
+            if run is None:
+                return False
+            start, end = run
+            to_merge = self._segments[start:end]
+            drop_tombstones = start == 0
+            name = segment_name(self._next_segment)
+            self._next_segment += 1
+        
+        merged, deleted = self._merge_segments(to_merge, drop_tombstones)
+        path = os.path.join(self.directory, name)
+        IndexWriter(self.codec).write(merged, path, metadata={'deleted': sorted(deleted)})
+        segment = DiskSegment(path)
+        
+        with self._lock:
+            # Пока шло слияние, новые сегменты могли только добавиться в конец
+            start = self._segments.index(to_merge[0])
+            self._segments[start:start + len(to_merge)] = [segment]
+            self._write_manifest()
+            self._invalidate()
+        # Файлы слитых сегментов удаляются, когда их отпустят снимки выполняющихся запросов
+        for seg in to_merge:
+            seg.retire(obsolete=True)
+        
+        self.logger.info(f"Слито сегментов: {len(to_merge)} -> {name}, документов: {segment.doc_count}")
+        return True
+    
+    @staticmethod
+    def _merge_segments(segments: List, drop_tombstones: bool) -> Tuple[InvertedIndex, Set[str]]:
+        """Слияние диапазона сегментов с учетом перекрытий и tombstone"""
+        view = SegmentSnapshot(tuple(segments), 0, 0)
+        merged = InvertedIndex()
+        for position, seg in enumerate(segments):
+            for doc_id, doc in seg.documents.items():
+                if view.is_visible(doc_id, position):
+                    merged.documents[doc_id] = doc
+        merged.total_docs = len(merged.documents)
+        
+        for term in view.terms:
+            postings = view.merge_postings(term)
+            if postings:
+                merged.terms[term] = postings
+        
+        deleted: Set[str] = set()
+        if not drop_tombstones:
+            for seg in segments:
+                deleted.update(seg.deleted)
+            deleted -= set(merged.documents)
+        return merged, deleted
+    
+    def _merge_loop(self) -> None:
+        backoff = 0.0
+        while True:
+            with self._lock:
+                if backoff:
+                    # После ошибки - пауза (прерывается закрытием индекса), затем новая попытка
+                    self._merge_condition.wait_for(lambda: self._closed, timeout=backoff)
+                self._merge_condition.wait_for(lambda: self._closed or self._merge_needed())
+                if self._closed:
+                    return
+            try:
+                self.maybe_merge()
+                backoff = 0.0
+            except Exception as e:
+                backoff = min(max(backoff * 2, 1.0), MERGE_MAX_BACKOFF)
+                self.logger.exception(f"Ошибка фонового слияния сегментов, повтор через {backoff:.0f} с: {e}")
+    
+    def _merge_needed(self) -> bool:
+        return self.merge_policy.find_merge([seg.doc_count for seg in self._segments]) is not None
+    
+    def close(self) -> None:
+        """
+        Сброс сегмента в памяти, остановка фонового слияния и закрытие читателей сегментов
+        (сегменты снимков, которые еще используются, закрываются по их освобождении)
+        """
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._merge_condition.notify_all()
+        if self._merge_thread is not None:
+            self._merge_thread.join()
+        with self._lock:
+            segments, self._segments = self._segments, []
+            self._snapshot = None
+        for seg in segments:
+            seg.retire()
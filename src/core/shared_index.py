@@ -0,0 +1,363 @@
+import os
+import json
+import struct
+import multiprocessing
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.document import Document, SearchResult
+from ..utils.tokenizer import Tokenizer
+from .pagination import select_page
+from .query_planner import QueryPlanner
+from .ranker import TFIDFRanker
+from .wire import create_shared, decode_results, encode_results, open_shared, release_shared
+
+MAGIC = b'SIX1'
+_header_len = struct.Struct('<I')
+
+class _Strings:
+    """Массив строк поверх буфера: смещения int64 и UTF-8 блок (декодирование по обращению)"""
+    
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+    
+    @staticmethod
+    def pack(strings: Sequence[str]) -> Tuple[np.ndarray, bytes]:
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return offsets, b''.join(encoded)
+    
+    def raw(self, i: int) -> bytes:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes()
+    
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode('utf-8')
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def find(self, value: str, order: Optional[np.ndarray] = None) -> int:
+        """
+        Двоичный поиск строки (порядок байтов UTF-8 совпадает с порядком кодовых точек)
+        
+        Args:
+            value: Искомая строка
+            order: Перестановка, в которой строки отсортированы (None - уже отсортированы)
+        
+        Returns:
+            int: Номер строки или -1
+        """
+        key = value.encode('utf-8')
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            i = int(order[mid]) if order is not None else mid
+            current = self.raw(i)
+            if current == key:
+                return i
+            if current < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+class _SharedTerms(Mapping):
+    """Словарь термин -> {doc_id: tf} поверх разделяемых постингов (для планировщика и совместимости)"""
+    
+    def __init__(self, index: 'SharedIndex'):
+        self._index = index
+    
+    def __getitem__(self, term: str) -> Dict[str, int]:
+        col = self._index.term_col(term)
+        if col < 0:
+            raise KeyError(term)
+        doc_ords, freqs = self._index.postings_at(col)
+        doc_ids = self._index.doc_ids
+        return {doc_ids[row]: freq for row, freq in zip(doc_ords.tolist(), freqs.tolist())}
+    
+    def __contains__(self, term) -> bool:
+        return self._index.term_col(term) >= 0
+    
+    def __iter__(self) -> Iterator[str]:
+        terms = self._index.term_strings
+        return (terms[i] for i in range(len(terms)))
+    
+    def __len__(self) -> int:
+        return len(self._index.term_strings)
+
+class _SharedDocuments(Mapping):
+    """Словарь doc_id -> Document: документы собираются из разделяемой памяти по обращению"""
+    
+    def __init__(self, index: 'SharedIndex'):
+        self._index = index
+    
+    def __getitem__(self, doc_id: str) -> Document:
+        row = self._index.doc_ids.find(doc_id, self._index.arrays['id_order'])
+        if row < 0:
+            raise KeyError(doc_id)
+        return self._index.document(row)
+    
+    def __contains__(self, doc_id) -> bool:
+        return self._index.doc_ids.find(doc_id, self._index.arrays['id_order']) >= 0
+    
+    def __iter__(self) -> Iterator[str]:
+        doc_ids = self._index.doc_ids
+        return (doc_ids[i] for i in range(len(doc_ids)))
+    
+    def __len__(self) -> int:
+        return len(self._index.doc_ids)
+
+class SharedIndex:
+    """
+    Замороженный индекс в одном сегменте разделяемой памяти (multiprocessing.shared_memory)
+    
+    Словарь терминов (отсортированный, с двоичным поиском), постинги (номера документов и
+    частоты int32), длины документов и сами документы лежат массивами в сегменте; процессы-
+    обработчики подключаются к нему по имени и читают массивы без копирования, поэтому N
+    процессов занимают память одного индекса. Только для чтения; интерфейс как у DiskIndex.
+    """
+    
+    def __init__(self, segment, owner: bool = False):
+        """
+        Args:
+            segment: Сегмент разделяемой памяти с индексом
+            owner: Сегмент создан этим объектом (close() его удаляет)
+        """
+        self.segment = segment
+        self.owner = owner
+        buffer = segment.buf
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Сегмент не содержит индекс: {segment.name}")
+        (header_size,) = _header_len.unpack_from(buffer, len(MAGIC))
+        header_start = len(MAGIC) + _header_len.size
+        self.header = json.loads(bytes(buffer[header_start:header_start + header_size]).decode('utf-8'))
+        self.arrays: Dict[str, np.ndarray] = {
+            name: np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            for name, (offset, dtype, count) in self.header['sections'].items()
+        }
+        self.term_strings = _Strings(self.arrays['term_offsets'], self.arrays['term_blob'])
+        self.doc_ids = _Strings(self.arrays['id_offsets'], self.arrays['id_blob'])
+        self.terms = _SharedTerms(self)
+        self.documents = _SharedDocuments(self)
+        self.total_docs = self.header['total_docs']
+        self.version = self.header.get('version')
+    
+    @classmethod
+    def create(cls, index) -> 'SharedIndex':
+        """
+        Размещение индекса в новом сегменте разделяемой памяти
+        
+        Args:
+            index: Индекс или его снимок (InvertedIndex, DiskIndex)
+        
+        Returns:
+            SharedIndex: Индекс-владелец сегмента
+        """
+        if hasattr(index, 'snapshot'):
+            index = index.snapshot()
+        doc_ids = list(index.documents)
+        rows = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        docs = [index.documents[doc_id] for doc_id in doc_ids]
+        terms = sorted(index.terms, key=lambda t: t.encode('utf-8'))
+        
+        indptr = np.zeros(len(terms) + 1, dtype='<i8')
+        for i, term in enumerate(terms):
+            df = index.doc_freq(term) if hasattr(index, 'doc_freq') else len(index.terms[term])
+            indptr[i + 1] = indptr[i] + df
+        num_postings = int(indptr[-1])
+        
+        term_offsets, term_blob = _Strings.pack(terms)
+        id_offsets, id_blob = _Strings.pack(doc_ids)
+        text_offsets, text_blob = _Strings.pack([doc.text for doc in docs])
+        path_offsets, path_blob = _Strings.pack([doc.path for doc in docs])
+        id_order = np.array(sorted(range(len(doc_ids)), key=lambda i: doc_ids[i].encode('utf-8')), dtype='<i8')
+        sections = {
+            'term_offsets': term_offsets, 'term_blob': np.frombuffer(term_blob, dtype='u1'),
+            'indptr': indptr,
+            'doc_lengths': np.array([doc.term_count for doc in docs], dtype='<i4'),
+            'id_offsets': id_offsets, 'id_blob': np.frombuffer(id_blob, dtype='u1'), 'id_order': id_order,
+            'text_offsets': text_offsets, 'text_blob': np.frombuffer(text_blob, dtype='u1'),
+            'path_offsets': path_offsets, 'path_blob': np.frombuffer(path_blob, dtype='u1'),
+            'sizes': np.array([doc.size for doc in docs], dtype='<i8'),
+            'mtimes': np.array([doc.mtime for doc in docs], dtype='<f8'),
+        }
+        specs = {name: (array.dtype.str, len(array)) for name, array in sections.items()}
+        # Постинги - самая большая часть: они пишутся по терминам сразу в сегмент
+        specs['doc_ords'] = specs['freqs'] = ('<i4', num_postings)
+        
+        # Смещения считаются от начала сегмента, заголовок резервируется с запасом под их длину
+        layout = {}
+        offset = 0
+        for name, (dtype, count) in specs.items():
+            layout[name] = [offset, dtype, count]
+            offset += (np.dtype(dtype).itemsize * count + 7) & ~7
+        header = {'total_docs': index.total_docs, 'version': getattr(index, 'version', None), 'sections': layout}
+        reserve = len(json.dumps(header).encode('utf-8')) + 32 * len(specs) + 64
+        data_start = (len(MAGIC) + _header_len.size + reserve + 7) & ~7
+        for entry in layout.values():
+            entry[0] += data_start
+        header_bytes = json.dumps(header).encode('utf-8')
+        
+        # Сегмент выделяется сразу нужного размера, секции копируются в него без промежуточного буфера
+        segment = create_shared(data_start + offset)
+        try:
+            buffer = segment.buf
+            buffer[:len(MAGIC)] = MAGIC
+            _header_len.pack_into(buffer, len(MAGIC), len(header_bytes))
+            header_start = len(MAGIC) + _header_len.size
+            buffer[header_start:header_start + len(header_bytes)] = header_bytes
+            for name, array in sections.items():
+                start = layout[name][0]
+                buffer[start:start + array.nbytes] = memoryview(array).cast('B')
+            del sections
+            
+            doc_ords = np.frombuffer(buffer, dtype='<i4', count=num_postings, offset=layout['doc_ords'][0])
+            freqs = np.frombuffer(buffer, dtype='<i4', count=num_postings, offset=layout['freqs'][0])
+            for i, term in enumerate(terms):
+                postings = index.terms[term]
+                ords = np.fromiter((rows[doc_id] for doc_id in postings), dtype='<i4', count=len(postings))
+                order = np.argsort(ords, kind='stable')
+                doc_ords[indptr[i]:indptr[i + 1]] = ords[order]
+                tfs = np.fromiter(postings.values(), dtype='<i4', count=len(postings))
+                freqs[indptr[i]:indptr[i + 1]] = tfs[order]
+            # Массивы поверх сегмента должны быть освобождены до его закрытия
+            del doc_ords, freqs
+        except BaseException:
+            release_shared(segment)
+            raise
+        return cls(segment, owner=True)
+    
+    @classmethod
+    def attach(cls, name: str) -> 'SharedIndex':
+        """Подключение к индексу, созданному другим процессом (без копирования)"""
+        return cls(open_shared(name))
+    
+    @property
+    def name(self) -> str:
+        return self.segment.name
+    
+    @property
+    def nbytes(self) -> int:
+        return self.segment.size
+    
+    def term_col(self, term: str) -> int:
+        return self.term_strings.find(term)
+    
+    def postings_at(self, col: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.arrays['indptr'][col], self.arrays['indptr'][col + 1]
+        return self.arrays['doc_ords'][start:end], self.arrays['freqs'][start:end]
+    
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Номера документов и частоты термина (представления над сегментом)"""
+        col = self.term_col(term)
+        if col < 0:
+            return np.zeros(0, dtype='<i4'), np.zeros(0, dtype='<i4')
+        return self.postings_at(col)
+    
+    def doc_freq(self, term: str) -> int:
+        col = self.term_col(term)
+        return int(self.arrays['indptr'][col + 1] - self.arrays['indptr'][col]) if col >= 0 else 0
+    
+    def document(self, row: int) -> Document:
+        """Документ по номеру (текст декодируется из сегмента)"""
+        text = _Strings(self.arrays['text_offsets'], self.arrays['text_blob'])[row]
+        path = _Strings(self.arrays['path_offsets'], self.arrays['path_blob'])[row]
+        return Document(id=self.doc_ids[row], text=text, path=path, size=int(self.arrays['sizes'][row]),
+                        mtime=float(self.arrays['mtimes'][row]))
+    
+    def snapshot(self) -> 'SharedIndex':
+        return self
+    
+    def top_k(self, weights: Sequence[Tuple[str, float]], limit: int) -> List[Tuple[str, float]]:
+        """
+        TF-IDF оценки по массивам постингов (сумма вес * tf / длина документа)
+        
+        Args:
+            weights: Термины и их idf (из плана запроса)
+            limit: Количество документов
+        
+        Returns:
+            List[Tuple[str, float]]: Идентификаторы и оценки (при равных оценках - по идентификатору)
+        """
+        scores = np.zeros(self.total_docs, dtype=np.float64)
+        lengths = self.arrays['doc_lengths']
+        for term, weight in weights:
+            doc_ords, freqs = self.postings(term)
+            scores[doc_ords] += weight * freqs / lengths[doc_ords]
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit > 0:
+            kth = -np.partition(-scores[candidates], limit - 1)[limit - 1]
+            candidates = candidates[scores[candidates] >= kth]
+        return select_page(((self.doc_ids[row], float(scores[row])) for row in candidates.tolist()), limit)
+    
+    def close(self) -> None:
+        """Отключение от сегмента (владелец его удаляет)"""
+        self.arrays.clear()
+        self.term_strings = self.doc_ids = None
+        if self.owner:
+            release_shared(self.segment)
+        else:
+            self.segment.close()
+
+# Индекс, к которому подключен процесс-обработчик пула
+_worker_index: Optional[SharedIndex] = None
+
+def _attach_worker(name: str) -> None:
+    global _worker_index
+    _worker_index = SharedIndex.attach(name)
+
+def _search_worker(query: str, limit: int) -> bytes:
+    query_tokens = Tokenizer.remove_stopwords(Tokenizer.tokenize(query))
+    if not query_tokens:
+        return encode_results([], [])
+    plan = QueryPlanner().plan(query_tokens, _worker_index)
+    top = _worker_index.top_k([(planned.term, planned.idf) for planned in plan.terms], limit)
+    return encode_results([doc_id for doc_id, _ in top], [score for _, score in top])
+
+class SharedIndexPool:
+    """
+    Пул процессов-обработчиков запросов над одним индексом в разделяемой памяти
+    
+    Каждый процесс подключается к сегменту индекса, выполняет запросы TF-IDF ранжированием
+    (как TFIDFRanker при полном переборе) и возвращает идентификаторы и оценки в двоичном
+    формате (wire); документы и сниппеты выдачи собирает координатор.
+    """
+    
+    def __init__(self, index: SharedIndex, processes: Optional[int] = None):
+        """
+        Args:
+            index: Индекс в разделяемой памяти (координатор остается его владельцем)
+            processes: Количество процессов (по умолчанию - по числу ядер)
+        """
+        self.index = index
+        self.processes = processes or os.cpu_count() or 1
+        self._ranker = TFIDFRanker()
+        self._pool = multiprocessing.Pool(self.processes, initializer=_attach_worker, initargs=(index.name,))
+    
+    def search_ids(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Идентификаторы и оценки лучших документов (выполняется в одном из процессов)"""
+        doc_ids, scores = decode_results(self._pool.apply(_search_worker, (query, limit)))
+        return list(zip(doc_ids, scores.tolist()))
+    
+    def search(self, query: str, limit: int = 10) -> List[SearchResult]:
+        """Поиск с выдачей SearchResult"""
+        query_terms = Tokenizer.tokenize(query)
+        results = []
+        for doc_id, score in self.search_ids(query, limit):
+            doc = self.index.documents[doc_id]
+            results.append(SearchResult(doc, score, self._ranker._generate_snippet(doc.text, query_terms)))
+        return results
+    
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+    
+    def __enter__(self) -> 'SharedIndexPool':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
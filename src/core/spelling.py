@@ -0,0 +1,185 @@
+import os
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+@dataclass
+class Suggestion:
+    """Вариант исправления термина"""
+    term: str
+    distance: int
+    count: int
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Расстояние Дамерау-Левенштейна (с перестановкой соседних символов, OSA)
+    
+    Args:
+        a: Первая строка
+        b: Вторая строка
+        max_distance: Порог; при его превышении возвращается max_distance + 1
+    
+    Returns:
+        int: Расстояние или max_distance + 1
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+class SpellingSuggester:
+    """
+    Исправление опечаток по словарю индекса (SymSpell)
+    
+    Для каждого термина заранее строятся все варианты его префикса с удалением до
+    max_edit_distance символов; при поиске такие же удаления строятся для запроса, и кандидаты
+    берутся из словаря удалений без перебора всего словаря. Частота термина - число документов
+    с ним; словарь пополняется вместе с индексом (add_term/remove_term).
+    """
+    
+    def __init__(self, max_edit_distance: int = 2, prefix_length: int = 7):
+        """
+        Args:
+            max_edit_distance: Максимальное расстояние исправления
+            prefix_length: Длина префикса, по которому строятся удаления (ограничивает память)
+        """
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.counts: Dict[str, int] = {}
+        self.deletes: Dict[str, List[str]] = {}
+    
+    def __len__(self) -> int:
+        return sum(1 for count in self.counts.values() if count > 0)
+    
+    def _edits(self, word: str) -> Set[str]:
+        """Все варианты слова с удалением до max_edit_distance символов (включая само слово)"""
+        edits = {word}
+        frontier = {word}
+        for _ in range(self.max_edit_distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))} - edits
+            edits |= frontier
+        return edits
+    
+    def add_term(self, term: str, count: int = 1) -> None:
+        """
+        Учет термина (вызывается при добавлении документа с ним)
+        
+        Args:
+            term: Термин
+            count: На сколько увеличить частоту
+        """
+        # Термины с пунктуацией и числа не годятся в исправления
+        if not term.isalpha():
+            return
+        previous = self.counts.get(term)
+        self.counts[term] = (previous or 0) + count
+        if previous is None:
+            for edit in self._edits(term[:self.prefix_length]):
+                self.deletes.setdefault(edit, []).append(term)
+    
+    def remove_term(self, term: str, count: int = 1) -> None:
+        """Уменьшение частоты термина (удаленные термины перестают предлагаться)"""
+        if term in self.counts:
+            self.counts[term] = max(0, self.counts[term] - count)
+    
+    @classmethod
+    def build(cls, index, max_edit_distance: int = 2, prefix_length: int = 7) -> 'SpellingSuggester':
+        """
+        Построение по словарю индекса (частота - документная частота термина)
+        
+        Args:
+            index: Индекс или его снимок
+            max_edit_distance: Максимальное расстояние исправления
+            prefix_length: Длина префикса для удалений
+        
+        Returns:
+            SpellingSuggester: Словарь исправлений
+        """
+        suggester = cls(max_edit_distance, prefix_length)
+        doc_freq = getattr(index, 'doc_freq', None)
+        for term in index.terms:
+            suggester.add_term(term, doc_freq(term) if doc_freq else len(index.terms[term]))
+        return suggester
+    
+    def lookup(self, term: str, max_distance: Optional[int] = None, limit: int = 5) -> List[Suggestion]:
+        """
+        Варианты исправления термина
+        
+        Args:
+            term: Термин запроса
+            max_distance: Максимальное расстояние (по умолчанию max_edit_distance)
+            limit: Количество вариантов
+        
+        Returns:
+            List[Suggestion]: Варианты по возрастанию расстояния и убыванию частоты
+        """
+        max_distance = self.max_edit_distance if max_distance is None else min(max_distance,
+                                                                                self.max_edit_distance)
+        found: Dict[str, Suggestion] = {}
+        if self.counts.get(term, 0) > 0:
+            found[term] = Suggestion(term, 0, self.counts[term])
+        for edit in self._edits(term[:self.prefix_length]):
+            for candidate in self.deletes.get(edit, ()):
+                count = self.counts.get(candidate, 0)
+                if candidate in found or count <= 0:
+                    continue
+                distance = edit_distance(term, candidate, max_distance)
+                if distance <= max_distance:
+                    found[candidate] = Suggestion(candidate, distance, count)
+        return sorted(found.values(), key=lambda s: (s.distance, -s.count, s.term))[:limit]
+    
+    def correct(self, terms: Iterable[str], known: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Исправление терминов запроса: неизвестные термины заменяются лучшим вариантом
+        
+        Args:
+            terms: Термины запроса
+            known: Термины, которые не исправляются (например, есть в индексе)
+        
+        Returns:
+            List[str]: Исправленные термины (без вариантов термин остается как есть)
+        """
+        known = set(known or ())
+        corrected = []
+        for term in terms:
+            if term in known or self.counts.get(term, 0) > 0:
+                corrected.append(term)
+                continue
+            suggestions = self.lookup(term, limit=1)
+            corrected.append(suggestions[0].term if suggestions else term)
+        return corrected
+    
+    def save(self, filepath: str) -> None:
+        """Сохранение словаря частот и удалений в JSON (атомарно: временный файл и замена)"""
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'max_edit_distance': self.max_edit_distance, 'prefix_length': self.prefix_length,
+                       'counts': {term: count for term, count in self.counts.items() if count > 0},
+                       'deletes': self.deletes}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, filepath)
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'SpellingSuggester':
+        """Загрузка из JSON"""
+        with open(filepath, encoding='utf-8') as f:
+            data = json.load(f)
+        suggester = cls(data['max_edit_distance'], data['prefix_length'])
+        suggester.counts = data['counts']
+        suggester.deletes = data['deletes']
+        return suggester
+    
+    @staticmethod
+    def path_for(index_path: str) -> str:
+        """Путь к словарю исправлений рядом с файлом основного индекса"""
+        return index_path + '.spell.json'
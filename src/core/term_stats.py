@@ -0,0 +1,158 @@
+import csv
+import sys
+import heapq
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, TextIO, Tuple
+
+from .index_storage import IndexReader
+
+# Оценки памяти структур в процессе, байт (CPython, 64 бита)
+_DOCUMENT_OBJECT_BYTES = 56 + 104  # объект Document и его __dict__
+_VECTOR_BYTES_PER_POSTING = 2 * (8 + 4)  # CSR и CSC: float64 вес и int32 индекс
+# Для оценки по заголовку: пустая строка str и элемент dict с учетом заполнения таблицы (~2/3)
+_STR_BYTES = 49
+_POSTING_BYTES = 54
+
+@dataclass
+class TermStats:
+    """Статистика словаря и корпуса"""
+    total_docs: int = 0
+    num_terms: int = 0
+    num_postings: int = 0
+    # Количество словоупотреблений (сумма частот по всем постингам; считается с гистограммами)
+    total_tokens: int = 0
+    avg_doc_length: float = 0.0
+    max_doc_length: int = 0
+    # Гистограммы по степеням двойки: [нижняя граница, верхняя граница, количество терминов]
+    df_histogram: List[List[int]] = field(default_factory=list)
+    cf_histogram: List[List[int]] = field(default_factory=list)
+    # Самые длинные списки постингов: термин, df, cf, байт на диске
+    top_postings: List[Tuple[str, int, int, int]] = field(default_factory=list)
+    # Размеры секций файла и оценка памяти структур после загрузки, байт
+    disk: Dict[str, int] = field(default_factory=dict)
+    memory: Dict[str, int] = field(default_factory=dict)
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def _histogram(counts: Dict[int, int]) -> List[List[int]]:
+    return [[1 << (bucket - 1), (1 << bucket) - 1, counts[bucket]] for bucket in sorted(counts)]
+
+class _DictSizes:
+    """Размер dict из n элементов (емкость растет ступенями, поэтому кэшируется по степени двойки)"""
+    
+    def __init__(self):
+        self._sizes: Dict[int, int] = {}
+    
+    def __call__(self, n: int) -> int:
+        bucket = max(n, 1).bit_length()
+        if bucket not in self._sizes:
+            self._sizes[bucket] = sys.getsizeof(dict.fromkeys(range(1 << bucket)))
+        return self._sizes[bucket]
+
+def collect_term_stats(reader: IndexReader, top_n: int = 20, with_terms: bool = True) -> TermStats:
+    """
+    Статистика по файлу индекса в один потоковый проход
+    
+    Документы и списки постингов читаются по одному (в памяти - словарь терминов и top_n
+    кандидатов), поэтому проход работает и для индексов, которые не помещаются в память целиком.
+    
+    Args:
+        reader: Открытый файл индекса
+        top_n: Количество самых длинных списков постингов
+        with_terms: Гистограммы df и cf и самые длинные списки (декодирует все постинги);
+            без них - только сводка по документам и словарю и оценка памяти
+    
+    Returns:
+        TermStats: Статистика
+    """
+    stats = TermStats(total_docs=reader.total_docs)
+    dict_size = _DictSizes()
+    memory = {'documents': 0, 'terms': 0, 'postings': 0, 'vectors': 0}
+    
+    doc_lengths = 0
+    for doc in reader.iter_documents():
+        doc_lengths += doc.term_count
+        stats.max_doc_length = max(stats.max_doc_length, doc.term_count)
+        memory['documents'] += (_DOCUMENT_OBJECT_BYTES + sys.getsizeof(doc.text) + sys.getsizeof(doc.id) +
+                                sys.getsizeof(doc.path))
+    stats.avg_doc_length = doc_lengths / reader.total_docs if reader.total_docs else 0.0
+    
+    df_buckets: Dict[int, int] = {}
+    cf_buckets: Dict[int, int] = {}
+    heaviest: List[Tuple[int, str, int]] = []
+    cfs: Dict[str, int] = {}
+    for term, _, size, df in reader.iter_dictionary():
+        stats.num_terms += 1
+        stats.num_postings += df
+        # Ключи постингов - те же строки doc_id, что и в документах; малые частоты - кэшированные int
+        memory['terms'] += sys.getsizeof(term)
+        memory['postings'] += dict_size(df)
+        memory['vectors'] += _VECTOR_BYTES_PER_POSTING * df
+        if not with_terms:
+            continue
+        
+        df_buckets[df.bit_length()] = df_buckets.get(df.bit_length(), 0) + 1
+        cf = int(reader.read_postings(term)[1].sum())
+        stats.total_tokens += cf
+        cf_buckets[cf.bit_length()] = cf_buckets.get(cf.bit_length(), 0) + 1
+        item = (df, term, size)
+        if len(heaviest) < top_n:
+            heapq.heappush(heaviest, item)
+            cfs[term] = cf
+        elif top_n > 0 and item > heaviest[0]:
+            cfs.pop(heapq.heappushpop(heaviest, item)[1], None)
+            cfs[term] = cf
+    memory['terms'] += dict_size(stats.num_terms)
+    
+    stats.df_histogram = _histogram(df_buckets)
+    stats.cf_histogram = _histogram(cf_buckets)
+    stats.top_postings = [(term, df, cfs[term], size) for df, term, size in sorted(heaviest, reverse=True)]
+    stats.disk = {name: size for name, (_, size) in reader.header['sections'].items()}
+    stats.memory = memory
+    return stats
+
+def estimate_memory(header: dict) -> Dict[str, int]:
+    """
+    Грубая оценка памяти загруженного индекса по заголовку файла (счетчики и размеры секций),
+    без чтения документов и словаря: мгновенно, но менее точно, чем collect_term_stats
+    
+    Args:
+        header: Заголовок файла индекса (IndexReader.header)
+    
+    Returns:
+        Dict[str, int]: Оценка по структурам (как TermStats.memory), байт
+    """
+    num_docs = header.get('num_docs', header.get('total_docs', 0))
+    num_terms = header.get('num_terms', 0)
+    num_postings = header.get('num_postings', 0)
+    documents_bytes = header['sections']['documents'][1]
+    dict_size = _DictSizes()
+    return {
+        # Тексты занимают примерно столько же, сколько их JSON в файле
+        'documents': documents_bytes + num_docs * (_DOCUMENT_OBJECT_BYTES + 3 * _STR_BYTES),
+        'terms': num_terms * (_STR_BYTES + 8) + dict_size(num_terms),
+        'postings': num_postings * _POSTING_BYTES + num_terms * sys.getsizeof({}),
+        'vectors': num_postings * _VECTOR_BYTES_PER_POSTING,
+    }
+
+def write_csv(stats: TermStats, out: TextIO) -> None:
+    """
+    Статистика в CSV (одна таблица для дашбордов): section, key, value, df, cf, bytes
+    
+    Args:
+        stats: Статистика
+        out: Файл для записи
+    """
+    writer = csv.writer(out)
+    writer.writerow(['section', 'key', 'value', 'df', 'cf', 'bytes'])
+    for name in ('total_docs', 'num_terms', 'num_postings', 'total_tokens', 'avg_doc_length', 'max_doc_length'):
+        writer.writerow(['summary', name, getattr(stats, name), '', '', ''])
+    for section in ('df_histogram', 'cf_histogram'):
+        for lo, hi, count in getattr(stats, section):
+            writer.writerow([section, f"{lo}-{hi}", count, '', '', ''])
+    for term, df, cf, size in stats.top_postings:
+        writer.writerow(['top_postings', term, '', df, cf, size])
+    for section in ('disk', 'memory'):
+        for name, size in getattr(stats, section).items():
+            writer.writerow([section, name, '', '', '', size])
@@ -0,0 +1,154 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+class DocumentVectors:
+    """
+    Разреженные TF-IDF векторы документов с предвычисленными L2-нормами
+    
+    Веса хранятся дважды: по документам (CSR - для «похожих документов») и по терминам
+    (CSC - для запросов, где нужны только столбцы терминов запроса). Векторы строятся
+    по снимку индекса и помечаются его версией; после изменения индекса их нужно построить заново.
+    """
+    
+    def __init__(self, doc_ids: List[str], vocabulary: Dict[str, int], idf: np.ndarray,
+                 csr: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 csc: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 norms: np.ndarray, version: Optional[int] = None):
+        self.doc_ids = doc_ids
+        self.rows = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.indptr, self.indices, self.data = csr
+        self.col_indptr, self.col_indices, self.col_data = csc
+        self.norms = norms
+        self.version = version
+    
+    @classmethod
+    def build(cls, index) -> 'DocumentVectors':
+        """
+        Построение векторов по индексу (финализация)
+        
+        Args:
+            index: Индекс или его снимок (terms, documents, total_docs)
+        
+        Returns:
+            DocumentVectors: Векторы документов
+        """
+        doc_ids = list(index.documents)
+        rows = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        n_docs = len(doc_ids)
+        
+        vocabulary: Dict[str, int] = {}
+        col_indptr = [0]
+        col_rows: List[int] = []
+        col_tfs: List[int] = []
+        for term in sorted(index.terms):
+            postings = [(rows[doc_id], tf) for doc_id, tf in index.terms[term].items() if doc_id in rows]
+            if not postings:
+                continue
+            postings.sort()
+            vocabulary[term] = len(vocabulary)
+            col_rows.extend(row for row, _ in postings)
+            col_tfs.extend(tf for _, tf in postings)
+            col_indptr.append(len(col_rows))
+        
+        col_indptr = np.array(col_indptr, dtype=np.int64)
+        col_indices = np.array(col_rows, dtype=np.int32)
+        df = np.diff(col_indptr)
+        # Сглаженный idf: всегда положителен, поэтому термин из всех документов не обнуляет вектор
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        col_terms = np.repeat(np.arange(len(vocabulary), dtype=np.int32), df)
+        col_data = np.array(col_tfs, dtype=np.float64) * idf[col_terms]
+        
+        # CSR - та же матрица, переупорядоченная по документам
+        order = np.argsort(col_indices, kind='stable')
+        indptr = np.zeros(n_docs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(col_indices, minlength=n_docs), out=indptr[1:])
+        norms = np.sqrt(np.bincount(col_indices, weights=col_data ** 2, minlength=n_docs))
+        
+        return cls(doc_ids, vocabulary, idf,
+                   (indptr, col_terms[order], col_data[order]),
+                   (col_indptr, col_indices, col_data),
+                   norms, getattr(index, 'version', None))
+    
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+    
+    def document_vector(self, doc_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Номера терминов и веса вектора документа"""
+        row = self.rows[doc_id]
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.data[start:end]
+    
+    def _cosine(self, columns: Iterable[int], weights: Iterable[float]) -> np.ndarray:
+        """Косинусная близость разреженного вектора ко всем документам"""
+        scores = np.zeros(len(self.doc_ids), dtype=np.float64)
+        query_norm = 0.0
+        for col, weight in zip(columns, weights):
+            start, end = self.col_indptr[col], self.col_indptr[col + 1]
+            # Внутри столбца номера документов уникальны, поэтому += по индексам корректно
+            scores[self.col_indices[start:end]] += weight * self.col_data[start:end]
+            query_norm += weight * weight
+        if query_norm == 0:
+            return scores
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores /= self.norms * math.sqrt(query_norm)
+        return np.nan_to_num(scores, copy=False)
+    
+    def query_scores(self, terms: Iterable[str]) -> np.ndarray:
+        """
+        Косинусная близость запроса ко всем документам
+        
+        Args:
+            terms: Термины запроса (повторы увеличивают вес термина)
+        
+        Returns:
+            np.ndarray: Оценки в порядке doc_ids
+        """
+        counts: Dict[int, int] = {}
+        for term in terms:
+            col = self.vocabulary.get(term)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        return self._cosine(counts, [tf * self.idf[col] for col, tf in counts.items()])
+    
+    def similar_scores(self, doc_id: str) -> np.ndarray:
+        """Косинусная близость документа ко всем документам (включая его самого)"""
+        columns, weights = self.document_vector(doc_id)
+        return self._cosine(columns.tolist(), weights.tolist())
+    
+    def top_k(self, scores: np.ndarray, k: int, exclude: Optional[int] = None,
+              after: Optional[Tuple[float, str]] = None) -> List[Tuple[str, float]]:
+        """
+        Лучшие k документов по оценкам (только с положительной оценкой)
+        
+        Args:
+            scores: Оценки в порядке doc_ids
+            k: Количество документов
+            exclude: Номер документа, который не попадает в выдачу
+            after: Граница предыдущей страницы (оценка, документ): только документы после нее
+        
+        Returns:
+            List[Tuple[str, float]]: Идентификаторы и оценки по убыванию
+                (при равных оценках - по идентификатору)
+        """
+        if k <= 0:
+            return []
+        if exclude is not None:
+            scores = scores.copy()
+            scores[exclude] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if after is not None:
+            values = scores[candidates]
+            keep = values < after[0]
+            for i in np.flatnonzero(values == after[0]):
+                keep[i] = self.doc_ids[candidates[i]] > after[1]
+            candidates = candidates[keep]
+        if len(candidates) > k:
+            # Все документы с оценкой не ниже k-й, чтобы равные оценки на границе упорядочились по идентификатору
+            kth = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth]
+        top = sorted(((self.doc_ids[i], float(scores[i])) for i in candidates), key=lambda x: (-x[1], x[0]))
+        return top[:k]
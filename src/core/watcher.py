@@ -0,0 +1,216 @@
+import os
+import time
+import logging
+import threading
+import zipfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..utils.extractors import ExtractorRegistry
+from ..utils.file_utils import FileUtils
+
+# Подпись файла: размер и время изменения (None - файл удален)
+Signature = Optional[Tuple[int, float]]
+
+@dataclass
+class WatchBatch:
+    """Пакет изменений, примененный к индексу"""
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    # Задержка от обнаружения изменения до его появления в индексе, с (по файлам пакета)
+    lags: List[float] = field(default_factory=list)
+    
+    @property
+    def size(self) -> int:
+        return len(self.added) + len(self.updated) + len(self.deleted)
+
+@dataclass
+class WatchStats:
+    """Метрики живой индексации"""
+    batches: int = 0
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    errors: int = 0
+    pending: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+    
+    @property
+    def avg_lag(self) -> float:
+        changes = self.added + self.updated + self.deleted
+        return self.total_lag / changes if changes else 0.0
+    
+    @property
+    def avg_batch_size(self) -> float:
+        return (self.added + self.updated + self.deleted) / self.batches if self.batches else 0.0
+    
+    def summary(self) -> str:
+        return (f"пакетов: {self.batches} (последний {self.last_batch_size}, средний {self.avg_batch_size:.1f}, "
+                f"макс. {self.max_batch_size}), добавлено {self.added}, обновлено {self.updated}, "
+                f"удалено {self.deleted}, ошибок {self.errors}, ожидают {self.pending}; "
+                f"задержка: последняя {self.last_lag:.2f} с, средняя {self.avg_lag:.2f} с, макс. {self.max_lag:.2f} с")
+
+class DirectoryWatcher:
+    """
+    Живая индексация директории: опрос изменений файлов, подавление дребезга и пакетное
+    применение добавлений, обновлений и удалений к индексу
+    
+    Изменение файла применяется, когда его размер и время изменения не менялись debounce
+    секунд (файл дописан). Готовые изменения применяются одним вызовом update_documents, поэтому
+    поиск по снимкам индекса не блокируется и видит либо весь пакет, либо ничего.
+    Опрос (а не inotify) работает на любой платформе и без зависимостей.
+    """
+    
+    def __init__(self, index, directory_path: str, interval: float = 1.0, debounce: float = 0.5,
+                 max_batch: int = 1000, registry: Optional[ExtractorRegistry] = None,
+                 on_batch: Optional[Callable[[WatchBatch], None]] = None):
+        """
+        Args:
+            index: Изменяемый индекс (InvertedIndex)
+            directory_path: Отслеживаемая директория (корень индексации)
+            interval: Период опроса, с
+            debounce: Сколько секунд файл должен быть неизменным перед индексацией
+            max_batch: Максимум файлов в пакете
+            registry: Реестр извлекателей текста
+            on_batch: Вызывается после применения каждого пакета
+        """
+        self.index = index
+        self.directory_path = directory_path
+        self.interval = interval
+        self.debounce = debounce
+        self.max_batch = max_batch
+        self.registry = registry
+        self.on_batch = on_batch
+        self.stats = WatchStats()
+        self.logger = logging.getLogger(__name__)
+        
+        # Состояние, которое отражает индекс: путь -> подпись и документы файла
+        self._known: Dict[str, Signature] = {}
+        self._doc_ids: Dict[str, List[str]] = {}
+        for doc in index.documents.values():
+            if doc.path:
+                self._known[doc.path] = (doc.size, doc.mtime)
+                self._doc_ids.setdefault(doc.path, []).append(doc.id)
+        # Ожидающие изменения: путь -> [время обнаружения, время последнего изменения, подпись]
+        self._pending: Dict[str, list] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _scan(self) -> Dict[str, Signature]:
+        return {FileUtils.file_id(path, self.directory_path): (size, mtime)
+                for path, size, mtime in FileUtils.scan_files(self.directory_path)}
+    
+    def poll(self, now: Optional[float] = None) -> Optional[WatchBatch]:
+        """
+        Один опрос директории: регистрация изменений и применение готовых
+        
+        Args:
+            now: Текущее время (time.monotonic), для тестов
+        
+        Returns:
+            Optional[WatchBatch]: Примененный пакет или None, если готовых изменений нет
+        """
+        now = time.monotonic() if now is None else now
+        current = self._scan()
+        
+        for path in current.keys() | self._known.keys() | self._pending.keys():
+            signature = current.get(path)
+            if signature == self._known.get(path):
+                # Изменение откатилось (или его не было)
+                self._pending.pop(path, None)
+                continue
+            pending = self._pending.get(path)
+            if pending is None:
+                self._pending[path] = [now, now, signature]
+            elif pending[2] != signature:
+                pending[1], pending[2] = now, signature
+        
+        ready = [path for path, pending in self._pending.items() if now - pending[1] >= self.debounce]
+        batch = self._apply(sorted(ready)[:self.max_batch], now) if ready else None
+        self.stats.pending = len(self._pending)
+        return batch
+    
+    def _apply(self, paths: List[str], now: float) -> WatchBatch:
+        started = time.monotonic()
+        batch = WatchBatch()
+        remove: List[str] = []
+        add = []
+        first_seen_times = []
+        for path in paths:
+            first_seen, _, signature = self._pending.pop(path)
+            first_seen_times.append(first_seen)
+            remove.extend(self._doc_ids.pop(path, ()))
+            if signature is None:
+                batch.deleted.append(path)
+                self._known.pop(path, None)
+            else:
+                try:
+                    documents = FileUtils.read_file_documents(os.path.join(self.directory_path, path),
+                                                              self.directory_path, self.registry)
+                except (OSError, ValueError, EOFError, zipfile.BadZipFile) as e:
+                    # Файл не читается - запоминаем подпись, чтобы не повторять попытку до следующего изменения
+                    self.logger.error(f"Ошибка чтения файла {path}: {e}")
+                    batch.errors.append(path)
+                    documents = []
+                (batch.updated if path in self._known else batch.added).append(path)
+                self._known[path] = signature
+                if documents:
+                    self._doc_ids[path] = [doc.id for doc in documents]
+                    add.extend(documents)
+        
+        self.index.update_documents(remove, add)
+        applied = now + (time.monotonic() - started)
+        batch.lags = [applied - first_seen for first_seen in first_seen_times]
+        self._record(batch)
+        if self.on_batch is not None:
+            self.on_batch(batch)
+        return batch
+    
+    def _record(self, batch: WatchBatch) -> None:
+        stats = self.stats
+        stats.batches += 1
+        stats.added += len(batch.added)
+        stats.updated += len(batch.updated)
+        stats.deleted += len(batch.deleted)
+        stats.errors += len(batch.errors)
+        stats.last_batch_size = batch.size
+        stats.max_batch_size = max(stats.max_batch_size, batch.size)
+        if batch.lags:
+            stats.last_lag = max(batch.lags)
+            stats.max_lag = max(stats.max_lag, stats.last_lag)
+            stats.total_lag += sum(batch.lags)
+        self.logger.info(f"Живая индексация: +{len(batch.added)} ~{len(batch.updated)} -{len(batch.deleted)} "
+                         f"(задержка {stats.last_lag:.2f} с)")
+    
+    def start(self) -> None:
+        """Запуск опроса в фоновом потоке"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='directory-watcher', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Остановка фонового опроса"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.logger.error(f"Ошибка живой индексации: {e}")
+            self._stop.wait(self.interval)
@@ -0,0 +1,169 @@
+import struct
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterator, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..models.document import Document, SearchResult
+
+# Заголовок буфера: сигнатура, количество элементов, размер блока идентификаторов (выравнивание 8 байт)
+_HEADER = struct.Struct('<4sIQ')
+RESULTS_MAGIC = b'SRS1'
+POSTINGS_MAGIC = b'SPS1'
+
+# Сегменты разделяемой памяти, созданные этим процессом (ими владеет его resource_tracker)
+_created_segments: Set[str] = set()
+
+class CompactResult:
+    """
+    Результат поиска для передачи между процессами: идентификатор документа вместо самого
+    документа (с полным текстом) - получатель берет документ из своей копии индекса
+    """
+    __slots__ = ('doc_id', 'score', 'snippet')
+    
+    def __init__(self, doc_id: str, score: float, snippet: str = ''):
+        self.doc_id = doc_id
+        self.score = score
+        self.snippet = snippet
+    
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, CompactResult) and
+                (self.doc_id, self.score, self.snippet) == (other.doc_id, other.score, other.snippet))
+    
+    def __repr__(self) -> str:
+        return f"CompactResult({self.doc_id!r}, {self.score!r})"
+    
+    @classmethod
+    def from_result(cls, result: SearchResult) -> 'CompactResult':
+        return cls(result.document.id, result.score, result.snippet)
+    
+    def to_result(self, documents: Dict[str, Document]) -> SearchResult:
+        return SearchResult(documents[self.doc_id], self.score, self.snippet)
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+def encode_results(doc_ids: Sequence[str], scores: Sequence[float]) -> bytes:
+    """
+    Выдача в двоичном формате: оценки float64, смещения идентификаторов uint32 и
+    идентификаторы в UTF-8 одним блоком
+    
+    Args:
+        doc_ids: Идентификаторы документов
+        scores: Оценки в том же порядке
+    
+    Returns:
+        bytes: Буфер для передачи (pipe, сокет, разделяемая память)
+    """
+    encoded = [doc_id.encode('utf-8') for doc_id in doc_ids]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    blob = b''.join(encoded)
+    parts = [_HEADER.pack(RESULTS_MAGIC, len(encoded), len(blob)),
+             np.asarray(scores, dtype='<f8').tobytes(), offsets.tobytes(), blob]
+    size = sum(len(part) for part in parts)
+    return b''.join(parts) + b'\0' * (_align(size) - size)
+
+def decode_results(buffer) -> Tuple[List[str], np.ndarray]:
+    """
+    Разбор выдачи; оценки - представление над буфером без копирования
+    
+    Args:
+        buffer: bytes, bytearray или memoryview (например, shared_memory.buf)
+    
+    Returns:
+        Tuple[List[str], np.ndarray]: Идентификаторы и оценки
+    """
+    view = memoryview(buffer)
+    magic, count, blob_size = _HEADER.unpack_from(view)
+    if magic != RESULTS_MAGIC:
+        raise ValueError("Буфер не содержит выдачу")
+    pos = _HEADER.size
+    scores = np.frombuffer(view, dtype='<f8', count=count, offset=pos)
+    pos += 8 * count
+    offsets = np.frombuffer(view, dtype='<u4', count=count + 1, offset=pos).tolist()
+    pos += 4 * (count + 1)
+    blob = bytes(view[pos:pos + blob_size])
+    doc_ids = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+    return doc_ids, scores
+
+def encode_postings(doc_ords: np.ndarray, freqs: np.ndarray) -> bytes:
+    """Постинги (номера документов и частоты) в двоичном формате: два массива int32"""
+    parts = [_HEADER.pack(POSTINGS_MAGIC, len(doc_ords), 0),
+             np.asarray(doc_ords, dtype='<i4').tobytes(), np.asarray(freqs, dtype='<i4').tobytes()]
+    size = sum(len(part) for part in parts)
+    return b''.join(parts) + b'\0' * (_align(size) - size)
+
+def decode_postings(buffer) -> Tuple[np.ndarray, np.ndarray]:
+    """Разбор постингов; оба массива - представления над буфером без копирования"""
+    view = memoryview(buffer)
+    magic, count, _ = _HEADER.unpack_from(view)
+    if magic != POSTINGS_MAGIC:
+        raise ValueError("Буфер не содержит постинги")
+    doc_ords = np.frombuffer(view, dtype='<i4', count=count, offset=_HEADER.size)
+    freqs = np.frombuffer(view, dtype='<i4', count=count, offset=_HEADER.size + 4 * count)
+    return doc_ords, freqs
+
+def encode_search_results(results: Sequence[SearchResult]) -> bytes:
+    """Выдача SearchResult без документов (сниппеты строятся на стороне получателя)"""
+    return encode_results([r.document.id for r in results], [r.score for r in results])
+
+def decode_search_results(buffer, documents: Dict[str, Document]) -> List[SearchResult]:
+    """Восстановление SearchResult по документам индекса получателя"""
+    doc_ids, scores = decode_results(buffer)
+    return [SearchResult(documents[doc_id], score) for doc_id, score in zip(doc_ids, scores.tolist())]
+
+def write_shared(payload: bytes) -> shared_memory.SharedMemory:
+    """
+    Буфер в разделяемой памяти: другому процессу передаются только имя и размер
+    
+    Создатель освобождает сегмент (release_shared), когда получатель его прочитал.
+    """
+    segment = create_shared(len(payload))
+    segment.buf[:len(payload)] = payload
+    return segment
+
+def create_shared(size: int) -> shared_memory.SharedMemory:
+    """Новый сегмент разделяемой памяти для заполнения на месте (освобождается release_shared)"""
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    _created_segments.add(segment.name)
+    return segment
+
+def release_shared(segment: shared_memory.SharedMemory) -> None:
+    """Закрытие и удаление сегмента его создателем"""
+    _created_segments.discard(segment.name)
+    segment.close()
+    segment.unlink()
+
+def open_shared(name: str) -> shared_memory.SharedMemory:
+    """
+    Подключение к существующему сегменту разделяемой памяти без передачи его во владение
+    
+    Сегментом владеет создатель; подключившийся процесс только закрывает его. До Python 3.13
+    подключение регистрирует сегмент в resource_tracker, который удалил бы его (или предупредил
+    о нем) при завершении процесса, поэтому в чужом процессе регистрация снимается.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name)
+        if segment.name not in _created_segments:
+            resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+@contextmanager
+def attach_shared(name: str, size: int) -> Iterator[memoryview]:
+    """
+    Подключение к буферу в разделяемой памяти без копирования
+    
+    Массивы, полученные decode_* внутри блока, ссылаются на сегмент: их нужно скопировать
+    или освободить до выхода из блока.
+    """
+    segment = open_shared(name)
+    view = segment.buf[:size]
+    try:
+        yield view
+    finally:
+        view.release()
+        segment.close()
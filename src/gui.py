@@ -7,42 +7,19 @@ from pathlib import Path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from src.core.index_manager import IndexManager
-from src.core.search_manager import SearchManager
+from src.main import SearchEngine
 from src.models.document import Document, SearchResult
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QPushButton, QTextEdit, QLineEdit, 
                            QListWidget, QLabel, QFileDialog, QProgressBar,
-                           QMessageBox, QSplitter, QListWidgetItem)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+                           QMessageBox, QSplitter, QListWidgetItem, QCheckBox)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class SearchEngine:
-    """Обертка для поискового движка"""
-    def __init__(self):
-        self.index_manager = IndexManager()
-        self.search_manager = None
-        
-    def index_documents(self, directory_path):
-        """Индексация документов"""
-        logging.info(f"Начало индексации директории: {directory_path}")
-        self.index_manager.build_from_directory(directory_path)
-        self.search_manager = SearchManager(self.index_manager.index)
-        logging.info(f"Индексация завершена. Документов: {self.index_manager.index.total_docs}")
-        
-    def search(self, query, limit=10):
-        """Поиск по запросу"""
-        logging.info(f"Выполнение поиска: '{query}'")
-        if self.search_manager:
-            results = self.search_manager.search(query, limit)
-            logging.info(f"Найдено документов: {len(results)}")
-            return results
-        return []
-
 class IndexingThread(QThread):
     """Поток для индексации документов"""
     progress = pyqtSignal(int)
@@ -103,6 +80,11 @@ class SearchEngineGUI(QMainWindow):
         control_layout.addWidget(self.select_folder_btn)
         control_layout.addWidget(self.selected_folder_label)
         control_layout.addWidget(self.index_btn)
+        
+        self.watch_checkbox = QCheckBox("Следить за изменениями")
+        self.watch_checkbox.setEnabled(False)
+        self.watch_checkbox.toggled.connect(self.toggle_watch)
+        control_layout.addWidget(self.watch_checkbox)
         control_layout.addStretch()
         
         main_layout.addLayout(control_layout)
@@ -141,6 +123,13 @@ class SearchEngineGUI(QMainWindow):
         self.results_list.itemDoubleClicked.connect(self.show_document_content)
         left_layout.addWidget(self.results_list)
         
+        self.more_btn = QPushButton("Ещё результаты")
+        self.more_btn.clicked.connect(self.load_more)
+        self.more_btn.setEnabled(False)
+        left_layout.addWidget(self.more_btn)
+        self.next_cursor = None
+        self.page_query = None
+        
         # Правая панель - содержимое документа
         right_widget = QWidget()
         right_layout = QVBoxLayout(right_widget)
@@ -160,6 +149,11 @@ class SearchEngineGUI(QMainWindow):
         # Статус бар
         self.statusBar().showMessage("Готов к работе")
         
+        # Обновление метрик живой индексации
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(1000)
+        self.watch_timer.timeout.connect(self.update_watch_status)
+        
     def select_folder(self):
         """Выбор папки с документами"""
         folder = QFileDialog.getExistingDirectory(
@@ -187,6 +181,8 @@ class SearchEngineGUI(QMainWindow):
         self.progress_bar.setRange(0, 0)  # индикатор прогресса
         self.index_btn.setEnabled(False)
         self.search_btn.setEnabled(False)
+        self.watch_checkbox.setChecked(False)
+        self.watch_checkbox.setEnabled(False)
         
         # Запуск индексации в отдельном потоке
         self.indexing_thread = IndexingThread(self.current_indexed_folder)
@@ -203,6 +199,7 @@ class SearchEngineGUI(QMainWindow):
         if success:
             self.engine = self.indexing_thread.engine
             self.search_btn.setEnabled(True)
+            self.watch_checkbox.setEnabled(True)
             self.statusBar().showMessage(message)
             logging.info("Готово! Можно выполнять поиск")
             QMessageBox.information(self, "Успех", message)
@@ -211,6 +208,34 @@ class SearchEngineGUI(QMainWindow):
             logging.error("Индексация завершилась с ошибкой")
             QMessageBox.critical(self, "Ошибка", message)
             
+    def toggle_watch(self, checked):
+        """Включение и выключение живой индексации выбранной папки"""
+        if checked:
+            self.engine.start_watch(self.current_indexed_folder)
+            self.watch_timer.start()
+            self.statusBar().showMessage(f"Слежение за папкой: {self.current_indexed_folder}")
+            logging.info(f"Живая индексация включена: {self.current_indexed_folder}")
+        else:
+            self.watch_timer.stop()
+            self.engine.stop_watch()
+            self.statusBar().showMessage("Слежение за папкой выключено")
+            logging.info("Живая индексация выключена")
+            
+    def update_watch_status(self):
+        """Метрики живой индексации в строке состояния"""
+        if self.engine.watcher is not None:
+            stats = self.engine.watcher.stats
+            self.statusBar().showMessage(
+                f"Слежение: документов {self.engine.index_manager.index.total_docs}, "
+                f"пакетов {stats.batches} (последний {stats.last_batch_size}), "
+                f"ожидают {stats.pending}, задержка {stats.last_lag:.2f} с"
+            )
+            
+    def closeEvent(self, event):
+        """Остановка живой индексации при закрытии окна"""
+        self.engine.stop_watch()
+        super().closeEvent(event)
+        
     def perform_search(self):
         """Выполнение поиска"""
         query = self.search_input.text().strip()
@@ -227,28 +252,48 @@ class SearchEngineGUI(QMainWindow):
             self.document_content.clear()
             
             logging.info(f"Выполнение поиска: '{query}'")
-            results = self.engine.search(query)
+            page = self.engine.search_page(query)
             
-            if not results:
+            if not page.results:
                 item = QListWidgetItem("По запросу ничего не найдено")
                 self.results_list.addItem(item)
+                self.more_btn.setEnabled(False)
                 logging.info("По запросу ничего не найдено")
                 return
                 
-            for result in results:
-                item_text = f"{result.document.id} (релевантность: {result.score:.3f})"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.ItemDataRole.UserRole, result)  # сохраняем результат
-                self.results_list.addItem(item)
-                
-            self.statusBar().showMessage(f"Найдено документов: {len(results)}")
-            logging.info(f"Найдено документов: {len(results)}")
+            self.show_page(page)
+            
+        except Exception as e:
+            error_msg = f"Ошибка поиска: {str(e)}"
+            logging.error(error_msg)
+            QMessageBox.critical(self, "Ошибка", error_msg)
             
+    def load_more(self):
+        """Следующая страница результатов (по курсору, без пересчета предыдущих страниц)"""
+        if self.next_cursor is None:
+            return
+        try:
+            self.show_page(self.engine.search_page(self.page_query, cursor=self.next_cursor))
         except Exception as e:
             error_msg = f"Ошибка поиска: {str(e)}"
             logging.error(error_msg)
             QMessageBox.critical(self, "Ошибка", error_msg)
             
+    def show_page(self, page):
+        """Добавление страницы результатов в список"""
+        for result in page.results:
+            item_text = f"{result.document.id} (релевантность: {result.score:.3f})"
+            item = QListWidgetItem(item_text)
+            item.setData(Qt.ItemDataRole.UserRole, result)  # сохраняем результат
+            self.results_list.addItem(item)
+            
+        self.page_query = page.query
+        self.next_cursor = page.next_cursor
+        self.more_btn.setEnabled(page.next_cursor is not None)
+        shown = page.offset + len(page.results)
+        self.statusBar().showMessage(f"Показано документов: {shown}")
+        logging.info(f"Показано документов: {shown}")
+            
     def show_document_content(self, item):
         """Показ содержимого выбранного документа"""
         result = item.data(Qt.ItemDataRole.UserRole)
@@ -6,16 +6,30 @@
 
 import sys
 import os
+import time
+import json
 import argparse
 import logging
+from datetime import datetime
 from pathlib import Path
 
-# Добавляем путь к модулям проекта
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Добавляем путь к корневой директории проекта
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
 
-from core.index_manager import IndexManager
-from core.search_manager import SearchManager
-from utils.file_utils import FileUtils
+from src.core.index_manager import IndexManager
+from src.core.search_manager import SearchManager
+from src.core.doc_values import DocFilter
+from src.core.fields import parse_boosts
+from src.core.cache_manager import CacheManager
+from src.core.query_log import QueryLogger, compare_results, read_query_log, replay, top_terms
+from src.core.shared_index import SharedIndex, SharedIndexPool
+from src.core.index_storage import IndexReader
+from src.core.term_stats import collect_term_stats, write_csv
+from src.core.pruning import PruningConfig
+from src.core.federation import IndexRegistry
+from src.core.watcher import DirectoryWatcher
+from src.utils.file_utils import FileUtils
 
 # Настройка логирования
 logging.basicConfig(
@@ -32,17 +46,40 @@ logger = logging.getLogger(__name__)
 class SearchEngine:
     """Основной класс поискового движка"""
     
-    def __init__(self):
-        self.index_manager = IndexManager()
+    def __init__(self, cache_mb: int = 256, cache_budgets_mb: dict = None, query_log: str = None,
+                 impact_ordered: bool = False, spell: bool = False, pruning: PruningConfig = None):
+        """
+        Args:
+            cache_mb: Общий бюджет памяти кэшей, МБ
+            cache_budgets_mb: Бюджеты отдельных кэшей по имени, МБ
+            query_log: Путь к журналу запросов (JSON Lines) или None
+            impact_ordered: Постинги по вкладу с ранней остановкой для коротких запросов
+            spell: Словарь исправлений опечаток; запросы без результатов повторяются исправленными
+            pruning: Отсечение стоп-слов и частых терминов при индексации
+        """
+        self.cache_manager = CacheManager(
+            cache_mb * 1024 * 1024,
+            {name: mb * 1024 * 1024 for name, mb in (cache_budgets_mb or {}).items()}
+        )
+        self.index_manager = IndexManager(cache_manager=self.cache_manager, impact_ordered=impact_ordered,
+                                          spelling=spell, pruning=pruning)
         self.search_manager = None
+        self.query_log = QueryLogger(query_log) if query_log else None
+        self.watcher = None
+        self.registry = None
         
-    def index_documents(self, directory_path: str, index_file: str = None):
+    def index_documents(self, directory_path: str, index_file: str = None, build_ann: bool = False,
+                        resume: bool = False, checkpoint_every: int = 1000):
         """
         Индексация документов в указанной директории
         
         Args:
             directory_path: Путь к директории с документами
-            index_file: Путь для сохранения индекса (опционально)
+            index_file: Путь для сохранения индекса (опционально); рядом с ним
+                во время построения хранится каталог контрольной точки (index_file + '.checkpoint')
+            build_ann: Построить индекс похожих документов (сохраняется рядом с индексом)
+            resume: Продолжить прерванную индексацию с контрольной точки
+            checkpoint_every: Файлов между контрольными точками
         """
         try:
             logger.info(f"Начало индексации директории: {directory_path}")
@@ -51,45 +88,68 @@ class SearchEngine:
             if not os.path.exists(directory_path):
                 raise FileNotFoundError(f"Директория {directory_path} не существует")
             
-            # Построение индекса
-            self.index_manager.build_from_directory(directory_path)
+            # Построение индекса (с контрольными точками, если индекс сохраняется в файл)
+            checkpoint_path = index_file + '.checkpoint' if index_file else None
+            self.index_manager.build_from_directory(directory_path, checkpoint_path=checkpoint_path,
+                                                    checkpoint_every=checkpoint_every, resume=resume)
             logger.info(f"Индексация завершена. Документов: {self.index_manager.index.total_docs}")
             
+            if build_ann:
+                self.index_manager.build_similarity_index()
+            
             # Сохранение индекса если указан файл
             if index_file:
                 self.index_manager.save_index(index_file)
                 logger.info(f"Индекс сохранен в файл: {index_file}")
+                self.index_manager.remove_checkpoint(checkpoint_path)
             
             # Инициализация поискового менеджера
-            self.search_manager = SearchManager(self.index_manager.index)
+            self._open_search()
             
         except Exception as e:
             logger.error(f"Ошибка при индексации: {e}")
             raise
     
-    def load_index(self, index_file: str):
+    def _open_search(self):
+        """Поиск по текущему индексу; результаты прежнего индекса удаляются из кэша"""
+        if self.search_manager is not None and self.search_manager.result_cache is not None:
+            self.search_manager.result_cache.clear()
+        self.search_manager = SearchManager(self.index_manager.index, vectors=self.index_manager.vectors,
+                                            similarity=self.index_manager.similarity,
+                                            doc_values=self.index_manager.doc_values,
+                                            cache_manager=self.cache_manager,
+                                            query_log=self.query_log,
+                                            impacts=self.index_manager.impacts,
+                                            spelling=self.index_manager.spelling,
+                                            auto_correct=self.index_manager.spelling is not None)
+    
+    def load_index(self, index_file: str, lazy: bool = False, pinned_terms=()):
         """
         Загрузка индекса из файла
         
         Args:
             index_file: Путь к файлу индекса
+            lazy: Оставить постинги на диске (декодирование блоков по запросу через кэш)
+            pinned_terms: Термины, закрепляемые в кэше постингов и загружаемые сразу
         """
         try:
             logger.info(f"Загрузка индекса из файла: {index_file}")
-            self.index_manager.load_index(index_file)
-            self.search_manager = SearchManager(self.index_manager.index)
+            self.index_manager.load_index(index_file, lazy=lazy, pinned_terms=pinned_terms)
+            self._open_search()
             logger.info(f"Индекс загружен. Документов: {self.index_manager.index.total_docs}")
         except Exception as e:
             logger.error(f"Ошибка при загрузке индекса: {e}")
             raise
     
-    def search(self, query: str, limit: int = 10):
+    def search(self, query: str, limit: int = 10, filters: DocFilter = None, boosts: dict = None):
         """
         Выполнение поискового запроса
         
         Args:
             query: Поисковый запрос
             limit: Максимальное количество результатов
+            filters: Фильтр по метаданным документов
+            boosts: Веса полей body, title, path (None - только тело документа)
             
         Returns:
             List[SearchResult]: Результаты поиска
@@ -99,19 +159,176 @@ class SearchEngine:
         
         try:
             logger.info(f"Выполнение поиска: '{query}'")
-            results = self.search_manager.search(query, limit)
+            results = self.search_manager.search(query, limit, filters, boosts)
             logger.info(f"Найдено документов: {len(results)}")
             return results
         except Exception as e:
             logger.error(f"Ошибка при поиске: {e}")
             raise
     
+    def search_page(self, query: str, limit: int = 10, cursor: str = None, offset: int = 0,
+                    filters: DocFilter = None, boosts: dict = None):
+        """
+        Страница выдачи по курсору предыдущей страницы или смещению
+        
+        Args:
+            query: Поисковый запрос
+            limit: Размер страницы
+            cursor: Курсор следующей страницы (Page.next_cursor)
+            offset: Номер первого результата, если курсора нет
+            filters: Фильтр по метаданным документов
+            boosts: Веса полей body, title, path
+            
+        Returns:
+            Page: Результаты и курсор следующей страницы
+        """
+        if not self.search_manager:
+            raise RuntimeError("Индекс не загружен. Сначала выполните индексацию или загрузку индекса.")
+        
+        try:
+            logger.info(f"Выполнение поиска: '{query}' (смещение {offset}, курсор {cursor or '-'})")
+            page = self.search_manager.search_page(query, limit, cursor, offset, filters, boosts)
+            logger.info(f"Найдено документов на странице: {len(page.results)}")
+            return page
+        except Exception as e:
+            logger.error(f"Ошибка при поиске: {e}")
+            raise
+    
+    def open_registry(self, index_dir: str, memory_mb: int = 1024):
+        """
+        Реестр именованных индексов каталога (имя - файл без расширения .idx)
+        
+        Args:
+            index_dir: Каталог с файлами индексов
+            memory_mb: Бюджет памяти загруженных индексов, МБ
+        """
+        self.registry = IndexRegistry(memory_mb * 1024 * 1024)
+        names = self.registry.discover(index_dir)
+        logger.info(f"Реестр индексов {index_dir}: {', '.join(names) or '-'}")
+        return names
+    
+    def federated_search(self, names, query: str, limit: int = 10):
+        """
+        Поиск по нескольким именованным индексам с общей выдачей
+        
+        Args:
+            names: Имена индексов реестра (пусто - все)
+            query: Поисковый запрос
+            limit: Максимальное количество результатов
+            
+        Returns:
+            List[FederatedResult]: Результаты с именем индекса и нормированной оценкой
+        """
+        if not self.registry:
+            raise RuntimeError("Реестр индексов не открыт")
+        logger.info(f"Федеративный поиск: '{query}' (индексы: {', '.join(names) or 'все'})")
+        results = self.registry.search(query, names, limit)
+        logger.info(f"Найдено документов: {len(results)}")
+        return results
+    
+    def replay(self, log_path: str, rate: float = None, concurrency: int = 1, baseline: 'SearchEngine' = None,
+               workers: int = 0):
+        """
+        Воспроизведение журнала запросов против загруженного индекса
+        
+        Args:
+            log_path: Путь к журналу запросов
+            rate: Темп подачи запросов, запр/с (None - без пауз)
+            concurrency: Количество параллельных потоков
+            baseline: Эталонный движок для сравнения выдачи
+            workers: Количество процессов-обработчиков над индексом в разделяемой памяти
+                (0 - запросы выполняются в этом процессе); процессы ранжируют по TF-IDF
+            
+        Returns:
+            Tuple[ReplayReport, Optional[dict]]: Итоги и сравнение с эталоном
+        """
+        if not self.search_manager:
+            raise RuntimeError("Индекс не загружен. Сначала выполните индексацию или загрузку индекса.")
+        
+        records = list(read_query_log(log_path))
+        logger.info(f"Воспроизведение журнала: {log_path} (запросов: {len(records)})")
+        if workers:
+            shared = SharedIndex.create(self.index_manager.index)
+            logger.info(f"Индекс в разделяемой памяти: {shared.name} ({shared.nbytes / 1024 / 1024:.1f} МБ), "
+                        f"процессов: {workers}")
+            try:
+                with SharedIndexPool(shared, workers) as pool:
+                    def search(query, limit):
+                        return [doc_id for doc_id, _ in pool.search_ids(query, limit)]
+                    report = replay(records, search, rate, concurrency)
+            finally:
+                shared.close()
+        else:
+            report = replay(records, self._result_ids, rate, concurrency)
+        
+        diff = None
+        if baseline is not None:
+            baseline_report = replay(records, baseline._result_ids)
+            diff = compare_results(report.results, baseline_report.results)
+        return report, diff
+    
+    def _result_ids(self, query: str, limit: int):
+        return [result.document.id for result in self.search_manager.search(query, limit)]
+    
+    def start_watch(self, directory_path: str, interval: float = 1.0, debounce: float = 0.5,
+                    finalize_interval: float = 30.0):
+        """
+        Живая индексация: изменения файлов директории применяются к индексу, пока идет поиск
+        
+        Args:
+            directory_path: Отслеживаемая директория (корень индексации)
+            interval: Период опроса, с
+            debounce: Сколько секунд файл должен быть неизменным перед индексацией
+            finalize_interval: Как часто (не чаще, с) перестраивать векторы после изменений;
+                до перестроения запросы ранжируются по TF-IDF актуального снимка
+        """
+        if not self.search_manager:
+            raise RuntimeError("Индекс не загружен. Сначала выполните индексацию или загрузку индекса.")
+        self.stop_watch()
+        last_finalize = [time.monotonic()]
+        
+        def on_batch(batch):
+            if time.monotonic() - last_finalize[0] < finalize_interval:
+                return
+            self.index_manager.finalize()
+            self.search_manager.vectors = self.index_manager.vectors
+            self.search_manager.doc_values = self.index_manager.doc_values
+            self.search_manager.impacts = self.index_manager.impacts
+            last_finalize[0] = time.monotonic()
+        
+        self.watcher = DirectoryWatcher(self.index_manager.index, directory_path, interval, debounce,
+                                        on_batch=on_batch)
+        self.watcher.start()
+        logger.info(f"Живая индексация: {directory_path} (опрос каждые {interval} с)")
+    
+    def stop_watch(self):
+        """Остановка живой индексации"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def cache_stats(self):
+        """
+        Статистика кэшей
+        
+        Returns:
+            Dict[str, CacheStats]: Статистика по имени кэша
+        """
+        return self.cache_manager.stats()
+    
+    @staticmethod
+    def _print_page(page):
+        for i, result in enumerate(page.results, page.offset + 1):
+            print(f"{i}. {result.document.id} (score: {result.score:.3f})")
+            print(f"   {result.snippet}")
+    
     def interactive_mode(self):
         """Интерактивный режим работы"""
         print("=== ПРОСТОЙ ПОИСКОВЫЙ ДВИЖОК ===")
         print("Режим: интерактивный")
-        print("Команды: search, index, load, exit")
+        print("Команды: search, next, index, load, cache, watch, exit")
         print()
+        page = None
         
         while True:
             try:
@@ -144,22 +361,47 @@ class SearchEngine:
                         
                     query = input("Поисковый запрос: ").strip()
                     if query:
-                        results = self.search(query)
-                        if results:
-                            print(f"Найдено документов: {len(results)}")
-                            for i, result in enumerate(results, 1):
-                                print(f"{i}. {result.document.id} (score: {result.score:.3f})")
-                                print(f"   {result.snippet}")
+                        page = self.search_page(query)
+                        suggestion = self.search_manager.suggest(query)
+                        if suggestion:
+                            print(f"Возможно, вы имели в виду: {suggestion}")
+                        if page.results:
+                            print(f"Найдено документов: {len(page.results)}")
+                            self._print_page(page)
                         else:
                             print("По запросу ничего не найдено")
                     else:
                         print("Не указан поисковый запрос")
                         
+                elif command == 'next':
+                    if page is None or page.next_cursor is None:
+                        print("Следующей страницы нет")
+                        continue
+                    page = self.search_page(page.query, cursor=page.next_cursor)
+                    if page.stale:
+                        print("Индекс изменился: выдача продолжена от той же границы")
+                    if page.results:
+                        self._print_page(page)
+                    else:
+                        print("Больше результатов нет")
+                        
+                elif command == 'cache':
+                    print(self.cache_manager.summary())
+                    
+                elif command == 'watch':
+                    if self.watcher is None:
+                        print("Живая индексация не запущена (main.py watch --dir ...)")
+                    else:
+                        print(f"Живая индексация: {self.watcher.stats.summary()}")
+                    
                 elif command == 'help':
                     print("Доступные команды:")
                     print("  index  - индексация документов")
                     print("  load   - загрузка индекса из файла")
                     print("  search - выполнение поиска")
+                    print("  next   - следующая страница результатов")
+                    print("  cache  - статистика кэшей")
+                    print("  watch  - метрики живой индексации")
                     print("  exit   - выход из программы")
                     
                 else:
@@ -171,6 +413,26 @@ class SearchEngine:
             except Exception as e:
                 print(f"Ошибка: {e}")
 
+def _print_stats(stats, out) -> None:
+    """Текстовая сводка статистики индекса"""
+    mb = lambda size: f"{size / 2**20:.1f} МБ"
+    print(f"Документов: {stats.total_docs}, терминов: {stats.num_terms}, постингов: {stats.num_postings}", file=out)
+    print(f"Длина документа: средняя {stats.avg_doc_length:.1f}, максимальная {stats.max_doc_length}", file=out)
+    if stats.total_tokens:
+        print(f"Словоупотреблений: {stats.total_tokens}", file=out)
+    for title, histogram in (('df', stats.df_histogram), ('cf', stats.cf_histogram)):
+        if histogram:
+            print(f"\nГистограмма {title} (диапазон: терминов):", file=out)
+            for lo, hi, count in histogram:
+                print(f"  {lo:>8}-{hi:<8} {count}", file=out)
+    if stats.top_postings:
+        print("\nСамые длинные списки постингов (термин: df, cf, на диске):", file=out)
+        for term, df, cf, size in stats.top_postings:
+            print(f"  {term}: {df}, {cf}, {size} байт", file=out)
+    print("\nНа диске: " + ', '.join(f"{name} {mb(size)}" for name, size in stats.disk.items()), file=out)
+    print("В памяти (оценка): " + ', '.join(f"{name} {mb(size)}" for name, size in stats.memory.items()) +
+          f", всего {mb(sum(stats.memory.values()))}", file=out)
+
 def main():
     """Основная функция программы"""
     parser = argparse.ArgumentParser(
@@ -179,54 +441,267 @@ def main():
         epilog="""
 Примеры использования:
   python main.py index --dir ./documents
+  python main.py index --dir ./documents --index-file index.idx --stopwords russian --stopwords english
   python main.py search "поисковый запрос"
+  python main.py similar doc.txt --index-file index.idx
+  python main.py search "запрос" --index-dir ./indexes --index 2023,2024
+  python main.py --query-log queries.jsonl search "запрос" --index-file index.idx
+  python main.py replay queries.jsonl --index-file index.idx --concurrency 4
+  python main.py --spell search "пойсковый запрос" --index-file index.idx
+  python main.py stats --index-file index.idx --terms --format csv --output stats.csv
   python main.py interactive
         """
     )
     
+    parser.add_argument('--cache-mb', type=int, default=256, help='Общий бюджет памяти кэшей, МБ')
+    parser.add_argument('--cache-budget', action='append', default=[], metavar='ИМЯ=МБ',
+                        help='Бюджет отдельного кэша, например query_results=32 (можно повторять)')
+    parser.add_argument('--query-log', help='Журнал запросов (JSON Lines) для анализа и replay')
+    parser.add_argument('--impact-ordered', action='store_true',
+                        help='Постинги по вкладу: ранняя остановка для запросов из 1-2 терминов')
+    parser.add_argument('--spell', action='store_true',
+                        help='Исправление опечаток: "возможно, вы имели в виду" и повтор запроса без результатов')
+    
     subparsers = parser.add_subparsers(dest='command', help='Команды')
     
     # Парсер для индексации
     index_parser = subparsers.add_parser('index', help='Индексация документов')
     index_parser.add_argument('--dir', required=True, help='Путь к директории с документами')
     index_parser.add_argument('--index-file', help='Файл для сохранения индекса')
+    index_parser.add_argument('--ann', action='store_true',
+                              help='Построить индекс похожих документов')
+    index_parser.add_argument('--resume', action='store_true',
+                              help='Продолжить прерванную индексацию с контрольной точки (нужен --index-file)')
+    index_parser.add_argument('--checkpoint-every', type=int, default=1000,
+                              help='Файлов между контрольными точками')
+    index_parser.add_argument('--stopwords', action='append', metavar='ЯЗЫК',
+                              help='Не индексировать стоп-слова языка: russian, english (можно повторять)')
+    index_parser.add_argument('--stopwords-file', help='Файл с дополнительными стоп-словами (по одному в строке)')
+    index_parser.add_argument('--max-df-ratio', type=float,
+                              help='Отсекать термины, которые встречаются в большей доле документов (0-1)')
     
     # Парсер для поиска
     search_parser = subparsers.add_parser('search', help='Поиск по индексу')
     search_parser.add_argument('query', help='Поисковый запрос')
     search_parser.add_argument('--index-file', help='Файл индекса')
-    search_parser.add_argument('--limit', type=int, default=10, help='Лимит результатов')
+    search_parser.add_argument('--index', metavar='ИМЯ1,ИМЯ2',
+                               help='Поиск по нескольким именованным индексам из --index-dir с общей выдачей')
+    search_parser.add_argument('--index-dir', default='.', help='Каталог именованных индексов (ИМЯ.idx)')
+    search_parser.add_argument('--index-budget-mb', type=int, default=1024,
+                               help='Бюджет памяти загруженных именованных индексов, МБ')
+    search_parser.add_argument('--limit', type=int, default=10, help='Лимит результатов (размер страницы)')
+    search_parser.add_argument('--offset', type=int, default=0, help='Номер первого результата страницы')
+    search_parser.add_argument('--cursor', help='Курсор следующей страницы из предыдущего вывода')
+    search_parser.add_argument('--explain', action='store_true',
+                               help='Показать план запроса и время этапов')
+    search_parser.add_argument('--path', help='Только документы из каталога (путь от корня индексации)')
+    search_parser.add_argument('--ext', action='append', help='Только файлы с расширением (можно повторять)')
+    search_parser.add_argument('--min-size', type=int, help='Минимальный размер файла, байт')
+    search_parser.add_argument('--max-size', type=int, help='Максимальный размер файла, байт')
+    search_parser.add_argument('--since', help='Изменены не раньше даты (ГГГГ-ММ-ДД)')
+    search_parser.add_argument('--until', help='Изменены раньше даты (ГГГГ-ММ-ДД)')
+    search_parser.add_argument('--facets', action='store_true', help='Показать фасеты по результатам')
+    search_parser.add_argument('--fields', action='store_true',
+                               help='Ранжировать по телу, заголовку и пути файла (веса по умолчанию)')
+    search_parser.add_argument('--boost', action='append', default=[],
+                               help='Вес поля body, title или path, например path=5 (можно повторять)')
+    search_parser.add_argument('--lazy', action='store_true',
+                               help='Не загружать постинги в память, декодировать блоки по запросу')
+    search_parser.add_argument('--pin-terms', help='Файл с терминами (по одному в строке) для закрепления в кэше')
+    search_parser.add_argument('--pin-log', help='Закрепить в кэше самые частые термины журнала запросов')
+    search_parser.add_argument('--pin-top', type=int, default=100, help='Сколько терминов журнала закреплять')
+    
+    # Парсер для поиска похожих документов
+    similar_parser = subparsers.add_parser('similar', help='Документы, похожие на данный')
+    similar_parser.add_argument('doc_id', help='Идентификатор документа')
+    similar_parser.add_argument('--index-file', required=True, help='Файл индекса')
+    similar_parser.add_argument('--limit', type=int, default=10, help='Лимит результатов')
+    
+    # Парсер для воспроизведения журнала запросов
+    replay_parser = subparsers.add_parser('replay', help='Воспроизведение журнала запросов (нагрузка)')
+    replay_parser.add_argument('log', help='Журнал запросов (--query-log)')
+    replay_parser.add_argument('--index-file', required=True, help='Файл индекса')
+    replay_parser.add_argument('--lazy', action='store_true', help='Постинги на диске, блоки через кэш')
+    replay_parser.add_argument('--rate', type=float, help='Темп подачи запросов, запр/с (по умолчанию без пауз)')
+    replay_parser.add_argument('--concurrency', type=int, default=1, help='Количество параллельных потоков')
+    replay_parser.add_argument('--baseline-index', help='Файл индекса эталонного движка для сравнения выдачи')
+    replay_parser.add_argument('--workers', type=int, default=0,
+                               help='Процессов-обработчиков над одной копией индекса в разделяемой памяти')
+    
+    # Парсер для живой индексации
+    watch_parser = subparsers.add_parser('watch', help='Живая индексация директории с поиском')
+    watch_parser.add_argument('--dir', required=True, help='Путь к директории с документами')
+    watch_parser.add_argument('--index-file', help='Файл индекса: загружается, если есть, и сохраняется при выходе')
+    watch_parser.add_argument('--interval', type=float, default=1.0, help='Период опроса, с')
+    watch_parser.add_argument('--debounce', type=float, default=0.5,
+                              help='Сколько секунд файл должен быть неизменным перед индексацией')
+    
+    # Парсер для статистики индекса
+    stats_parser = subparsers.add_parser('stats', help='Статистика словаря и корпуса по файлу индекса')
+    stats_parser.add_argument('--index-file', required=True, help='Файл индекса')
+    stats_parser.add_argument('--terms', action='store_true',
+                              help='Гистограммы df и cf и самые длинные списки постингов')
+    stats_parser.add_argument('--top', type=int, default=20, help='Сколько самых длинных списков показать')
+    stats_parser.add_argument('--format', choices=['text', 'json', 'csv'], default='text', help='Формат вывода')
+    stats_parser.add_argument('--output', help='Файл для записи (по умолчанию - вывод в консоль)')
     
     # Парсер для интерактивного режима
     subparsers.add_parser('interactive', help='Интерактивный режим')
     
     args = parser.parse_args()
     
+    cache_budgets = {}
+    for budget in args.cache_budget:
+        name, _, mb = budget.partition('=')
+        if not mb.isdigit():
+            parser.error(f"Неверный бюджет кэша: {budget} (ожидается ИМЯ=МБ)")
+        cache_budgets[name] = int(mb)
+    
+    pruning = None
+    if args.command == 'index' and (args.stopwords or args.stopwords_file or args.max_df_ratio):
+        extra_stopwords = []
+        if args.stopwords_file:
+            with open(args.stopwords_file, encoding='utf-8') as f:
+                extra_stopwords = [line.strip() for line in f if line.strip()]
+        try:
+            pruning = PruningConfig(args.stopwords or (), extra_stopwords, args.max_df_ratio)
+        except ValueError as e:
+            parser.error(str(e))
+    
     # Создание экземпляра поискового движка
-    engine = SearchEngine()
+    engine = SearchEngine(args.cache_mb, cache_budgets, args.query_log, args.impact_ordered, args.spell, pruning)
     
     try:
         if args.command == 'index':
-            engine.index_documents(args.dir, args.index_file)
+            if args.resume and not args.index_file:
+                parser.error("--resume требует --index-file")
+            engine.index_documents(args.dir, args.index_file, args.ann, args.resume, args.checkpoint_every)
             print(f"✅ Индексация завершена. Документов: {engine.index_manager.index.total_docs}")
             
+        elif args.command == 'search' and args.index:
+            engine.open_registry(args.index_dir, args.index_budget_mb)
+            names = [name.strip() for name in args.index.split(',') if name.strip()]
+            try:
+                results = engine.federated_search(names, args.query, args.limit)
+            except ValueError as e:
+                parser.error(str(e))
+            if results:
+                print(f"🔍 Найдено документов: {len(results)}")
+                print()
+                for i, result in enumerate(results, 1):
+                    print(f"{i}. [{result.index}] {result.document.id} (score: {result.score:.3f})")
+                    print(f"   {result.snippet}")
+                    print()
+            else:
+                print("❌ По запросу ничего не найдено")
+                
         elif args.command == 'search':
             if args.index_file:
-                engine.load_index(args.index_file)
+                pinned_terms = []
+                if args.pin_terms:
+                    with open(args.pin_terms, encoding='utf-8') as f:
+                        pinned_terms = [line.strip() for line in f if line.strip()]
+                if args.pin_log:
+                    pinned_terms += top_terms(read_query_log(args.pin_log), args.pin_top)
+                engine.load_index(args.index_file, lazy=args.lazy, pinned_terms=pinned_terms)
             elif not engine.search_manager:
                 print("❌ Индекс не загружен. Укажите --index-file или сначала выполните индексацию")
                 return
                 
-            results = engine.search(args.query, args.limit)
+            filters = DocFilter(
+                path_prefix=args.path,
+                extensions=tuple(args.ext) if args.ext else None,
+                min_size=args.min_size,
+                max_size=args.max_size,
+                modified_after=datetime.strptime(args.since, '%Y-%m-%d').timestamp() if args.since else None,
+                modified_before=datetime.strptime(args.until, '%Y-%m-%d').timestamp() if args.until else None,
+            )
+            try:
+                boosts = parse_boosts(args.boost) if args.fields or args.boost else None
+            except ValueError as e:
+                parser.error(str(e))
+            try:
+                page = engine.search_page(args.query, args.limit, args.cursor, args.offset, filters, boosts)
+            except ValueError as e:
+                parser.error(str(e))
+            results = page.results
+            suggestion = engine.search_manager.suggest(args.query)
+            if suggestion:
+                print(f"💡 Возможно, вы имели в виду: {suggestion}")
+            if page.stale:
+                print("⚠️  Индекс изменился после выдачи курсора: выдача продолжена от той же границы")
             if results:
                 print(f"🔍 Найдено документов: {len(results)}")
                 print()
-                for i, result in enumerate(results, 1):
+                for i, result in enumerate(results, page.offset + 1):
                     print(f"{i}. {result.document.id} (score: {result.score:.3f})")
                     print(f"   {result.snippet}")
                     print()
+                if page.next_cursor:
+                    print(f"➡️  Следующая страница: --cursor {page.next_cursor}")
             else:
                 print("❌ По запросу ничего не найдено")
+            
+            if args.facets:
+                _, facets = engine.search_manager.search_with_facets(args.query, args.limit, filters, boosts)
+                for field, counts in facets.items():
+                    values = ', '.join(f"{value or '.'}: {count}" for value, count in counts.items())
+                    print(f"{field}: {values or '-'}")
+            
+            if args.explain:
+                plan = engine.search_manager.explain(args.query, args.limit, filters, boosts)
+                print(plan.explain() if plan else "План не построен: пустой запрос")
+                
+        elif args.command == 'similar':
+            engine.load_index(args.index_file)
+            results = engine.search_manager.similar(args.doc_id, args.limit)
+            if results:
+                for i, result in enumerate(results, 1):
+                    print(f"{i}. {result.document.id} (сходство: {result.score:.3f})")
+                    print(f"   {result.snippet}")
+            else:
+                print("❌ Похожие документы не найдены")
+                
+        elif args.command == 'replay':
+            engine.load_index(args.index_file, lazy=args.lazy)
+            baseline = None
+            if args.baseline_index:
+                baseline = SearchEngine(cache_mb=0)
+                baseline.load_index(args.baseline_index)
+            
+            report, diff = engine.replay(args.log, args.rate, args.concurrency, baseline, args.workers)
+            print(f"⏱  {report.summary()}")
+            if diff is not None:
+                print(f"Сравнение с эталоном: одинаковая выдача {diff['identical']:.1%}, "
+                      f"среднее пересечение {diff['overlap']:.1%}")
+                
+        elif args.command == 'watch':
+            if args.index_file and os.path.exists(args.index_file):
+                engine.load_index(args.index_file)
+            else:
+                engine.index_documents(args.dir)
+            engine.start_watch(args.dir, args.interval, args.debounce)
+            try:
+                engine.interactive_mode()
+            finally:
+                engine.stop_watch()
+                if args.index_file:
+                    engine.index_manager.save_index(args.index_file)
+                
+        elif args.command == 'stats':
+            with IndexReader(args.index_file) as reader:
+                stats = collect_term_stats(reader, args.top, with_terms=args.terms)
+            out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+            try:
+                if args.format == 'json':
+                    out.write(json.dumps(stats.to_dict(), ensure_ascii=False, indent=2) + '\n')
+                elif args.format == 'csv':
+                    write_csv(stats, out)
+                else:
+                    _print_stats(stats, out)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
                 
         elif args.command == 'interactive':
             engine.interactive_mode()
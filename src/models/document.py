@@ -7,6 +7,10 @@ class Document:
     id: str
     text: str
     term_count: int = 0
+    # Метаданные файла-источника: путь относительно корня индексации, размер, время изменения
+    path: str = ''
+    size: int = 0
+    mtime: float = 0.0
     
     def __post_init__(self):
         self.term_count = len(self.text.split())
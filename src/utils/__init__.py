@@ -1,4 +1,5 @@
 from .tokenizer import Tokenizer
-from .file_utils import FileUtils
+from .file_utils import FileUtils, IngestionStats
+from .extractors import Extractor, ExtractorRegistry, default_registry
 
-__all__ = ['Tokenizer', 'FileUtils']
\ No newline at end of file
+__all__ = ['Tokenizer', 'FileUtils', 'IngestionStats', 'Extractor', 'ExtractorRegistry', 'default_registry']
\ No newline at end of file
@@ -0,0 +1,316 @@
+import io
+import os
+import re
+import csv
+import gzip
+import json
+import codecs
+import zipfile
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+@dataclass
+class ExtractedRecord:
+    """Текст, извлеченный из файла: весь файл (key='') или одна его запись"""
+    key: str
+    text: str
+    encoding: Optional[str] = None
+
+def decode_stream(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Tuple[str, Iterator[str]]:
+    """
+    Потоковое декодирование: кодировка определяется по первой порции, дальше
+    текст декодируется инкрементально по мере чтения
+    
+    Args:
+        stream: Двоичный поток
+        chunk_size: Размер порции чтения
+    
+    Returns:
+        Tuple[str, Iterator[str]]: Кодировка и итератор по порциям текста
+    """
+    from .file_utils import FileUtils
+    
+    first = stream.read(chunk_size)
+    encoding = FileUtils.detect_encoding(first[:FileUtils.ENCODING_SAMPLE_SIZE])
+    
+    def chunks() -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        data = first
+        while data:
+            text = decoder.decode(data)
+            if text:
+                yield text
+            data = stream.read(chunk_size)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    return encoding, chunks()
+
+def _text_lines(stream: BinaryIO) -> Tuple[str, io.TextIOBase]:
+    """Текстовый поток с построчным чтением поверх двоичного"""
+    from .file_utils import FileUtils
+    
+    buffered = stream if hasattr(stream, 'peek') else io.BufferedReader(stream)
+    encoding = FileUtils.detect_encoding(buffered.peek(FileUtils.ENCODING_SAMPLE_SIZE)[:FileUtils.ENCODING_SAMPLE_SIZE])
+    return encoding, io.TextIOWrapper(buffered, encoding=encoding, errors='replace', newline='')
+
+class Extractor:
+    """Базовый извлекатель текста из файлов одного формата"""
+    
+    name = ''
+    
+    def extract(self, stream: BinaryIO, name: str, registry: 'ExtractorRegistry') -> Iterator[ExtractedRecord]:
+        """
+        Потоковое извлечение текста
+        
+        Args:
+            stream: Двоичный поток с содержимым
+            name: Имя файла (для вложенных форматов)
+            registry: Реестр для извлечения вложенных файлов
+        
+        Returns:
+            Iterator[ExtractedRecord]: Извлеченные записи
+        """
+        raise NotImplementedError
+    
+    def extract_file(self, path: str, size: int, registry: 'ExtractorRegistry') -> Iterator[ExtractedRecord]:
+        """Извлечение из файла на диске"""
+        with open(path, 'rb') as stream:
+            yield from self.extract(stream, os.path.basename(path), registry)
+
+class TextExtractor(Extractor):
+    """Обычный текст"""
+    
+    name = 'text'
+    
+    def extract(self, stream, name, registry):
+        encoding, chunks = decode_stream(stream)
+        yield ExtractedRecord('', ''.join(chunks), encoding)
+    
+    def extract_file(self, path, size, registry):
+        from .file_utils import FileUtils
+        
+        # Файл на диске читается одним проходом (mmap для больших файлов)
+        text, encoding = FileUtils.read_text(path, size)
+        yield ExtractedRecord('', text, encoding)
+
+class MarkdownExtractor(Extractor):
+    """Markdown: разметка удаляется построчно"""
+    
+    name = 'markdown'
+    
+    _image = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+    _link = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+    _markup = re.compile(r'^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+|[*_`~]+|^\s*(```|---+|\|?[-:| ]+\|)\s*$')
+    
+    def extract(self, stream, name, registry):
+        encoding, lines = _text_lines(stream)
+        parts: List[str] = []
+        for line in lines:
+            line = self._link.sub(r'\1', self._image.sub(r'\1', line))
+            parts.append(self._markup.sub(' ', line))
+        yield ExtractedRecord('', ''.join(parts), encoding)
+
+class _HTMLTextParser(HTMLParser):
+    _skip_tags = {'script', 'style', 'noscript', 'template'}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self._skip_tags:
+            self._skip_depth += 1
+    
+    def handle_endtag(self, tag):
+        if tag in self._skip_tags and self._skip_depth:
+            self._skip_depth -= 1
+        else:
+            self.parts.append(' ')
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+class HTMLExtractor(Extractor):
+    """HTML: видимый текст без script/style, разбор порциями"""
+    
+    name = 'html'
+    
+    def extract(self, stream, name, registry):
+        encoding, chunks = decode_stream(stream)
+        parser = _HTMLTextParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+        yield ExtractedRecord('', re.sub(r'\s+', ' ', ''.join(parser.parts)).strip(), encoding)
+
+class CSVExtractor(Extractor):
+    """CSV: каждая строка данных - отдельный документ"""
+    
+    name = 'csv'
+    
+    def __init__(self, has_header: bool = True):
+        self.has_header = has_header
+    
+    def extract(self, stream, name, registry):
+        encoding, lines = _text_lines(stream)
+        reader = csv.reader(lines)
+        for row_number, row in enumerate(reader):
+            if row_number == 0 and self.has_header:
+                continue
+            text = ' '.join(cell for cell in row if cell)
+            if text:
+                yield ExtractedRecord(f'#{row_number}', text, encoding)
+
+class JSONLExtractor(Extractor):
+    """JSON Lines: каждая запись - отдельный документ (ID из поля id или номер строки)"""
+    
+    name = 'jsonl'
+    
+    def extract(self, stream, name, registry):
+        encoding, lines = _text_lines(stream)
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            key = record.get('id', line_number) if isinstance(record, dict) else line_number
+            text = ' '.join(self._strings(record))
+            if text:
+                yield ExtractedRecord(f'#{key}', text, encoding)
+    
+    @classmethod
+    def _strings(cls, value) -> Iterator[str]:
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if key != 'id':
+                    yield from cls._strings(item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from cls._strings(item)
+
+class GzipExtractor(Extractor):
+    """gzip: распаковка на лету, формат содержимого - по имени без .gz"""
+    
+    name = 'gzip'
+    
+    def extract(self, stream, name, registry):
+        inner_name = name[:-3] if name.lower().endswith('.gz') else name
+        with gzip.GzipFile(fileobj=stream) as inner:
+            head = inner.peek(16)[:16]
+            extractor = registry.find(inner_name, head) or registry.default
+            yield from extractor.extract(inner, inner_name, registry)
+
+class ZipExtractor(Extractor):
+    """zip: каждый файл архива извлекается своим извлекателем (ID: архив!файл)"""
+    
+    name = 'zip'
+    
+    def extract(self, stream, name, registry):
+        with zipfile.ZipFile(stream) as archive:
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                with archive.open(member) as inner:
+                    head = inner.peek(16)[:16]
+                    extractor = registry.find(member.filename, head)
+                    if extractor is None:
+                        continue
+                    if isinstance(extractor, ZipExtractor):
+                        # Вложенному zip нужен поток с произвольным доступом
+                        inner = io.BytesIO(inner.read())
+                    for record in extractor.extract(inner, os.path.basename(member.filename), registry):
+                        yield ExtractedRecord(f'!{member.filename}{record.key}', record.text, record.encoding)
+
+class ExtractorRegistry:
+    """Реестр извлекателей по расширению файла и сигнатуре (magic bytes)"""
+    
+    def __init__(self):
+        self._by_extension: Dict[str, Extractor] = {}
+        self._by_magic: List[Tuple[bytes, Extractor]] = []
+        self.default: Extractor = TextExtractor()
+    
+    def register(self, extractor: Extractor, extensions: Tuple[str, ...] = (),
+                 magic: Tuple[bytes, ...] = ()) -> None:
+        """
+        Регистрация извлекателя
+        
+        Args:
+            extractor: Извлекатель
+            extensions: Расширения файлов (с точкой)
+            magic: Сигнатуры начала файла (сравниваются без учета регистра и ведущих пробелов)
+        """
+        for extension in extensions:
+            self._by_extension[extension.lower()] = extractor
+        for signature in magic:
+            self._by_magic.append((signature.lower(), extractor))
+    
+    @property
+    def extensions(self) -> Tuple[str, ...]:
+        return tuple(self._by_extension)
+    
+    def find_by_extension(self, name: str) -> Optional[Extractor]:
+        return self._by_extension.get(os.path.splitext(name)[1].lower())
+    
+    def find(self, name: str, head: bytes = b'') -> Optional[Extractor]:
+        """
+        Поиск извлекателя: сначала по расширению, затем по сигнатуре
+        
+        Args:
+            name: Имя файла
+            head: Первые байты содержимого
+        
+        Returns:
+            Optional[Extractor]: Извлекатель или None, если формат не поддерживается
+        """
+        extractor = self.find_by_extension(name)
+        if extractor is not None:
+            return extractor
+        head = head.lstrip(codecs.BOM_UTF8).lstrip().lower()
+        for signature, extractor in self._by_magic:
+            if head.startswith(signature):
+                return extractor
+        return None
+    
+    def extract_file(self, path: str, size: int) -> Tuple[Optional[str], List[ExtractedRecord]]:
+        """
+        Извлечение записей из файла на диске
+        
+        Args:
+            path: Путь к файлу
+            size: Размер файла
+        
+        Returns:
+            Tuple[Optional[str], List[ExtractedRecord]]: Имя извлекателя (None - формат
+                не поддерживается) и записи
+        """
+        extractor = self.find_by_extension(path)
+        if extractor is None:
+            with open(path, 'rb') as f:
+                extractor = self.find(path, f.read(16))
+        if extractor is None:
+            return None, []
+        return extractor.name, list(extractor.extract_file(path, size, self))
+
+def default_registry() -> ExtractorRegistry:
+    """Реестр со всеми встроенными форматами"""
+    registry = ExtractorRegistry()
+    registry.register(TextExtractor(), extensions=('.txt', '.text'))
+    registry.register(MarkdownExtractor(), extensions=('.md', '.markdown'))
+    registry.register(HTMLExtractor(), extensions=('.html', '.htm'), magic=(b'<!doctype html', b'<html'))
+    registry.register(CSVExtractor(), extensions=('.csv',))
+    registry.register(JSONLExtractor(), extensions=('.jsonl', '.ndjson'))
+    registry.register(GzipExtractor(), extensions=('.gz',), magic=(b'\x1f\x8b',))
+    registry.register(ZipExtractor(), extensions=('.zip',), magic=(b'pk\x03\x04',))
+    return registry
@@ -1,77 +1,309 @@
 import os
-import glob
+import mmap
+import time
+import codecs
 import logging
-from typing import List
+import zipfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
 from ..models.document import Document
+from .extractors import ExtractorRegistry, default_registry
+
+@dataclass
+class IngestionStats:
+    """Статистика чтения файлов при индексации"""
+    files: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    encodings: Counter = field(default_factory=Counter)
+    formats: Counter = field(default_factory=Counter)
+    
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+    
+    def summary(self) -> str:
+        encodings = ', '.join(f"{name}: {count}" for name, count in self.encodings.most_common())
+        formats = ', '.join(f"{name}: {count}" for name, count in self.formats.most_common())
+        return (f"файлов: {self.files}, пропущено: {self.skipped}, ошибок: {self.errors}, "
+                f"{self.bytes / (1024 * 1024):.1f} МБ за {self.elapsed:.2f} с "
+                f"({self.bytes_per_sec / (1024 * 1024):.1f} МБ/с), кодировки: {encodings or '-'}, "
+                f"форматы: {formats or '-'}")
 
 class FileUtils:
     """Утилиты для работы с файлами"""
     
+    # Файлы от этого размера читаются через mmap, без промежуточной копии байтов
+    MMAP_THRESHOLD = 1024 * 1024
+    # Размер образца для определения кодировки
+    ENCODING_SAMPLE_SIZE = 64 * 1024
+    
+    @staticmethod
+    def read_documents_from_directory(directory_path: str, workers: int = 1,
+                                      stats: Optional[IngestionStats] = None,
+                                      max_size_mb: Optional[int] = None,
+                                      registry: Optional[ExtractorRegistry] = None) -> List[Document]:
+        """
+        Читает все документы поддерживаемых форматов из директории
+        
+        Args:
+            directory_path: Путь к директории
+            workers: Количество потоков чтения и извлечения текста
+            stats: Статистика чтения (заполняется, если передана)
+            max_size_mb: Максимальный размер файла (None - без ограничения,
+                извлечение потоковое)
+            registry: Реестр извлекателей (по умолчанию - все встроенные форматы)
+            
+        Returns:
+            List[Document]: Список документов; файлы CSV/JSONL дают по документу на запись
+        """
+        documents = []
+        for _, batch in FileUtils.iter_document_batches(directory_path, workers=workers, stats=stats,
+                                                        max_size_mb=max_size_mb, registry=registry):
+            documents.extend(batch)
+        return documents
+    
     @staticmethod
-    def read_documents_from_directory(directory_path: str) -> List[Document]:
+    def iter_document_batches(directory_path: str, batch_files: int = 1000, workers: int = 1,
+                              stats: Optional[IngestionStats] = None,
+                              max_size_mb: Optional[int] = None,
+                              registry: Optional[ExtractorRegistry] = None,
+                              start_after: Optional[str] = None) -> Iterator[Tuple[Optional[str], List[Document]]]:
         """
-        Читает все текстовые файлы из директории
+        Чтение документов директории порциями файлов (для индексации с контрольными точками)
         
         Args:
             directory_path: Путь к директории
+            batch_files: Файлов в порции
+            workers: Количество потоков чтения и извлечения текста
+            stats: Статистика чтения (заполняется, если передана)
+            max_size_mb: Максимальный размер файла (None - без ограничения)
+            registry: Реестр извлекателей (по умолчанию - все встроенные форматы)
+            start_after: Курсор - путь (от корня) последнего обработанного файла; файлы до него
+                в порядке обхода пропускаются, поэтому добавленные или удаленные файлы не сбивают курсор
             
         Returns:
-            List[Document]: Список документов
+            Iterator[Tuple[Optional[str], List[Document]]]: Курсор после порции и документы порции
         """
         logger = logging.getLogger(__name__)
         
         if not os.path.exists(directory_path):
             raise FileNotFoundError(f"Директория {directory_path} не найдена")
-            
-        documents = []
         
-        # Ищем все .txt файлы в директории и поддиректориях
-        pattern = os.path.join(directory_path, "**", "*.txt")
-        txt_files = glob.glob(pattern, recursive=True)
+        stats = stats if stats is not None else IngestionStats()
+        registry = registry or default_registry()
+        started = time.perf_counter()
         
-        logger.info(f"Найдено .txt файлов: {len(txt_files)}")
+        # Обходим все файлы: формат определяется по расширению или сигнатуре
+        files = list(FileUtils.scan_files(directory_path))
+        logger.info(f"Найдено файлов: {len(files)}")
+        if start_after is not None:
+            cursor_key = FileUtils.scan_order_key(start_after)
+            files = [entry for entry in files
+                     if FileUtils.scan_order_key(os.path.relpath(entry[0], directory_path)) > cursor_key]
+            logger.info(f"Продолжение после {start_after}: осталось файлов {len(files)}")
         
-        for file_path in txt_files:
+        def read_one(entry: Tuple[str, int, float]):
+            file_path, size, mtime = entry
+            # Проверяем размер файла по уже полученному stat
+            if max_size_mb is not None and size > max_size_mb * 1024 * 1024:
+                logger.warning(f"Файл слишком большой: {file_path}")
+                return file_path, size, mtime, None, []
             try:
-                # Проверяем размер файла (макс 10 МБ)
-                if not FileUtils.validate_file_size(file_path, max_size_mb=10):
-                    logger.warning(f"Файл слишком большой: {file_path}")
-                    continue
-                
-                # Читаем файл с обработкой разных кодировок
-                content = FileUtils.read_file_safe(file_path)
-                if content:
-                    # Используем только имя файла (без пути) как ID
-                    doc_id = os.path.basename(file_path)
-                    documents.append(Document(id=doc_id, text=content))
-                    logger.info(f"Успешно прочитан: {doc_id}")
-                
-            except Exception as e:
+                # Извлечение текста выполняется внутри рабочего потока
+                extractor, records = registry.extract_file(file_path, size)
+                return file_path, size, mtime, extractor, records
+            except (OSError, ValueError, EOFError, zipfile.BadZipFile) as e:
                 logger.error(f"Ошибка чтения файла {file_path}: {e}")
+                return file_path, size, mtime, 'error', []
+        
+        total_documents = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for batch_start in range(0, len(files), max(1, batch_files)):
+                batch_started = time.perf_counter()
+                documents = []
+                # map сохраняет порядок файлов, поэтому результат не зависит от числа потоков
+                batch = files[batch_start:batch_start + max(1, batch_files)]
+                for file_path, size, mtime, extractor, records in executor.map(read_one, batch):
+                    if extractor == 'error':
+                        stats.errors += 1
+                        continue
+                    records = [record for record in records if record.text.strip()]
+                    if not records:
+                        stats.skipped += 1
+                        continue
+                    
+                    file_id = FileUtils.file_id(file_path, directory_path)
+                    documents.extend(FileUtils._file_documents(file_id, records, size, mtime))
+                    
+                    stats.files += 1
+                    stats.bytes += size
+                    stats.formats[extractor] += 1
+                    if records[0].encoding:
+                        stats.encodings[records[0].encoding] += 1
+                    logger.info(f"Успешно прочитан: {file_id} (документов: {len(records)})")
                 
-        logger.info(f"Всего загружено документов: {len(documents)}")
-        return documents
+                total_documents += len(documents)
+                stats.elapsed += time.perf_counter() - batch_started
+                cursor = os.path.relpath(batch[-1][0], directory_path).replace(os.sep, '/')
+                yield cursor, documents
+        
+        logger.info(f"Всего загружено документов: {total_documents}")
+        logger.info(f"Чтение файлов: {stats.summary()} (всего {time.perf_counter() - started:.2f} с)")
+    
+    @staticmethod
+    def file_id(file_path: str, directory_path: str) -> str:
+        """
+        ID файла - путь относительно корня индексации: стабилен и не совпадает
+        у одноименных файлов из разных подпапок
+        """
+        return os.path.relpath(file_path, directory_path).replace(os.sep, '/')
+    
+    @staticmethod
+    def _file_documents(file_id: str, records, size: int, mtime: float) -> List[Document]:
+        # Записи одного файла (CSV/JSONL) получают суффикс к ID файла
+        return [Document(id=file_id + record.key, text=record.text, path=file_id, size=size, mtime=mtime)
+                for record in records]
+    
+    @staticmethod
+    def read_file_documents(file_path: str, directory_path: str,
+                            registry: Optional[ExtractorRegistry] = None) -> List[Document]:
+        """
+        Документы одного файла (для инкрементальных обновлений индекса)
+        
+        Args:
+            file_path: Путь к файлу
+            directory_path: Корень индексации (от него считается ID)
+            registry: Реестр извлекателей (по умолчанию - все встроенные форматы)
+        
+        Returns:
+            List[Document]: Документы файла (пустой список, если текста нет)
+        """
+        stat = os.stat(file_path)
+        _, records = (registry or default_registry()).extract_file(file_path, stat.st_size)
+        records = [record for record in records if record.text.strip()]
+        return FileUtils._file_documents(FileUtils.file_id(file_path, directory_path), records,
+                                         stat.st_size, stat.st_mtime)
+    
+    @staticmethod
+    def scan_order_key(relative_path: str) -> Tuple[Tuple[int, str], ...]:
+        """
+        Ключ сортировки, повторяющий порядок обхода scan_files: в каждой папке сначала файлы,
+        затем подпапки, внутри - по имени
+        
+        Args:
+            relative_path: Путь файла от корня обхода
+        
+        Returns:
+            Tuple: Ключ для сравнения позиций в обходе
+        """
+        parts = relative_path.replace(os.sep, '/').split('/')
+        return tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+    
+    @staticmethod
+    def scan_files(directory_path: str, extensions: Tuple[str, ...] = None) -> Iterator[Tuple[str, int, float]]:
+        """
+        Рекурсивный обход директории через os.scandir
+        
+        Args:
+            directory_path: Путь к директории
+            extensions: Допустимые расширения (в нижнем регистре) или None для всех файлов
+        
+        Returns:
+            Iterator[Tuple[str, int, float]]: Пути к файлам, размеры и время изменения
+                (из кэшированного stat)
+        """
+        stack = [directory_path]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    subdirs = []
+                    for entry in sorted(entries, key=lambda e: e.name):
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and (extensions is None or
+                                                  os.path.splitext(entry.name)[1].lower() in extensions):
+                            stat = entry.stat()
+                            yield entry.path, stat.st_size, stat.st_mtime
+                    stack.extend(reversed(subdirs))
+            except OSError as e:
+                logging.getLogger(__name__).error(f"Ошибка обхода директории {current}: {e}")
+    
+    @staticmethod
+    def detect_encoding(sample: bytes) -> str:
+        """
+        Определение кодировки по образцу байтов
+        
+        Args:
+            sample: Начало файла
+        
+        Returns:
+            str: utf-8 (в том числе с BOM), cp1251 или latin-1
+        """
+        if sample.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        try:
+            # Инкрементальный декодер не ругается на символ, обрезанный концом образца
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+        try:
+            sample.decode('cp1251')
+            return 'cp1251'
+        except UnicodeDecodeError:
+            return 'latin-1'
+    
+    @staticmethod
+    def read_text(file_path: str, size: int = None) -> Tuple[str, str]:
+        """
+        Чтение файла за один проход: байты читаются один раз (mmap для больших файлов),
+        кодировка определяется по образцу, декодирование выполняется один раз
+        
+        Args:
+            file_path: Путь к файлу
+            size: Размер файла, если уже известен
+        
+        Returns:
+            Tuple[str, str]: Текст и кодировка
+        """
+        if size is None:
+            size = os.path.getsize(file_path)
+        if size == 0:
+            return '', 'utf-8'
+        
+        with open(file_path, 'rb') as f:
+            if size >= FileUtils.MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return FileUtils._decode(data, file_path)
+            return FileUtils._decode(f.read(), file_path)
+    
+    @staticmethod
+    def _decode(data, file_path: str) -> Tuple[str, str]:
+        encoding = FileUtils.detect_encoding(bytes(data[:FileUtils.ENCODING_SAMPLE_SIZE]))
+        try:
+            return str(data, encoding), encoding
+        except UnicodeDecodeError as e:
+            # Образец не отразил весь файл - декодируем с заменой битых символов
+            logging.getLogger(__name__).warning(f"Ошибка декодирования {file_path} ({encoding}): {e}")
+            return str(data, encoding, errors='replace'), encoding
 
     @staticmethod
     def read_file_safe(file_path: str) -> str:
         """
         Безопасное чтение файла с обработкой разных кодировок
         """
-        encodings = ['utf-8', 'cp1251', 'latin-1']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read().strip()
-                    if content:  # Проверяем что файл не пустой
-                        return content
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                continue
-                
-        logging.warning(f"Не удалось прочитать файл: {file_path}")
-        return ""
+        try:
+            text, _ = FileUtils.read_text(file_path)
+            return text.strip()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Не удалось прочитать файл: {file_path} ({e})")
+            return ""
 
     @staticmethod
     def validate_file_size(file_path: str, max_size_mb: int = 10) -> bool:
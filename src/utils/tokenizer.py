@@ -1,9 +1,11 @@
 import re
-from typing import List
+from typing import AbstractSet, List, Optional
 
 class Tokenizer:
     """Простой токенизатор текста"""
     
+    STOPWORDS = frozenset({'и', 'в', 'на', 'с', 'по', 'для', 'не', 'что', 'это', 'как'})
+    
     @staticmethod
     def tokenize(text: str) -> List[str]:
         """
@@ -23,15 +25,17 @@ class Tokenizer:
         return [token for token in tokens if token.strip()]
 
     @staticmethod
-    def remove_stopwords(tokens: List[str]) -> List[str]:
+    def remove_stopwords(tokens: List[str], stopwords: Optional[AbstractSet[str]] = None) -> List[str]:
         """
         Удаляет стоп-слова из списка токенов
         
         Args:
             tokens: Список токенов
+            stopwords: Стоп-слова (по умолчанию - STOPWORDS)
             
         Returns:
             List[str]: Токены без стоп-слов
         """
-        stopwords = {'и', 'в', 'на', 'с', 'по', 'для', 'не', 'что', 'это', 'как'}
+        if stopwords is None:
+            stopwords = Tokenizer.STOPWORDS
         return [token for token in tokens if token not in stopwords]
\ No newline at end of file
@@ -0,0 +1,53 @@
+import os
+import pytest
+from src.core.ann import SimilarityIndex
+from src.core.index_manager import IndexManager
+from src.core.search_manager import SearchManager
+
+class TestSimilarityIndex:
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Индекс из трех тематических групп документов"""
+        docs_dir = tmp_path / "docs"
+        docs_dir.mkdir()
+        topics = {
+            "cats": "кошка мышь хвост усы мурлыкать",
+            "cars": "машина колесо мотор бензин дорога",
+            "food": "суп хлеб соль ложка обед",
+        }
+        for name, words in topics.items():
+            words = words.split()
+            for i in range(5):
+                text = " ".join(words[j % len(words)] for j in range(i, i + 8))
+                (docs_dir / f"{name}{i}.txt").write_text(text, encoding="utf-8")
+        manager = IndexManager()
+        manager.build_from_directory(str(docs_dir))
+        manager.build_similarity_index(dim=32, n_lists=3, n_probe=3)
+        return manager
+    
+    def test_similar_same_topic(self, manager):
+        """Тест: похожие документы из той же группы"""
+        search = SearchManager(manager.index, vectors=manager.vectors, similarity=manager.similarity)
+        results = search.similar("cats0.txt", k=4)
+        
+        assert len(results) == 4
+        assert all(r.document.id.startswith("cats") for r in results)
+        assert "cats0.txt" not in {r.document.id for r in results}
+    
+    def test_persisted_next_to_index(self, manager, tmp_path):
+        """Тест сохранения и загрузки рядом с файлом индекса"""
+        index_file = str(tmp_path / "index.idx")
+        manager.save_index(index_file)
+        assert os.path.exists(SimilarityIndex.path_for(index_file))
+        
+        loaded = IndexManager()
+        loaded.load_index(index_file)
+        assert loaded.similarity is not None
+        assert loaded.similarity.similar("cars1.txt", 3) == manager.similarity.similar("cars1.txt", 3)
+    
+    def test_fallback_without_index(self, manager):
+        """Тест точного поиска, если индекс похожих документов не построен"""
+        search = SearchManager(manager.index)
+        results = search.similar("food2.txt", k=3)
+        
+        assert all(r.document.id.startswith("food") for r in results)
@@ -0,0 +1,84 @@
+import pytest
+from src.core.cache_manager import CacheManager, approx_sizeof
+from src.core.search_manager import SearchManager
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.models.document import Document
+
+class TestCacheManager:
+    def test_cache_budget_lru(self):
+        """Тест вытеснения самых давних записей при превышении бюджета кэша"""
+        manager = CacheManager(total_bytes=1000)
+        cache = manager.cache("results", budget=300)
+        
+        for key in "abc":
+            cache.put(key, key, size=100)
+        assert cache.get("a") == "a"
+        cache.put("d", "d", size=100)
+        
+        assert "b" not in cache
+        assert {"a", "c", "d"} <= set(k for k in "abcd" if k in cache)
+        assert manager.stats()["results"].evictions == 1
+        assert manager.bytes_used == 300
+    
+    def test_global_budget(self):
+        """Тест общего бюджета: вытесняются самые давние записи любого кэша"""
+        manager = CacheManager(total_bytes=250, budgets={"postings": 200})
+        postings = manager.cache("postings")
+        snippets = manager.cache("snippets")
+        
+        postings.put(1, "x", size=100)
+        snippets.put(1, "y", size=100)
+        postings.put(2, "z", size=100)
+        
+        assert 1 not in postings
+        assert 1 in snippets and 2 in postings
+        assert manager.bytes_used <= 250
+    
+    def test_oversized_value_not_cached(self):
+        """Тест: значение больше бюджета не кэшируется"""
+        cache = CacheManager(total_bytes=100).cache("big")
+        cache.put("key", "value", size=101)
+        
+        assert "key" not in cache
+    
+    def test_approx_sizeof(self):
+        """Тест учета содержимого контейнеров"""
+        assert approx_sizeof(["a" * 1000]) > 1000
+        assert approx_sizeof({"key": b"x" * 500}) > 500
+    
+    def test_query_result_cache(self):
+        """Тест кэша результатов запросов с учетом версии индекса"""
+        index = InvertedIndex()
+        index.add_document(Document(id="doc1", text="кошка ловит мышь"))
+        index.add_document(Document(id="doc2", text="собака"))
+        manager = CacheManager()
+        search = SearchManager(index, cache_manager=manager)
+        
+        first = search.search("кошка")
+        second = search.search("кошка")
+        assert [r.document.id for r in first] == [r.document.id for r in second]
+        assert manager.stats()["query_results"].hits == 1
+        
+        index.add_document(Document(id="doc3", text="кошка"))
+        assert "doc3" in {r.document.id for r in search.search("кошка")}
+
+    def test_query_result_cache_reload(self, tmp_path):
+        """Тест: после загрузки другого файла индекса кэш не отдает результаты прежнего"""
+        paths = {}
+        for name, text in (("a", "яблоко красное"), ("b", "яблоко зеленое")):
+            builder = IndexManager()
+            builder.index.add_documents([Document(id=f"{name}1.txt", text=text),
+                                         Document(id=f"{name}2.txt", text="груша")])
+            paths[name] = str(tmp_path / f"{name}.idx")
+            builder.save_index(paths[name])
+        
+        manager = CacheManager()
+        engine = IndexManager(cache_manager=manager)
+        seen = []
+        for name in ("a", "b", "a"):
+            engine.load_index(paths[name])
+            search = SearchManager(engine.index, vectors=engine.vectors, cache_manager=manager)
+            seen.append([r.document.id for r in search.search("яблоко")])
+        assert seen == [["a1.txt"], ["b1.txt"], ["a1.txt"]]
+        # Тот же неизмененный файл - то же содержимое, поэтому запись кэша переиспользуется
+        assert manager.stats()["query_results"].hits == 1
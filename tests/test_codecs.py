@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+from src.core.postings_codecs import available_codecs, get_codec
+from src.core.index_storage import IndexReader, IndexWriter
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.models.document import Document
+
+class TestPostingsCodecs:
+    @pytest.mark.parametrize("name", available_codecs())
+    def test_roundtrip(self, name):
+        """Тест кодирования и декодирования блоков"""
+        codec = get_codec(name)
+        rng = np.random.default_rng(42)
+        blocks = [
+            np.array([], dtype=np.uint64),
+            np.array([0, 1, 1, 3], dtype=np.uint64),
+            rng.geometric(0.05, 128).astype(np.uint64),
+            rng.integers(0, 2 ** 40, 128).astype(np.uint64),
+        ]
+        
+        for values in blocks:
+            decoded = codec.decode(codec.encode(values), len(values))
+            assert np.array_equal(decoded, values)
+    
+    def test_unknown_codec(self):
+        """Тест ошибки для неизвестного кодека"""
+        with pytest.raises(ValueError):
+            get_codec("zip")
+
+class TestIndexStorage:
+    @pytest.mark.parametrize("name", available_codecs())
+    def test_codec_recorded_in_header(self, name, tmp_path):
+        """Тест записи кодека в заголовок и поблочного чтения"""
+        index = InvertedIndex()
+        for i in range(300):
+            index.add_document(Document(id=f"doc{i}", text="common " + ("rare " if i % 7 == 0 else "")))
+        path = str(tmp_path / "index.bin")
+        IndexWriter(get_codec(name), block_size=64).write(index, path)
+        
+        with IndexReader(path) as reader:
+            assert reader.header["codec"] == name
+            assert reader.num_blocks("common") == 5
+            doc_ords, freqs = reader.read_postings("rare")
+            assert [reader.doc_ids[i] for i in doc_ords] == [f"doc{i}" for i in range(0, 300, 7)]
+            assert set(freqs.tolist()) == {1}
+    
+    def test_auto_codec(self):
+        """Тест выбора кодека при построении"""
+        manager = IndexManager(codec="auto")
+        manager.index.add_document(Document(id="doc1", text="hello world"))
+        
+        assert manager.choose_codec() in available_codecs()
@@ -0,0 +1,78 @@
+import threading
+import pytest
+from src.core.index_manager import InvertedIndex
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+
+class TestSnapshotIsolation:
+    def test_snapshot_is_immutable(self):
+        """Тест неизменности снимка после записи"""
+        index = InvertedIndex()
+        index.add_document(Document(id="doc1", text="hello world"))
+        snapshot = index.snapshot()
+        
+        index.add_document(Document(id="doc2", text="hello again"))
+        index.remove_document("doc1")
+        
+        assert snapshot.total_docs == 1
+        assert dict(snapshot.terms["hello"]) == {"doc1": 1}
+        assert "doc1" in snapshot.documents
+        assert index.snapshot().total_docs == 1
+        assert dict(index.terms["hello"]) == {"doc2": 1}
+    
+    def test_reader_does_not_wait_for_writer(self):
+        """Тест: читатель, пришедший во время записи, получает последний снимок и не вызывает копирования"""
+        index = InvertedIndex()
+        index.add_document(Document(id="doc1", text="hello world"))
+        published = index.snapshot()
+        index.add_document(Document(id="doc2", text="hello again"))
+        # Долгое копирование словарей: снимок остается допустимым 10 с
+        index._copy_time = 1.0
+        
+        result = []
+        with index._write_lock:
+            reader = threading.Thread(target=lambda: result.append(index.snapshot()))
+            reader.start()
+            reader.join(timeout=5)
+        assert result == [published]
+        assert not index._shared
+        assert index.snapshot().total_docs == 2
+    
+    def test_concurrent_readers_and_writer(self):
+        """Стресс-тест: один писатель и несколько читателей видят согласованное состояние"""
+        index = InvertedIndex()
+        manager = SearchManager(index)
+        errors = []
+        done = threading.Event()
+        
+        def writer():
+            try:
+                for i in range(3000):
+                    index.add_document(Document(id=f"doc{i}", text=f"common term{i % 50} unique{i}"))
+                    if i % 3 == 0:
+                        index.remove_document(f"doc{i - 1}")
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+        
+        def reader():
+            try:
+                while not done.is_set():
+                    snapshot = index.snapshot()
+                    postings = snapshot.terms.get("common", {})
+                    # В согласованном снимке каждый документ содержит "common"
+                    assert len(postings) == snapshot.total_docs == len(snapshot.documents)
+                    assert all(doc_id in snapshot.documents for doc_id in postings)
+                    manager.search("common term7")
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert not errors, errors
+        assert index.snapshot().total_docs == len(index.documents) == 3000 - 999
@@ -0,0 +1,44 @@
+import os
+import pytest
+from src.core.dedup import DuplicateDetector
+from src.core.index_manager import IndexManager
+
+TEXT = " ".join(f"слово{i}" for i in range(200))
+
+class TestDuplicateDetector:
+    def test_exact_duplicate(self):
+        """Тест поиска точного дубликата"""
+        detector = DuplicateDetector(table_bits=12, window=64)
+        
+        assert detector.check("a.txt", TEXT) is None
+        assert detector.check("copy/a.txt", TEXT) == "a.txt"
+        assert detector.exact_duplicates == 1
+    
+    def test_near_duplicate(self):
+        """Тест поиска почти-дубликата"""
+        detector = DuplicateDetector(table_bits=12, window=64)
+        detector.check("a.txt", TEXT)
+        
+        assert detector.check("b.txt", TEXT + " приписка") == "a.txt"
+        assert detector.clusters == {"a.txt": ["b.txt"]}
+    
+    def test_distinct_documents(self):
+        """Тест отсутствия ложных срабатываний"""
+        detector = DuplicateDetector(table_bits=12, window=64)
+        detector.check("a.txt", TEXT)
+        
+        assert detector.check("b.txt", " ".join(f"другое{i}" for i in range(200))) is None
+
+class TestIndexManagerDedup:
+    def test_skip_duplicates(self, tmp_path):
+        """Тест пропуска дубликатов из зеркальной папки и уникальных ID"""
+        for folder in ("main", "mirror"):
+            os.makedirs(tmp_path / folder)
+            (tmp_path / folder / "doc.txt").write_text(TEXT, encoding="utf-8")
+        (tmp_path / "mirror" / "other.txt").write_text("совсем другой текст", encoding="utf-8")
+        
+        manager = IndexManager(dedup="skip")
+        manager.build_from_directory(str(tmp_path))
+        
+        assert manager.index.total_docs == 2
+        assert sum(len(dups) for dups in manager.duplicates.values()) == 1
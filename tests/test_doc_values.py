@@ -0,0 +1,74 @@
+import os
+import pytest
+from src.core.doc_values import DocFilter, DocValues
+from src.core.index_manager import IndexManager
+from src.core.search_manager import SearchManager
+
+class TestDocValues:
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Индекс из файлов в разных каталогах, разного размера и возраста"""
+        docs_dir = tmp_path / "docs"
+        (docs_dir / "reports" / "2023").mkdir(parents=True)
+        (docs_dir / "notes").mkdir()
+        files = {
+            "reports/2023/q1.txt": ("отчет продажи квартал", 1_600_000_000),
+            "reports/q2.md": ("отчет продажи итоги " + "x " * 8000, 1_700_000_000),
+            "notes/idea.txt": ("идея продажи", 1_700_000_000),
+        }
+        for name, (text, mtime) in files.items():
+            path = docs_dir / name
+            path.write_text(text, encoding="utf-8")
+            os.utime(path, (mtime, mtime))
+        manager = IndexManager()
+        manager.build_from_directory(str(docs_dir))
+        return manager
+    
+    def test_metadata_captured(self, manager):
+        """Тест сбора метаданных при чтении директории"""
+        doc = manager.index.documents["reports/2023/q1.txt"]
+        
+        assert doc.path == "reports/2023/q1.txt"
+        assert doc.size == len("отчет продажи квартал".encode("utf-8"))
+        assert doc.mtime == 1_600_000_000
+    
+    def test_filters(self, manager):
+        """Тест фильтров по каталогу, расширению, размеру и времени"""
+        search = SearchManager(manager.index, vectors=manager.vectors, doc_values=manager.doc_values)
+        
+        def ids(doc_filter):
+            return {r.document.id for r in search.search("продажи", filters=doc_filter)}
+        
+        assert ids(DocFilter(path_prefix="reports")) == {"reports/2023/q1.txt", "reports/q2.md"}
+        assert ids(DocFilter(path_prefix="report")) == set()
+        assert ids(DocFilter(extensions=("md",))) == {"reports/q2.md"}
+        assert ids(DocFilter(min_size=1000)) == {"reports/q2.md"}
+        assert ids(DocFilter(modified_after=1_650_000_000)) == {"reports/q2.md", "notes/idea.txt"}
+    
+    def test_filters_without_vectors(self, manager):
+        """Тест фильтров при ранжировании по TF-IDF (векторы не переданы)"""
+        search = SearchManager(manager.index)
+        results = search.search("продажи", filters=DocFilter(path_prefix="notes"))
+        
+        assert [r.document.id for r in results] == ["notes/idea.txt"]
+    
+    def test_facets(self, manager):
+        """Тест фасетов по всем совпавшим документам"""
+        search = SearchManager(manager.index, vectors=manager.vectors)
+        results, facets = search.search_with_facets("отчет", limit=1)
+        
+        assert len(results) == 1
+        assert facets["directory"] == {"reports/2023": 1, "reports": 1}
+        assert facets["extension"] == {".txt": 1, ".md": 1}
+        assert sum(facets["size"].values()) == 2
+    
+    def test_metadata_persisted(self, manager, tmp_path):
+        """Тест сохранения метаданных в файле индекса"""
+        index_file = str(tmp_path / "index.idx")
+        manager.save_index(index_file)
+        loaded = IndexManager()
+        loaded.load_index(index_file)
+        
+        doc = loaded.index.documents["notes/idea.txt"]
+        assert (doc.path, doc.mtime) == ("notes/idea.txt", 1_700_000_000)
+        assert isinstance(loaded.doc_values, DocValues)
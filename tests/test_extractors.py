@@ -0,0 +1,49 @@
+import gzip
+import zipfile
+import pytest
+from src.utils.extractors import default_registry
+from src.utils.file_utils import FileUtils, IngestionStats
+
+class TestExtractors:
+    @pytest.fixture
+    def corpus(self, tmp_path):
+        """Создает каталог с файлами разных форматов"""
+        (tmp_path / "note.md").write_text("# Заголовок\n\nТекст со [ссылкой](http://x)", encoding="utf-8")
+        (tmp_path / "page.html").write_text(
+            "<html><head><style>body {}</style></head><body><p>Привет&nbsp;мир</p></body></html>", encoding="utf-8")
+        (tmp_path / "table.csv").write_text("name,city\nИван,Москва\nПетр,Казань\n", encoding="utf-8")
+        (tmp_path / "rows.jsonl").write_text('{"id": "a1", "title": "первая"}\n{"title": "вторая"}\n', encoding="utf-8")
+        with gzip.open(tmp_path / "log.txt.gz", "wt", encoding="utf-8") as f:
+            f.write("сжатый текст")
+        with zipfile.ZipFile(tmp_path / "archive.zip", "w") as archive:
+            archive.writestr("inner/doc.txt", "текст из архива")
+        (tmp_path / "noext").write_bytes(gzip.compress("без расширения".encode("utf-8")))
+        (tmp_path / "image.png").write_bytes(b"\x89PNG\r\n")
+        return tmp_path
+    
+    def test_read_all_formats(self, corpus):
+        """Тест извлечения документов из всех форматов"""
+        stats = IngestionStats()
+        documents = FileUtils.read_documents_from_directory(str(corpus), workers=2, stats=stats)
+        texts = {doc.id: doc.text for doc in documents}
+        
+        assert "Заголовок" in texts["note.md"] and "ссылкой" in texts["note.md"]
+        assert "http" not in texts["note.md"]
+        assert texts["page.html"] == "Привет мир"
+        assert texts["table.csv#1"] == "Иван Москва"
+        assert texts["table.csv#2"] == "Петр Казань"
+        assert texts["rows.jsonl#a1"] == "первая"
+        assert texts["rows.jsonl#2"] == "вторая"
+        assert texts["log.txt.gz"] == "сжатый текст"
+        assert texts["archive.zip!inner/doc.txt"] == "текст из архива"
+        assert texts["noext"] == "без расширения"
+        assert "image.png" not in texts
+        assert stats.formats["csv"] == 1
+    
+    def test_registry_lookup(self):
+        """Тест поиска извлекателя по расширению и сигнатуре"""
+        registry = default_registry()
+        
+        assert registry.find("a.MD").name == "markdown"
+        assert registry.find("page", b"  <!DOCTYPE html>").name == "html"
+        assert registry.find("data.bin", b"\x00\x01") is None
@@ -0,0 +1,81 @@
+import pytest
+from src.core.federation import IndexRegistry, merge_results
+from src.core.index_manager import IndexManager
+from src.models.document import Document, SearchResult
+
+class TestFederation:
+    @pytest.fixture
+    def index_dir(self, tmp_path):
+        collections = {
+            'news': [Document(id="doc1.txt", path="doc1.txt", text="поисковый движок ищет документы"),
+                     Document(id="doc2.txt", path="doc2.txt", text="погода сегодня хорошая")],
+            'archive': [Document(id="doc1.txt", path="doc1.txt", text="старые документы в архиве"),
+                        Document(id="doc2.txt", path="doc2.txt", text="движок индексирует документы быстро"),
+                        Document(id="doc3.txt", path="doc3.txt", text="отчеты за прошлый год")],
+        }
+        for name, documents in collections.items():
+            manager = IndexManager()
+            manager.index.add_documents(documents)
+            manager.save_index(str(tmp_path / f"{name}.idx"))
+        return tmp_path
+    
+    def test_merge_results(self):
+        """Тест: оценки нормируются по лучшему результату каждого индекса"""
+        a = [SearchResult(Document(id="x", text="x"), 4.0), SearchResult(Document(id="y", text="y"), 1.0)]
+        b = [SearchResult(Document(id="x", text="x"), 0.5), SearchResult(Document(id="z", text="z"), 0.4)]
+        merged = merge_results([('a', a), ('b', b)], 3)
+        
+        assert [(r.index, r.document.id, r.score) for r in merged] == [('a', 'x', 1.0), ('b', 'x', 1.0),
+                                                                     ('b', 'z', 0.8)]
+        assert merged[2].raw_score == 0.4
+    
+    def test_lazy_search(self, index_dir):
+        """Тест: индексы загружаются при первом запросе, выдача общая"""
+        registry = IndexRegistry()
+        assert registry.discover(str(index_dir)) == ['archive', 'news']
+        assert registry.loaded == []
+        
+        results = registry.search("движок", ['news'])
+        assert [(r.index, r.document.id) for r in results] == [('news', 'doc1.txt')]
+        assert registry.loaded == ['news']
+        
+        results = registry.search("документы движок")
+        assert {(r.index, r.document.id) for r in results} >= {('news', 'doc1.txt'), ('archive', 'doc2.txt')}
+        assert results[0].score == 1.0
+        assert sorted(registry.loaded) == ['archive', 'news']
+        
+        with pytest.raises(ValueError):
+            registry.search("движок", ['missing'])
+    
+    def test_eviction(self, index_dir):
+        """Тест: при превышении бюджета вытесняется давно не использованный индекс"""
+        registry = IndexRegistry()
+        registry.discover(str(index_dir))
+        registry.get('news')
+        registry.get('archive')
+        budget = registry._cache.stats.bytes - 1
+        
+        small = IndexRegistry(memory_budget=budget)
+        small.discover(str(index_dir))
+        small.get('news')
+        small.get('archive')
+        assert small.loaded == ['archive']
+        assert [r.document.id for r in small.search("погода", ['news'])] == ["doc2.txt"]
+        assert small.loaded == ['news']
+    
+    def test_oversized_index_kept(self, index_dir, caplog):
+        """Тест: индекс больше бюджета не перезагружается на каждый запрос"""
+        registry = IndexRegistry(memory_budget=1)
+        registry.discover(str(index_dir))
+        loads = []
+        load = registry._load
+        registry._load = lambda name: loads.append(name) or load(name)
+        
+        for _ in range(3):
+            assert [r.document.id for r in registry.search("погода", ['news'])] == ["doc2.txt"]
+        assert loads == ['news']
+        assert registry.loaded == ['news']
+        assert "больше бюджета" in caplog.text
+        
+        registry.search("архиве", ['archive'])
+        assert registry.loaded == ['archive']
@@ -0,0 +1,81 @@
+import pytest
+from src.core.fields import DEFAULT_BOOSTS, field_tokens, parse_boosts
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.query_planner import QueryPlanner, STRATEGY_FIELDS
+from src.core.ranker import TFIDFRanker
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+
+class TestFields:
+    @pytest.fixture
+    def sample_index(self):
+        """Индекс, где термин report есть в имени одного файла и в тексте других"""
+        index = InvertedIndex()
+        index.add_documents([
+            Document(id="docs/report_2023.txt", path="docs/report_2023.txt",
+                     text="Квартальные итоги\nвыручка выросла за квартал"),
+            Document(id="notes.txt", path="notes.txt", text="заметки\nreport задерживается до пятницы"),
+            Document(id="todo.txt", path="todo.txt", text="План работ на неделю: Report\nподготовить report и выручка"),
+            Document(id="misc.txt", path="misc.txt", text="разное\nничего важного тут нет"),
+        ] + [Document(id=f"other{i}.txt", path=f"other{i}.txt", text=f"прочее {i}") for i in range(6)])
+        return index
+    
+    def test_field_tokens(self):
+        """Тест токенов пути и заголовка"""
+        doc = Document(id="a/Big_Report-2023.TXT", path="a/Big_Report-2023.TXT", text="\n  Итоги: год!\nтекст")
+        tokens = field_tokens(doc)
+        
+        assert tokens['path'] == ["a", "big_report", "big", "report", "2023", "txt"]
+        assert tokens['title'] == ["итоги", "год"]
+    
+    def test_filename_match_ranks_first(self, sample_index):
+        """Тест: совпадение в имени файла - сильнейший сигнал"""
+        manager = SearchManager(sample_index)
+        assert "docs/report_2023.txt" not in [r.document.id for r in manager.search("report")]
+        
+        results = manager.search("report", boosts=DEFAULT_BOOSTS)
+        ids = [r.document.id for r in results]
+        
+        assert ids[0] == "docs/report_2023.txt"
+        # Заголовок весит больше, чем совпадение только в теле
+        assert ids.index("todo.txt") < ids.index("notes.txt")
+        assert manager.explain("report", boosts=DEFAULT_BOOSTS).strategy == STRATEGY_FIELDS
+    
+    def test_body_only_boosts_match_tfidf(self, sample_index):
+        """Тест: с весом только у тела оценки совпадают с обычным TF-IDF"""
+        ranker = TFIDFRanker()
+        planner = QueryPlanner()
+        terms = ["выручка", "квартал"]
+        expected = ranker.rank_planned(planner.plan(terms, sample_index), sample_index)
+        
+        plan = planner.plan(terms, sample_index, fields=True)
+        results = ranker.rank_planned(plan, sample_index, boosts={'body': 1.0, 'title': 0.0, 'path': 0.0})
+        
+        assert [(r.document.id, r.score) for r in results] == [(r.document.id, r.score) for r in expected]
+    
+    def test_remove_and_snapshot(self, sample_index):
+        """Тест удаления документа из постингов полей и неизменности снимка"""
+        snapshot = sample_index.snapshot()
+        sample_index.remove_document("docs/report_2023.txt")
+        
+        assert "docs/report_2023.txt" not in sample_index.field_terms["report"]
+        assert "docs/report_2023.txt" not in sample_index.field_lengths
+        assert "docs/report_2023.txt" in snapshot.field_terms["report"]
+    
+    def test_fields_restored_on_load(self, sample_index, tmp_path):
+        """Тест восстановления постингов полей при загрузке индекса"""
+        manager = IndexManager()
+        manager.index = sample_index
+        manager.save_index(str(tmp_path / "index.bin"))
+        
+        for lazy in (False, True):
+            loaded = IndexManager()
+            loaded.load_index(str(tmp_path / "index.bin"), lazy=lazy)
+            assert loaded.index.field_terms == dict(sample_index.field_terms)
+            assert loaded.index.field_lengths == dict(sample_index.field_lengths)
+    
+    def test_parse_boosts(self):
+        """Тест разбора весов полей"""
+        assert parse_boosts(["path=5"]) == {**DEFAULT_BOOSTS, 'path': 5.0}
+        with pytest.raises(ValueError):
+            parse_boosts(["author=2"])
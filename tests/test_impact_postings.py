@@ -0,0 +1,102 @@
+import random
+import numpy as np
+import pytest
+from src.core.doc_values import DocFilter, DocValues
+from src.core.impact_postings import ImpactOrderedPostings
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.query_planner import (QueryPlanner, STRATEGY_BOOLEAN_FIRST, STRATEGY_EXHAUSTIVE,
+                                    STRATEGY_IMPACT_ORDERED)
+from src.core.ranker import TFIDFRanker
+from src.core.search_manager import SearchManager
+from src.core.vectors import DocumentVectors
+from src.models.document import Document
+
+class TestImpactOrderedPostings:
+    @pytest.fixture
+    def sample_index(self):
+        """Индекс из случайных документов с частыми и редкими словами"""
+        rng = random.Random(7)
+        vocabulary = ["alpha", "beta", "gamma", "delta"] + [f"word{i}" for i in range(40)]
+        index = InvertedIndex()
+        index.add_documents([
+            Document(id=f"doc{i}", text=" ".join(rng.choice(vocabulary) for _ in range(rng.randint(3, 40))))
+            for i in range(2000)
+        ])
+        return index
+    
+    def test_layout(self, sample_index):
+        """Тест порядка списков: по убыванию вклада и по номерам документов"""
+        impacts = ImpactOrderedPostings.from_index(sample_index.snapshot())
+        col = impacts.vocabulary["alpha"]
+        start, end = impacts.indptr[col], impacts.indptr[col + 1]
+        
+        assert end - start == len(sample_index.terms["alpha"])
+        assert np.all(np.diff(impacts.impact_values[start:end]) <= 0)
+        assert np.all(np.diff(impacts.rows[start:end]) > 0)
+    
+    @pytest.mark.parametrize("terms", [["alpha"], ["word3"], ["alpha", "beta"], ["word3", "gamma"]])
+    def test_tfidf_matches_exhaustive(self, sample_index, terms):
+        """Тест совпадения top-k ранней остановки с полным перебором"""
+        ranker = TFIDFRanker()
+        impacts = ImpactOrderedPostings.from_index(sample_index.snapshot())
+        plan = QueryPlanner(pruning_min_postings=0).plan(terms, sample_index, impact_ordered=True)
+        assert plan.strategy == STRATEGY_IMPACT_ORDERED
+        
+        exhaustive = QueryPlanner(pruning_min_postings=10 ** 9).plan(terms, sample_index)
+        expected = ranker.rank_planned(exhaustive, sample_index, 10)
+        results = ranker.rank_planned(plan, sample_index, 10, impacts=impacts)
+        
+        assert [r.score for r in results] == [r.score for r in expected]
+        assert plan.postings_scanned < exhaustive.postings_scanned
+    
+    def test_mask(self, sample_index):
+        """Тест фильтра: документы вне маски не попадают в кандидаты"""
+        impacts = ImpactOrderedPostings.from_index(sample_index.snapshot())
+        mask = np.zeros(len(impacts.doc_ids), dtype=bool)
+        mask[::3] = True
+        
+        rows, _ = impacts.top_k([("alpha", 1.0)], 10, mask)
+        
+        assert rows and all(mask[row] for row in rows)
+    
+    def test_boolean_queries_keep_document_order(self, sample_index):
+        """Тест: длинные запросы по-прежнему пересекают постинги в порядке документов"""
+        plan = QueryPlanner(pruning_min_postings=0).plan(["alpha", "beta", "gamma"], sample_index,
+                                                         impact_ordered=True)
+        assert plan.strategy == STRATEGY_BOOLEAN_FIRST
+        
+        plan = QueryPlanner().plan(["word3"], sample_index, impact_ordered=True)
+        assert plan.strategy == STRATEGY_EXHAUSTIVE
+    
+    def test_cosine_search(self, sample_index):
+        """Тест косинусного ранжирования с ранней остановкой через SearchManager"""
+        manager = IndexManager(impact_ordered=True)
+        manager.index = sample_index
+        manager.finalize()
+        planner = QueryPlanner(pruning_min_postings=0)
+        
+        fast = SearchManager(sample_index, planner, vectors=manager.vectors, impacts=manager.impacts)
+        full = SearchManager(sample_index, planner, vectors=DocumentVectors.build(sample_index.snapshot()))
+        
+        for query in ["alpha", "beta word3"]:
+            plan = fast.explain(query)
+            assert plan.strategy == STRATEGY_IMPACT_ORDERED
+            expected = full.search(query)
+            results = fast.search(query)
+            assert [r.score for r in results] == pytest.approx([r.score for r in expected])
+        
+        # После изменения индекса устаревшие постинги не используются
+        sample_index.add_document(Document(id="new", text="alpha beta"))
+        assert fast.explain("alpha").strategy != STRATEGY_IMPACT_ORDERED
+    
+    def test_filter_with_nonpositive_idf(self):
+        """Тест: при переходе к полному перебору (idf <= 0) фильтр по метаданным сохраняется"""
+        index = InvertedIndex()
+        index.add_documents([Document(id=f"{'a' if i < 10 else 'b'}/d{i}.txt", path=f"{'a' if i < 10 else 'b'}/d{i}.txt",
+                                      text="common") for i in range(1200)])
+        snapshot = index.snapshot()
+        manager = SearchManager(index, doc_values=DocValues.build(snapshot),
+                                impacts=ImpactOrderedPostings.from_index(snapshot))
+        
+        results = manager.search("common", 20, filters=DocFilter(path_prefix="a"))
+        assert sorted(r.document.id for r in results) == sorted(f"a/d{i}.txt" for i in range(10))
@@ -2,6 +2,7 @@ import pytest
 import tempfile
 import os
 from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.index_storage import IndexReader, read_manifest
 from src.models.document import Document
 
 class TestInvertedIndex:
@@ -50,4 +51,52 @@ class TestIndexManager:
             
         finally:
             if os.path.exists(temp_path):
-                os.unlink(temp_path)
\ No newline at end of file
+                os.unlink(temp_path)
+    
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Прерванная индексация продолжается с контрольной точки"""
+        docs_dir = tmp_path / "docs"
+        (docs_dir / "sub").mkdir(parents=True)
+        for i in range(5):
+            (docs_dir / f"doc{i}.txt").write_text(f"общий текст номер{i}", encoding='utf-8')
+        (docs_dir / "sub" / "nested.txt").write_text("вложенный общий текст", encoding='utf-8')
+        checkpoint = str(tmp_path / "index.bin.checkpoint")
+        
+        saved = []
+        original = IndexManager.save_checkpoint
+        
+        def interrupted(self, *args):
+            original(self, *args)
+            saved.append(args[-1])
+            if len(saved) == 2:
+                raise KeyboardInterrupt
+        
+        manager = IndexManager()
+        manager.save_checkpoint = interrupted.__get__(manager)
+        with pytest.raises(KeyboardInterrupt):
+            manager.build_from_directory(str(docs_dir), checkpoint_path=checkpoint, checkpoint_every=2)
+        assert saved == ["doc1.txt", "doc3.txt"]
+        # Каждая контрольная точка дописывает только свою порцию
+        manifest = read_manifest(checkpoint)
+        assert manifest['segments'] == ["seg_000001.idx", "seg_000002.idx"]
+        with IndexReader(os.path.join(checkpoint, "seg_000002.idx")) as reader:
+            assert [doc.id for doc in reader.iter_documents()] == ["doc2.txt", "doc3.txt"]
+        
+        resumed = IndexManager()
+        resumed.build_from_directory(str(docs_dir), checkpoint_path=checkpoint, checkpoint_every=2, resume=True)
+        full = IndexManager()
+        full.build_from_directory(str(docs_dir))
+        
+        assert sorted(resumed.index.documents) == sorted(full.index.documents)
+        assert resumed.index.terms == full.index.terms
+        assert resumed.ingestion_stats.files == 6
+    
+    def test_resume_rejects_other_directory(self, tmp_path):
+        """Контрольная точка другой директории не используется"""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "doc.txt").write_text("текст", encoding='utf-8')
+        checkpoint = str(tmp_path / "index.checkpoint")
+        IndexManager().build_from_directory(str(tmp_path / "a"), checkpoint_path=checkpoint)
+        
+        with pytest.raises(ValueError):
+            IndexManager().build_from_directory(str(tmp_path), checkpoint_path=checkpoint, resume=True)
@@ -0,0 +1,107 @@
+import pytest
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.doc_values import DocFilter
+from src.core.pagination import PageCursor, select_page
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+
+class TestPagination:
+    @pytest.fixture
+    def documents(self):
+        """Документы с одинаковыми оценками: порядок определяется идентификаторами"""
+        docs = [Document(id=f"doc{i:02d}.txt", path=f"doc{i:02d}.txt", text=f"отчет квартал {i % 3}")
+                for i in range(25)]
+        docs += [Document(id=f"other{i}.txt", path=f"other{i}.txt", text=f"прочее {i}") for i in range(10)]
+        return docs
+    
+    def pages(self, manager, query, limit):
+        ids = []
+        page = manager.search_page(query, limit)
+        while True:
+            ids.append([r.document.id for r in page.results])
+            if page.next_cursor is None:
+                return ids
+            page = manager.search_page(page.query, limit, page.next_cursor)
+    
+    def test_select_page(self):
+        """Тест: граница и смещение дают одну и ту же страницу"""
+        items = [("c", 1.0), ("a", 2.0), ("b", 1.0), ("d", 0.5)]
+        
+        assert select_page(items, 2) == [("a", 2.0), ("b", 1.0)]
+        assert select_page(items, 2, offset=2) == [("c", 1.0), ("d", 0.5)]
+        assert select_page(items, 2, after=(1.0, "b")) == [("c", 1.0), ("d", 0.5)]
+    
+    def test_cursor_roundtrip(self):
+        """Тест кодирования курсора (оценка без потери точности)"""
+        cursor = PageCursor(0.1 + 0.2, "папка/файл.txt", 20, "3f2a", "build:7")
+        assert PageCursor.decode(cursor.encode()) == cursor
+        with pytest.raises(ValueError):
+            PageCursor.decode("не курсор")
+    
+    def test_pages_match_full_ranking(self, documents):
+        """Тест: страницы по курсору совпадают с разбиением полной выдачи"""
+        index = InvertedIndex()
+        index.add_documents(documents)
+        manager = SearchManager(index)
+        
+        full = [r.document.id for r in manager.search("отчет", 100)]
+        pages = self.pages(manager, "отчет", 10)
+        
+        assert [doc_id for page in pages for doc_id in page] == full
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert full == sorted(full)
+        
+        by_offset = manager.search_page("отчет", 10, offset=10)
+        assert [r.document.id for r in by_offset.results] == pages[1]
+    
+    def test_cosine_pages(self, documents):
+        """Тест: постраничная выдача при косинусном ранжировании"""
+        index_manager = IndexManager()
+        index_manager.index.add_documents(documents)
+        index_manager.finalize()
+        manager = SearchManager(index_manager.index, vectors=index_manager.vectors)
+        
+        full = [r.document.id for r in manager.search("отчет квартал 1", 100)]
+        pages = self.pages(manager, "отчет квартал 1", 7)
+        
+        assert [doc_id for page in pages for doc_id in page] == full
+    
+    def test_stale_cursor(self, documents):
+        """Тест: курсор, выданный до изменения индекса, помечает страницу как устаревшую"""
+        index = InvertedIndex()
+        index.add_documents(documents)
+        manager = SearchManager(index)
+        first = manager.search_page("отчет", 10)
+        
+        index.add_document(Document(id="doc00a.txt", path="doc00a.txt", text="отчет квартал 0"))
+        second = manager.search_page("отчет", 10, first.next_cursor)
+        
+        assert second.stale
+        assert second.offset == 10
+        assert not manager.search_page("отчет", 10, second.next_cursor).stale
+    
+    def test_cursor_bound_to_query(self, documents, tmp_path):
+        """Тест: курсор действителен только для своего запроса, фильтра и весов; другой индекс - устаревший"""
+        index_manager = IndexManager()
+        index_manager.index.add_documents(documents)
+        manager = SearchManager(index_manager.index)
+        first = manager.search_page("отчет", 10)
+        
+        for query, filters, boosts in (("прочее", None, None), ("отчет", DocFilter(extensions=(".md",)), None),
+                                       ("отчет", None, {"body": 1.0, "title": 2.0})):
+            with pytest.raises(ValueError):
+                manager.search_page(query, 10, first.next_cursor, filters=filters, boosts=boosts)
+        
+        # Файлы индексов загружаются с одной версией, но разными построениями
+        index_file = str(tmp_path / "index.idx")
+        index_manager.save_index(index_file)
+        loaded = IndexManager()
+        loaded.load_index(index_file)
+        reloaded = SearchManager(loaded.index)
+        assert not reloaded.search_page("отчет", 10, reloaded.search_page("отчет", 10).next_cursor).stale
+        
+        other = IndexManager()
+        other.index.add_documents(documents[:20])
+        other.save_index(index_file)
+        loaded.load_index(index_file)
+        assert SearchManager(loaded.index).search_page("отчет", 10, first.next_cursor).stale
@@ -0,0 +1,113 @@
+import os
+import numpy as np
+import pytest
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.ranker import TFIDFRanker
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+
+pytest.importorskip('pytest_benchmark')
+
+# Размеры сгенерированного корпуса: достаточно, чтобы регрессии были заметны, и быстро для make bench
+NUM_DOCS = 2000
+VOCABULARY = 3000
+DOC_LENGTH = 100
+NUM_QUERIES = 50
+# Раундов на замер: на шумной машине сравнение с эталоном идет по медиане нескольких раундов
+ROUNDS = 7
+
+def generate_documents(count: int = NUM_DOCS, seed: int = 0) -> list:
+    """Детерминированный корпус с распределением слов по закону Ципфа"""
+    rng = np.random.default_rng(seed)
+    return [Document(id=f"doc{i}.txt", path=f"doc{i}.txt",
+                     text=' '.join(f"w{w}" for w in rng.zipf(1.3, DOC_LENGTH) % VOCABULARY))
+            for i in range(count)]
+
+def generate_queries(index, count: int = NUM_QUERIES, seed: int = 1) -> list:
+    """Запросы из 1-3 терминов словаря индекса"""
+    rng = np.random.default_rng(seed)
+    terms = sorted(index.terms)
+    return [' '.join(rng.choice(terms, size=rng.integers(1, 4))) for _ in range(count)]
+
+@pytest.fixture(scope='module')
+def documents():
+    return generate_documents()
+
+@pytest.fixture(scope='module')
+def corpus_dir(tmp_path_factory, documents):
+    directory = tmp_path_factory.mktemp('corpus')
+    for doc in documents[:500]:
+        (directory / doc.id).write_text(doc.text, encoding='utf-8')
+    return directory
+
+@pytest.fixture(scope='module')
+def manager(documents):
+    manager = IndexManager()
+    manager.index.add_documents(documents)
+    manager.finalize()
+    return manager
+
+class TestPerformance:
+    @pytest.mark.benchmark(group='index')
+    def test_add_document(self, benchmark, documents):
+        """Добавление документов по одному в пустой индекс"""
+        def add_all(index):
+            for doc in documents:
+                index.add_document(doc)
+            return index
+        
+        index = benchmark.pedantic(add_all, setup=lambda: ((InvertedIndex(),), {}), rounds=ROUNDS)
+        assert index.total_docs == NUM_DOCS
+    
+    @pytest.mark.benchmark(group='index')
+    def test_build_from_directory(self, benchmark, corpus_dir):
+        """Построение индекса по директории: чтение файлов, индексация, финализация"""
+        def build(manager):
+            manager.build_from_directory(str(corpus_dir))
+            return manager
+        
+        manager = benchmark.pedantic(build, setup=lambda: ((IndexManager(),), {}), rounds=ROUNDS)
+        assert manager.index.total_docs == 500
+    
+    @pytest.mark.benchmark(group='search')
+    def test_tfidf_rank(self, benchmark, manager):
+        """TF-IDF ранжирование полным перебором постингов"""
+        ranker = TFIDFRanker()
+        queries = [query.split() for query in generate_queries(manager.index)]
+        
+        results = benchmark(lambda: [ranker.rank(terms, manager.index, 10) for terms in queries])
+        assert all(results)
+    
+    @pytest.mark.benchmark(group='search')
+    def test_batch_search(self, benchmark, manager):
+        """Пакетный поиск: планирование и косинусное ранжирование по векторам"""
+        search = SearchManager(manager.index, vectors=manager.vectors)
+        queries = generate_queries(manager.index)
+        
+        results = benchmark(search.batch_search, queries)
+        assert len(results) == NUM_QUERIES and all(results)
+    
+    @pytest.mark.benchmark(group='storage')
+    def test_save_index(self, benchmark, manager, tmp_path):
+        """Сохранение индекса в файл"""
+        index_file = str(tmp_path / "index.idx")
+        benchmark.pedantic(manager.save_index, args=(index_file,), rounds=ROUNDS)
+        
+        assert os.path.getsize(index_file) > 0
+        loaded = IndexManager()
+        loaded.load_index(index_file)
+        assert loaded.index.total_docs == NUM_DOCS
+    
+    @pytest.mark.benchmark(group='storage')
+    def test_load_index(self, benchmark, manager, tmp_path):
+        """Загрузка индекса в память (с построением векторов)"""
+        index_file = str(tmp_path / "index.idx")
+        manager.save_index(index_file)
+        
+        def load():
+            loaded = IndexManager()
+            loaded.load_index(index_file)
+            return loaded
+        
+        loaded = benchmark.pedantic(load, rounds=ROUNDS)
+        assert loaded.index.total_docs == NUM_DOCS
@@ -0,0 +1,60 @@
+import pytest
+from src.core.cache_manager import CacheManager
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.index_storage import IndexWriter
+from src.core.postings_codecs import get_codec
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+
+class TestPostingsBlockCache:
+    @pytest.fixture
+    def index_file(self, tmp_path):
+        """Файл индекса с многоблочными постингами"""
+        index = InvertedIndex()
+        index.add_documents(Document(id=f"doc{i}", text=f"common {'rare' if i % 7 == 0 else 'filler'} word{i}")
+                            for i in range(300))
+        path = str(tmp_path / "index.idx")
+        IndexWriter(get_codec('varint'), block_size=32).write(index, path)
+        return path
+    
+    def test_lazy_matches_eager(self, index_file):
+        """Тест совпадения поиска по индексу на диске и в памяти"""
+        eager = IndexManager()
+        eager.load_index(index_file)
+        lazy = IndexManager()
+        lazy.load_index(index_file, lazy=True)
+        
+        expected = SearchManager(eager.index).search("rare word7", limit=20)
+        results = SearchManager(lazy.index).search("rare word7", limit=20)
+        
+        assert [(r.document.id, r.score) for r in results] == [(r.document.id, r.score) for r in expected]
+        lazy.index.close()
+    
+    def test_warm_query_uses_cache(self, index_file):
+        """Тест: повторный запрос не декодирует блоки заново"""
+        manager = IndexManager()
+        manager.load_index(index_file, lazy=True)
+        search = SearchManager(manager.index)
+        postings_cache = manager.index.postings_cache
+        
+        search.search("rare")
+        decoded = postings_cache.decoded_blocks
+        assert decoded == manager.index.reader.num_blocks("rare")
+        search.search("rare")
+        assert postings_cache.decoded_blocks == decoded
+        manager.index.close()
+    
+    def test_pinned_terms_survive_eviction(self, index_file):
+        """Тест: закрепленные термины предзагружаются и не вытесняются"""
+        manager = IndexManager(cache_manager=CacheManager(total_bytes=2048))
+        manager.load_index(index_file, lazy=True, pinned_terms=["common"])
+        postings_cache = manager.index.postings_cache
+        assert postings_cache.decoded_blocks == manager.index.reader.num_blocks("common")
+        
+        for i in range(50):
+            manager.index.terms[f"word{i}"]
+        decoded = postings_cache.decoded_blocks
+        assert len(manager.index.terms["common"]) == 300
+        assert postings_cache.decoded_blocks == decoded
+        assert manager.cache_manager.bytes_used <= 2048
+        manager.index.close()
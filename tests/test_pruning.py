@@ -0,0 +1,68 @@
+import pytest
+from src.core.index_manager import IndexManager
+from src.core.pruning import FALLBACK_STOPWORDS, PruningConfig, load_stopwords
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+from src.utils.tokenizer import Tokenizer
+
+class TestPruning:
+    @pytest.fixture
+    def documents(self):
+        return [
+            Document(id="doc1.txt", path="doc1.txt", text="поисковый движок и документы"),
+            Document(id="doc2.txt", path="doc2.txt", text="the engine indexes documents and движок"),
+            Document(id="doc3.txt", path="doc3.txt", text="погода и движок"),
+            Document(id="doc4.txt", path="doc4.txt", text="документы лежат в архиве"),
+        ]
+    
+    def test_load_stopwords(self):
+        """Тест: списки языков загружаются (из NLTK или встроенные)"""
+        assert {'и', 'в', 'это'} <= load_stopwords('russian')
+        assert {'the', 'and'} <= load_stopwords('english')
+        with pytest.raises(ValueError):
+            PruningConfig(max_df_ratio=1.5)
+    
+    def test_stopwords_not_indexed(self, documents):
+        """Тест: стоп-слова не попадают в постинги, поиск по остальным терминам работает"""
+        manager = IndexManager(pruning=PruningConfig(extra_stopwords=["Архиве"]))
+        manager.index.add_documents(documents)
+        
+        assert not {'и', 'the', 'and', 'в', 'архиве'} & set(manager.index.terms)
+        assert len(manager.index.terms["движок"]) == 3
+        
+        manager.index.remove_document("doc2.txt")
+        assert len(manager.index.terms["движок"]) == 2
+    
+    def test_high_df_pruning(self, documents):
+        """Тест: термины с долей документов выше порога отсекаются и дальше не индексируются"""
+        manager = IndexManager(pruning=PruningConfig((), max_df_ratio=0.5, min_docs=1), spelling=True)
+        manager.index.add_documents(documents)
+        
+        assert manager.prune_high_df() == ["движок"]
+        assert "движок" not in manager.index.terms
+        assert manager.spelling.lookup("движок") == []
+        manager.index.add_document(Document(id="doc5.txt", path="doc5.txt", text="движок"))
+        assert "движок" not in manager.index.terms
+    
+    def test_config_persisted(self, documents, tmp_path):
+        """Тест: конфигурация сохраняется в индексе, и запросы разбираются так же"""
+        manager = IndexManager(pruning=PruningConfig(['russian'], max_df_ratio=0.5, min_docs=1))
+        manager.index.add_documents(documents)
+        manager.prune_high_df()
+        index_file = str(tmp_path / "index.idx")
+        manager.save_index(index_file)
+        
+        for lazy in (False, True):
+            loaded = IndexManager()
+            loaded.load_index(index_file, lazy=lazy)
+            assert loaded.pruning.stopwords == manager.pruning.stopwords
+            assert loaded.pruning.pruned == {"движок"}
+            search = SearchManager(loaded.index)
+            assert search._query_terms("погода и движок") == ["погода"]
+            assert [r.document.id for r in search.search("погода и движок")] == ["doc3.txt"]
+            if lazy:
+                loaded.index.close()
+    
+    def test_fallback_lists(self):
+        """Тест: встроенные списки покрывают стоп-слова запросов по умолчанию"""
+        assert Tokenizer.STOPWORDS <= FALLBACK_STOPWORDS['russian']
@@ -0,0 +1,76 @@
+import time
+import pytest
+from src.core.cache_manager import CacheManager
+from src.core.query_log import (QueryLogger, compare_results, read_query_log, replay, top_terms,
+                                QueryLogRecord, ReplayReport)
+from src.core.search_manager import SearchManager
+from src.core.index_manager import InvertedIndex
+from src.models.document import Document
+
+class TestQueryLog:
+    @pytest.fixture
+    def sample_index(self):
+        """Создает тестовый индекс"""
+        index = InvertedIndex()
+        index.add_document(Document(id="doc1", text="кошка ловит мышь"))
+        index.add_document(Document(id="doc2", text="собака ловит мяч"))
+        index.add_document(Document(id="doc3", text="птица"))
+        return index
+    
+    def test_log_records(self, sample_index, tmp_path):
+        """Тест структурированной записи запросов с попаданием в кэш"""
+        log_path = str(tmp_path / "queries.jsonl")
+        query_log = QueryLogger(log_path)
+        manager = SearchManager(sample_index, cache_manager=CacheManager(), query_log=query_log)
+        manager.search("Кошка ловит", limit=5)
+        manager.search("Кошка ловит", limit=5)
+        query_log.close()
+        
+        records = list(read_query_log(log_path))
+        assert [r.cache_hit for r in records] == [False, True]
+        assert records[0].terms == ["кошка", "ловит"]
+        assert records[0].limit == 5 and records[0].results == 1
+        assert top_terms(records, 1) in (["кошка"], ["ловит"])
+    
+    def test_replay_and_compare(self, sample_index, tmp_path):
+        """Тест воспроизведения журнала и сравнения с эталоном"""
+        log_path = str(tmp_path / "queries.jsonl")
+        query_log = QueryLogger(log_path)
+        manager = SearchManager(sample_index, query_log=query_log)
+        for query in ["кошка", "ловит", "птица", "мяч"]:
+            manager.search(query)
+        query_log.close()
+        records = list(read_query_log(log_path))
+        
+        def search(query, limit):
+            return [r.document.id for r in SearchManager(sample_index).search(query, limit)]
+        
+        report = replay(records, search, concurrency=2)
+        assert report.queries == 4
+        assert report.results[0] == ["doc1"]
+        assert report.percentile(50) <= report.percentile(99)
+        assert compare_results(report.results, report.results) == {"identical": 1.0, "overlap": 1.0}
+        assert compare_results([["a", "b"]], [["b", "c"]])["overlap"] == pytest.approx(1 / 3)
+    
+    def test_replay_coordinated_omission(self):
+        """Тест: при заданном темпе ожидание за медленными запросами входит в задержку"""
+        records = [QueryLogRecord(query="q", terms=["q"], limit=10, latency_ms=0.0, results=0,
+                                  cache_hit=False, ts=0.0)] * 10
+        
+        def slow_search(query, limit):
+            time.sleep(0.02)
+            return []
+        
+        report = replay(records, slow_search, rate=1000, concurrency=1)
+        # Запросы запланированы в первые 10 мс, последний ждет девять предыдущих по 20 мс
+        assert report.latencies_ms[-1] >= 150
+        assert report.latencies_ms == sorted(report.latencies_ms)
+        assert report.percentile(50) >= 80
+    
+    def test_percentile(self):
+        """Тест перцентилей задержки"""
+        report = ReplayReport(queries=4, elapsed=2.0, latencies_ms=[4.0, 1.0, 3.0, 2.0])
+        
+        assert report.throughput == 2.0
+        assert report.percentile(50) == 2.0
+        assert report.percentile(100) == 4.0
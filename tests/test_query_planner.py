@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from src.core.query_planner import QueryPlanner, STRATEGY_BOOLEAN_FIRST, STRATEGY_EXHAUSTIVE, STRATEGY_PRUNED
+from src.core.ranker import TFIDFRanker
+from src.core.search_manager import SearchManager
+from src.core.index_manager import InvertedIndex
+from src.models.document import Document
+
+class TestQueryPlanner:
+    @pytest.fixture
+    def sample_index(self):
+        """Индекс с частым (common), средним (mid) и редкими терминами"""
+        index = InvertedIndex()
+        docs = []
+        for i in range(60):
+            words = ["common"]
+            if i % 4 == 0:
+                words += ["mid"] * (1 + i % 3)
+            if i % 10 == 0:
+                words.append("rare")
+            if i % 6 == 0:
+                words.append("other")
+            words += [f"filler{i}"] * (1 + i % 5)
+            docs.append(Document(id=f"doc{i}", text=" ".join(words)))
+        index.add_documents(docs)
+        return index
+    
+    def test_order_and_deferral(self, sample_index):
+        """Тест порядка терминов по df и откладывания частых"""
+        plan = QueryPlanner().plan(["mid", "common", "rare", "rare", "missing"], sample_index)
+        
+        assert [t.term for t in plan.terms] == ["rare", "mid"]
+        assert [t.term for t in plan.deferred] == ["common"]
+        assert plan.missing == ["missing"]
+        assert plan.strategy == STRATEGY_EXHAUSTIVE
+    
+    def test_all_frequent_terms_are_kept(self, sample_index):
+        """Тест запроса только из частых терминов"""
+        plan = QueryPlanner().plan(["common"], sample_index)
+        
+        assert [t.term for t in plan.terms] == ["common"]
+        assert not plan.deferred
+    
+    @pytest.mark.parametrize("terms,strategy", [
+        (["mid", "other"], STRATEGY_PRUNED),
+        (["mid", "other", "rare"], STRATEGY_BOOLEAN_FIRST),
+    ])
+    def test_strategies_match_exhaustive(self, sample_index, terms, strategy):
+        """Тест совпадения top-k при отсечении с полным перебором"""
+        ranker = TFIDFRanker()
+        plan = QueryPlanner(pruning_min_postings=0).plan(terms, sample_index)
+        assert plan.strategy == strategy
+        
+        exhaustive = QueryPlanner(pruning_min_postings=10 ** 9).plan(terms, sample_index)
+        limit = 3 if strategy == STRATEGY_BOOLEAN_FIRST else 5
+        expected = ranker.rank_planned(exhaustive, sample_index, limit)
+        results = ranker.rank_planned(plan, sample_index, limit)
+        
+        assert [r.score for r in results] == pytest.approx([r.score for r in expected])
+        assert plan.postings_scanned <= exhaustive.postings_scanned
+    
+    @pytest.mark.parametrize("limit,offset", [(10, 0), (10, 10), (3, 0), (50, 0)])
+    def test_boolean_first_zipf(self, limit, offset):
+        """Тест: boolean-first на корпусе по Ципфу совпадает с полным перебором при любом limit"""
+        rng = np.random.default_rng(0)
+        index = InvertedIndex()
+        index.add_documents([Document(id=f"doc{i}", text=" ".join(f"w{w}" for w in rng.zipf(1.3, 100) % 3000))
+                             for i in range(3000)])
+        terms = ["w10", "w40", "w50", "w3"]
+        ranker = TFIDFRanker()
+        plan = QueryPlanner(max_df_ratio=1.0, pruning_min_postings=0).plan(terms, index)
+        assert plan.strategy == STRATEGY_BOOLEAN_FIRST
+        
+        scores = ranker._score_exhaustive(plan, index)
+        expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[offset:offset + limit]
+        results = ranker.rank_planned(plan, index, limit, offset=offset)
+        
+        assert [r.document.id for r in results] == [doc_id for doc_id, _ in expected]
+        assert [r.score for r in results] == pytest.approx([score for _, score in expected])
+    
+    def test_explain(self, sample_index):
+        """Тест плана запроса с временем этапов"""
+        manager = SearchManager(sample_index)
+        plan = manager.explain("rare common")
+        
+        assert set(plan.timings) >= {"tokenize", "plan", "score", "sort", "snippets"}
+        assert "rare" in plan.explain()
+        assert manager.explain("") is None
@@ -0,0 +1,113 @@
+import os
+import time
+import pytest
+from src.core.segments import SegmentedIndex, TieredMergePolicy
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+
+class TestTieredMergePolicy:
+    def test_merge_same_tier(self):
+        """Тест выбора диапазона сегментов одного яруса"""
+        policy = TieredMergePolicy(segments_per_tier=3, floor_docs=10)
+        
+        assert policy.find_merge([10, 10]) is None
+        assert policy.find_merge([200, 10, 10, 10]) == (1, 4)
+
+class TestSegmentedIndex:
+    def test_flush_and_search(self, tmp_path):
+        """Тест сброса сегментов на диск и поиска по снимку"""
+        index = SegmentedIndex(str(tmp_path), flush_threshold=2, background_merge=False)
+        index.add_document(Document(id="doc1", text="прогноз погоды"))
+        index.add_document(Document(id="doc2", text="новости технологий"))
+        index.add_document(Document(id="doc3", text="погоды нет"))
+        
+        assert index.segment_count == 1
+        results = SearchManager(index).search("погоды")
+        assert {r.document.id for r in results} == {"doc1", "doc3"}
+        index.close()
+    
+    def test_snapshot_isolation(self, tmp_path):
+        """Тест неизменности снимка при добавлении документов"""
+        index = SegmentedIndex(str(tmp_path), flush_threshold=100, background_merge=False)
+        index.add_document(Document(id="doc1", text="hello world"))
+        snapshot = index.snapshot()
+        index.add_document(Document(id="doc2", text="hello again"))
+        
+        assert snapshot.total_docs == 1
+        assert set(snapshot.terms["hello"]) == {"doc1"}
+        assert set(index.snapshot().terms["hello"]) == {"doc1", "doc2"}
+        index.close()
+    
+    def test_update_delete_and_merge(self, tmp_path):
+        """Тест обновления, удаления и слияния сегментов"""
+        policy = TieredMergePolicy(segments_per_tier=2, floor_docs=1)
+        index = SegmentedIndex(str(tmp_path), flush_threshold=1, merge_policy=policy, background_merge=False)
+        index.add_document(Document(id="doc1", text="old text"))
+        index.add_document(Document(id="doc2", text="other text"))
+        index.add_document(Document(id="doc1", text="new text"))
+        index.delete_document("doc2")
+        index.flush()
+        
+        while index.maybe_merge():
+            pass
+        
+        snapshot = index.snapshot()
+        assert index.segment_count == 1
+        assert snapshot.total_docs == 1
+        assert "old" not in snapshot.terms or not snapshot.terms["old"]
+        assert snapshot.documents["doc1"].text == "new text"
+        index.close()
+    
+    def test_reopen(self, tmp_path):
+        """Тест открытия индекса по манифесту"""
+        index = SegmentedIndex(str(tmp_path), flush_threshold=10)
+        index.add_document(Document(id="doc1", text="hello world"))
+        index.close()
+        
+        reopened = SegmentedIndex(str(tmp_path))
+        assert reopened.total_docs == 1
+        assert "hello" in reopened.snapshot().terms
+        reopened.close()
+    
+    def test_merged_segments_released(self, tmp_path):
+        """Тест: слитые сегменты закрываются и удаляются, когда их отпускает последний снимок"""
+        policy = TieredMergePolicy(segments_per_tier=2, floor_docs=1)
+        index = SegmentedIndex(str(tmp_path), flush_threshold=1, merge_policy=policy, background_merge=False)
+        index.add_document(Document(id="doc1", text="hello world"))
+        index.add_document(Document(id="doc2", text="hello again"))
+        old = list(index._segments)
+        snapshot = index.snapshot()
+        
+        assert index.maybe_merge()
+        assert all(os.path.exists(seg.path) for seg in old)
+        assert set(snapshot.terms["hello"]) == {"doc1", "doc2"}
+        
+        del snapshot
+        assert all(seg.reader._mmap.closed and not os.path.exists(seg.path) for seg in old)
+        merged = index._segments[0]
+        index.close()
+        assert merged.reader._mmap.closed and os.path.exists(merged.path)
+    
+    def test_merge_loop_recovers(self, tmp_path):
+        """Тест: после ошибки слияния фоновый поток делает паузу и повторяет попытку"""
+        policy = TieredMergePolicy(segments_per_tier=2, floor_docs=1)
+        index = SegmentedIndex(str(tmp_path), flush_threshold=1, merge_policy=policy)
+        merge_segments = index._merge_segments
+        failures = []
+        
+        def failing_merge(segments, drop_tombstones):
+            if not failures:
+                failures.append(True)
+                raise OSError("диск недоступен")
+            return merge_segments(segments, drop_tombstones)
+        
+        index._merge_segments = failing_merge
+        index.add_document(Document(id="doc1", text="hello world"))
+        index.add_document(Document(id="doc2", text="hello again"))
+        
+        deadline = time.monotonic() + 10
+        while index.segment_count > 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert failures and index.segment_count == 1
+        assert index._merge_thread.is_alive()
+        index.close()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.query_planner import QueryPlanner
+from src.core.search_manager import SearchManager
+from src.core.shared_index import SharedIndex, SharedIndexPool
+from src.models.document import Document
+
+class TestSharedIndex:
+    @pytest.fixture
+    def index(self):
+        index = InvertedIndex()
+        index.add_documents([
+            Document(id="папка/doc1.txt", path="папка/doc1.txt", text="поисковый движок ищет документы", size=10),
+            Document(id="doc2.txt", path="doc2.txt", text="движок индексирует документы быстро", mtime=5.0),
+            Document(id="doc3.txt", path="doc3.txt", text="погода сегодня хорошая"),
+            Document(id="doc4.txt", path="doc4.txt", text="документы лежат в архиве документы"),
+        ] + [Document(id=f"other{i}.txt", path=f"other{i}.txt", text=f"прочее {i}") for i in range(6)])
+        return index
+    
+    @pytest.fixture
+    def shared(self, index):
+        shared = SharedIndex.create(index)
+        yield shared
+        shared.close()
+    
+    def test_read_interface(self, index, shared):
+        """Тест: словарь, постинги и документы читаются из сегмента"""
+        attached = SharedIndex.attach(shared.name)
+        try:
+            assert attached.total_docs == index.total_docs
+            assert sorted(attached.terms) == sorted(index.terms)
+            assert "движок" in attached.terms and "нет" not in attached.terms
+            assert attached.terms["документы"] == index.terms["документы"]
+            assert attached.doc_freq("документы") == 3
+            
+            doc = attached.documents["папка/doc1.txt"]
+            assert doc == index.documents["папка/doc1.txt"]
+            assert attached.documents["doc2.txt"].mtime == 5.0
+            assert "missing.txt" not in attached.documents
+        finally:
+            attached.close()
+    
+    def test_create_from_disk_index(self, index, shared, tmp_path):
+        """Тест: индекс, оставленный на диске, размещается в сегменте так же, как индекс в памяти"""
+        manager = IndexManager()
+        manager.index = index
+        index_file = str(tmp_path / "index.idx")
+        manager.save_index(index_file)
+        manager.load_index(index_file, lazy=True)
+        
+        from_disk = SharedIndex.create(manager.index)
+        try:
+            assert from_disk.header['sections'] == shared.header['sections']
+            assert all(np.array_equal(from_disk.arrays[name], shared.arrays[name])
+                       for name in ('indptr', 'doc_ords', 'freqs', 'doc_lengths'))
+        finally:
+            from_disk.close()
+            manager.index.close()
+    
+    def test_postings_are_shared(self, shared):
+        """Тест: постинги подключенного индекса - представления над тем же сегментом"""
+        attached = SharedIndex.attach(shared.name)
+        try:
+            doc_ords, freqs = attached.postings("движок")
+            assert not doc_ords.flags.owndata
+            assert np.shares_memory(doc_ords, attached.arrays['doc_ords'])
+            # Представления нужно освободить до отключения от сегмента
+            del doc_ords, freqs
+        finally:
+            attached.close()
+    
+    def test_top_k_matches_ranker(self, index, shared):
+        """Тест: оценки совпадают с TF-IDF ранжированием в памяти"""
+        manager = SearchManager(index)
+        for query in ["документы", "движок документы", "погода"]:
+            plan = QueryPlanner().plan(query.split(), shared)
+            top = shared.top_k([(t.term, t.idf) for t in plan.terms], 10)
+            expected = [(r.document.id, r.score) for r in manager.search(query, 10)]
+            
+            assert [doc_id for doc_id, _ in top] == [doc_id for doc_id, _ in expected]
+            assert [score for _, score in top] == pytest.approx([score for _, score in expected])
+    
+    def test_worker_pool(self, index, shared):
+        """Тест: процессы-обработчики отвечают по общему индексу"""
+        expected = [r.document.id for r in SearchManager(index).search("движок документы")]
+        with SharedIndexPool(shared, processes=2) as pool:
+            results = pool.search("движок документы")
+        
+        assert [r.document.id for r in results] == expected
+        assert results[0].document.text == index.documents[expected[0]].text
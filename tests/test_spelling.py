@@ -0,0 +1,77 @@
+import pytest
+from src.core.index_manager import IndexManager, InvertedIndex
+from src.core.search_manager import SearchManager
+from src.core.spelling import SpellingSuggester, edit_distance
+from src.models.document import Document
+
+class TestSpelling:
+    @pytest.fixture
+    def documents(self):
+        return [
+            Document(id="doc1.txt", path="doc1.txt", text="поисковый движок ищет документы"),
+            Document(id="doc2.txt", path="doc2.txt", text="движок индексирует документы быстро"),
+            Document(id="doc3.txt", path="doc3.txt", text="погода сегодня хорошая"),
+            Document(id="doc4.txt", path="doc4.txt", text="документы лежат в архиве"),
+        ]
+    
+    def test_edit_distance(self):
+        """Тест расстояния с перестановкой соседних символов"""
+        assert edit_distance("движок", "движок", 2) == 0
+        assert edit_distance("движок", "движек", 2) == 1
+        assert edit_distance("движок", "двжиок", 2) == 1
+        assert edit_distance("движок", "двк", 2) == 3
+    
+    def test_lookup(self, documents):
+        """Тест: варианты упорядочены по расстоянию, затем по частоте"""
+        index = InvertedIndex()
+        index.add_documents(documents)
+        suggester = SpellingSuggester.build(index)
+        
+        assert suggester.lookup("документи")[0].term == "документы"
+        assert suggester.lookup("двжиок")[0].distance == 1
+        assert suggester.lookup("абвгдеж") == []
+        assert suggester.correct(["пагода", "движек"]) == ["погода", "движок"]
+    
+    def test_incremental_with_index(self, documents):
+        """Тест: словарь пополняется и очищается вместе с индексом"""
+        suggester = SpellingSuggester()
+        index = InvertedIndex(suggester)
+        index.add_documents(documents)
+        assert suggester.counts["документы"] == 3
+        
+        index.remove_document("doc3.txt")
+        assert suggester.lookup("пагода") == []
+        
+        index.update_documents(add=[Document(id="doc5.txt", path="doc5.txt", text="пагода")])
+        assert suggester.lookup("погода")[0].term == "пагода"
+    
+    def test_persisted_with_index(self, documents, tmp_path):
+        """Тест: словарь сохраняется рядом с индексом и загружается вместе с ним"""
+        manager = IndexManager(spelling=True)
+        manager.index.add_documents(documents)
+        index_file = str(tmp_path / "index.idx")
+        manager.save_index(index_file)
+        saved = manager.spelling
+        
+        loaded = IndexManager(spelling=True)
+        loaded.load_index(index_file)
+        assert loaded.spelling is not saved
+        assert loaded.spelling.counts == saved.counts
+        assert loaded.spelling.deletes == saved.deletes
+        
+        # Новые документы попадают в загруженный словарь
+        loaded.index.add_documents([Document(id="doc5.txt", path="doc5.txt", text="новости")])
+        assert loaded.spelling.lookup("новасти")[0].term == "новости"
+    
+    def test_search_retries_with_correction(self, documents):
+        """Тест: запрос без результатов повторяется с исправленными терминами"""
+        suggester = SpellingSuggester()
+        index = InvertedIndex(suggester)
+        index.add_documents(documents)
+        
+        assert SearchManager(index, spelling=suggester).search("пагода") == []
+        
+        manager = SearchManager(index, spelling=suggester, auto_correct=True)
+        assert manager.suggest("пагода") == "погода"
+        assert manager.suggest("погода") is None
+        assert [r.document.id for r in manager.search("пагода")] == ["doc3.txt"]
@@ -0,0 +1,77 @@
+import io
+import csv
+import pytest
+from src.core.index_manager import IndexManager
+from src.core.index_storage import IndexReader
+from src.core.term_stats import collect_term_stats, estimate_memory, write_csv
+from src.models.document import Document
+
+class TestTermStats:
+    @pytest.fixture
+    def index_file(self, tmp_path):
+        manager = IndexManager()
+        manager.index.add_documents([
+            Document(id="doc1.txt", path="doc1.txt", text="поисковый движок ищет документы документы"),
+            Document(id="doc2.txt", path="doc2.txt", text="движок индексирует документы"),
+            Document(id="doc3.txt", path="doc3.txt", text="погода сегодня хорошая"),
+            Document(id="doc4.txt", path="doc4.txt", text="документы лежат в архиве"),
+        ])
+        index_file = str(tmp_path / "index.idx")
+        manager.save_index(index_file)
+        return index_file
+    
+    def test_collect(self, index_file):
+        """Тест: df, cf и самые длинные списки по файлу индекса"""
+        with IndexReader(index_file) as reader:
+            stats = collect_term_stats(reader, top_n=2)
+            num_terms = len(reader.dictionary)
+        
+        assert stats.total_docs == 4
+        assert stats.num_terms == num_terms
+        assert stats.max_doc_length == 5
+        assert stats.total_tokens == round(stats.avg_doc_length * 4)
+        assert [(term, df, cf) for term, df, cf, _ in stats.top_postings] == [("документы", 3, 4), ("движок", 2, 2)]
+        assert sum(count for _, _, count in stats.df_histogram) == num_terms
+        assert stats.df_histogram[-1] == [2, 3, 2]
+        assert set(stats.disk) == {'documents', 'dictionary', 'postings'}
+        assert all(size > 0 for size in stats.memory.values())
+    
+    def test_without_terms(self, index_file):
+        """Тест: без --terms постинги не декодируются"""
+        with IndexReader(index_file) as reader:
+            stats = collect_term_stats(reader, with_terms=False)
+        
+        assert stats.num_postings > 0
+        assert stats.total_tokens == 0
+        assert stats.df_histogram == [] and stats.top_postings == []
+    
+    def test_zero_top(self, index_file):
+        """Тест: --top 0 - статистика без списка самых длинных постингов"""
+        with IndexReader(index_file) as reader:
+            stats = collect_term_stats(reader, top_n=0)
+        
+        assert stats.top_postings == []
+        assert stats.total_tokens > 0
+    
+    def test_estimate_memory(self, index_file):
+        """Тест: оценка памяти по заголовку близка к оценке полным проходом"""
+        with IndexReader(index_file) as reader:
+            stats = collect_term_stats(reader, with_terms=False)
+            estimate = estimate_memory(reader.header)
+        
+        assert set(estimate) == set(stats.memory)
+        assert estimate['vectors'] == stats.memory['vectors']
+        assert 0.5 < sum(estimate.values()) / sum(stats.memory.values()) < 2
+    
+    def test_csv(self, index_file):
+        """Тест выгрузки в CSV"""
+        with IndexReader(index_file) as reader:
+            stats = collect_term_stats(reader, top_n=1)
+        out = io.StringIO()
+        write_csv(stats, out)
+        
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        summary = {row['key']: row['value'] for row in rows if row['section'] == 'summary'}
+        assert summary['total_docs'] == '4'
+        top = [row for row in rows if row['section'] == 'top_postings']
+        assert [(row['key'], row['df'], row['cf']) for row in top] == [("документы", '3', '4')]
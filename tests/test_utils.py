@@ -1,6 +1,6 @@
 import pytest
 from src.utils.tokenizer import Tokenizer
-from src.utils.file_utils import FileUtils
+from src.utils.file_utils import FileUtils, IngestionStats
 
 class TestTokenizer:
     def test_tokenize_basic(self):
@@ -25,4 +25,46 @@ class TestFileUtils:
         test_file = tmp_path / "test.txt"
         test_file.write_text("x" * 1024)  # 1KB файл
         
-        assert FileUtils.validate_file_size(str(test_file), max_size_mb=1)
\ No newline at end of file
+        assert FileUtils.validate_file_size(str(test_file), max_size_mb=1)
+    
+    def test_nested_files_have_distinct_ids(self, tmp_path):
+        """Тест уникальных ID для одноименных файлов в разных подпапках"""
+        for folder in ("a", "b"):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / "note.txt").write_text(folder, encoding="utf-8")
+        
+        documents = FileUtils.read_documents_from_directory(str(tmp_path))
+        
+        assert sorted(doc.id for doc in documents) == ["a/note.txt", "b/note.txt"]
+    
+    def test_detect_encoding(self):
+        """Тест определения кодировки по образцу"""
+        text = "Привет, мир"
+        
+        assert FileUtils.detect_encoding(text.encode("utf-8")) == "utf-8"
+        assert FileUtils.detect_encoding(text.encode("utf-8")[:-8]) == "utf-8"
+        assert FileUtils.detect_encoding(text.encode("cp1251")) == "cp1251"
+    
+    def test_read_text_large_file(self, tmp_path, monkeypatch):
+        """Тест чтения через mmap"""
+        monkeypatch.setattr(FileUtils, "MMAP_THRESHOLD", 16)
+        test_file = tmp_path / "big.txt"
+        test_file.write_bytes(("пример текста " * 10).encode("cp1251"))
+        
+        text, encoding = FileUtils.read_text(str(test_file))
+        
+        assert encoding == "cp1251"
+        assert text.startswith("пример текста")
+    
+    def test_ingestion_stats(self, tmp_path):
+        """Тест статистики чтения по кодировкам"""
+        (tmp_path / "a.txt").write_bytes("привет".encode("utf-8"))
+        (tmp_path / "b.txt").write_bytes("привет".encode("cp1251"))
+        (tmp_path / "empty.txt").write_bytes(b"")
+        stats = IngestionStats()
+        
+        documents = FileUtils.read_documents_from_directory(str(tmp_path), workers=2, stats=stats)
+        
+        assert [doc.text for doc in documents] == ["привет", "привет"]
+        assert stats.encodings == {"utf-8": 1, "cp1251": 1}
+        assert stats.skipped == 1
\ No newline at end of file
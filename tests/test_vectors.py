@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from src.core.vectors import DocumentVectors
+from src.core.index_manager import InvertedIndex
+from src.core.search_manager import SearchManager
+from src.models.document import Document
+
+class TestDocumentVectors:
+    @pytest.fixture
+    def sample_index(self):
+        """Создает тестовый индекс"""
+        index = InvertedIndex()
+        index.add_documents([
+            Document(id="doc1", text="кошка ловит мышь"),
+            Document(id="doc2", text="кошка спит кошка спит"),
+            Document(id="doc3", text="собака ловит мяч"),
+            Document(id="doc4", text="кошка ловит мышь в саду"),
+        ])
+        return index
+    
+    def test_csr_matches_dense_cosine(self, sample_index):
+        """Тест совпадения разреженных оценок с плотным расчетом"""
+        vectors = DocumentVectors.build(sample_index)
+        dense = np.zeros((len(vectors), len(vectors.vocabulary)))
+        for row in range(len(vectors)):
+            start, end = vectors.indptr[row], vectors.indptr[row + 1]
+            dense[row, vectors.indices[start:end]] = vectors.data[start:end]
+        
+        assert np.allclose(np.linalg.norm(dense, axis=1), vectors.norms)
+        
+        query = np.zeros(len(vectors.vocabulary))
+        for term in ["кошка", "мышь"]:
+            query[vectors.vocabulary[term]] = vectors.idf[vectors.vocabulary[term]]
+        expected = dense @ query / (np.linalg.norm(dense, axis=1) * np.linalg.norm(query))
+        
+        assert np.allclose(vectors.query_scores(["кошка", "мышь"]), expected)
+    
+    def test_cosine_search(self, sample_index):
+        """Тест косинусного ранжирования: короткий документ выше длинного"""
+        manager = SearchManager(sample_index, vectors=DocumentVectors.build(sample_index))
+        results = manager.search("кошка мышь")
+        
+        assert [r.document.id for r in results[:2]] == ["doc1", "doc4"]
+        assert 0 < results[0].score <= 1
+    
+    def test_stale_vectors_are_ignored(self, sample_index):
+        """Тест: после изменения индекса поиск не использует старые векторы"""
+        manager = SearchManager(sample_index, vectors=DocumentVectors.build(sample_index))
+        sample_index.add_document(Document(id="doc5", text="мышь"))
+        
+        assert "doc5" in {r.document.id for r in manager.search("мышь")}
+    
+    def test_more_like_this(self, sample_index):
+        """Тест поиска похожих документов"""
+        manager = SearchManager(sample_index)
+        results = manager.more_like_this("doc1", limit=2)
+        
+        assert results[0].document.id == "doc4"
+        assert "doc1" not in {r.document.id for r in results}
+        assert manager.more_like_this("missing") == []
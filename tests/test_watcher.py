@@ -0,0 +1,79 @@
+import os
+import pytest
+from src.core.index_manager import IndexManager
+from src.core.search_manager import SearchManager
+from src.core.watcher import DirectoryWatcher
+
+class TestDirectoryWatcher:
+    @pytest.fixture
+    def watched(self, tmp_path):
+        """Проиндексированная директория и наблюдатель за ней"""
+        (tmp_path / "keep.txt").write_text("постоянный документ", encoding='utf-8')
+        (tmp_path / "edit.txt").write_text("старая версия", encoding='utf-8')
+        (tmp_path / "drop.txt").write_text("удаляемый документ", encoding='utf-8')
+        manager = IndexManager()
+        manager.build_from_directory(str(tmp_path))
+        return tmp_path, manager.index, DirectoryWatcher(manager.index, str(tmp_path), debounce=0.5)
+    
+    def test_no_changes(self, watched):
+        """Тест: состояние индекса совпадает с директорией"""
+        _, _, watcher = watched
+        assert watcher.poll(now=0.0) is None
+        assert watcher.stats.pending == 0
+    
+    def test_add_update_delete(self, watched):
+        """Тест пакетного применения добавления, обновления и удаления"""
+        directory, index, watcher = watched
+        snapshot = index.snapshot()
+        (directory / "sub").mkdir()
+        (directory / "sub" / "new.txt").write_text("новый документ", encoding='utf-8')
+        (directory / "edit.txt").write_text("новая версия файла", encoding='utf-8')
+        (directory / "drop.txt").unlink()
+        
+        # Изменения ждут окончания дребезга
+        assert watcher.poll(now=0.0) is None
+        assert watcher.stats.pending == 3
+        batch = watcher.poll(now=1.0)
+        
+        assert batch.added == ["sub/new.txt"]
+        assert batch.updated == ["edit.txt"]
+        assert batch.deleted == ["drop.txt"]
+        assert sorted(index.documents) == ["edit.txt", "keep.txt", "sub/new.txt"]
+        assert index.documents["edit.txt"].text == "новая версия файла"
+        assert "старая" not in index.terms
+        assert index.total_docs == 3
+        # Опубликованный снимок не изменился
+        assert sorted(snapshot.documents) == ["drop.txt", "edit.txt", "keep.txt"]
+        
+        stats = watcher.stats
+        assert (stats.batches, stats.last_batch_size, stats.pending) == (1, 3, 0)
+        assert stats.last_lag >= 1.0
+        
+        results = SearchManager(index).search("новый")
+        assert [r.document.id for r in results] == ["sub/new.txt"]
+    
+    def test_debounce(self, watched):
+        """Тест: файл, который продолжает меняться, не индексируется"""
+        directory, index, watcher = watched
+        (directory / "log.txt").write_text("строка", encoding='utf-8')
+        assert watcher.poll(now=0.0) is None
+        (directory / "log.txt").write_text("строка еще строка", encoding='utf-8')
+        assert watcher.poll(now=0.4) is None
+        assert watcher.poll(now=0.8) is None
+        
+        batch = watcher.poll(now=1.0)
+        assert batch.added == ["log.txt"]
+        assert index.documents["log.txt"].text == "строка еще строка"
+    
+    def test_reverted_change(self, watched):
+        """Тест: удаленный и сразу возвращенный файл не меняет индекс"""
+        directory, index, watcher = watched
+        content = (directory / "keep.txt").read_bytes()
+        stat = (directory / "keep.txt").stat()
+        (directory / "keep.txt").unlink()
+        assert watcher.poll(now=0.0) is None
+        
+        (directory / "keep.txt").write_bytes(content)
+        os.utime(directory / "keep.txt", (stat.st_atime, stat.st_mtime))
+        assert watcher.poll(now=1.0) is None
+        assert "keep.txt" in index.documents
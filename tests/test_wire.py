@@ -0,0 +1,68 @@
+import pickle
+import numpy as np
+import pytest
+from src.core.wire import (CompactResult, attach_shared, decode_postings, decode_results, decode_search_results,
+                           encode_postings, encode_results, encode_search_results, release_shared,
+                           write_shared)
+from src.models.document import Document, SearchResult
+
+class TestWire:
+    @pytest.fixture
+    def results(self):
+        docs = [Document(id=f"папка/doc{i}.txt", text=f"текст документа {i} " * 50) for i in range(5)]
+        return [SearchResult(doc, 1.0 / (i + 1), doc.text[:20]) for i, doc in enumerate(docs)]
+    
+    def test_results_roundtrip(self, results):
+        """Тест: идентификаторы и оценки передаются без потерь"""
+        data = encode_search_results(results)
+        doc_ids, scores = decode_results(data)
+        
+        assert doc_ids == [r.document.id for r in results]
+        assert scores.tolist() == [r.score for r in results]
+        assert len(data) % 8 == 0
+        assert len(data) < len(pickle.dumps(results))
+        
+        documents = {r.document.id: r.document for r in results}
+        restored = decode_search_results(data, documents)
+        assert [(r.document, r.score) for r in restored] == [(r.document, r.score) for r in results]
+    
+    def test_empty_results(self):
+        """Тест пустой выдачи"""
+        doc_ids, scores = decode_results(encode_results([], []))
+        assert doc_ids == [] and len(scores) == 0
+    
+    def test_postings_zero_copy(self):
+        """Тест: постинги разбираются представлениями над буфером"""
+        buffer = bytearray(encode_postings(np.array([1, 5, 9]), np.array([2, 1, 3])))
+        doc_ords, freqs = decode_postings(buffer)
+        
+        assert doc_ords.tolist() == [1, 5, 9]
+        assert freqs.tolist() == [2, 1, 3]
+        buffer[16:20] = (7).to_bytes(4, 'little')
+        assert doc_ords[0] == 7
+        
+        with pytest.raises(ValueError):
+            decode_results(buffer)
+    
+    def test_compact_result_pickle(self, results):
+        """Тест: компактный результат не несет текст документа"""
+        compact = [CompactResult.from_result(r) for r in results]
+        restored = pickle.loads(pickle.dumps(compact))
+        
+        assert restored == compact
+        assert not hasattr(restored[0], '__dict__')
+        documents = {r.document.id: r.document for r in results}
+        assert restored[0].to_result(documents) == results[0]
+    
+    def test_shared_memory(self, results):
+        """Тест передачи через разделяемую память"""
+        data = encode_search_results(results)
+        segment = write_shared(data)
+        try:
+            with attach_shared(segment.name, len(data)) as view:
+                doc_ids, scores = decode_results(view)
+                scores = scores.copy()
+            assert doc_ids == [r.document.id for r in results]
+            assert scores.tolist() == [r.score for r in results]
+        finally:
+            release_shared(segment)